@@ -3,6 +3,11 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with any ASGI server (e.g. ``uvicorn config.asgi:application``) to
+enable the notification_stream Server-Sent Events endpoint. The stream holds
+one coroutine per open tab instead of a worker thread. Use one worker process
+with PRIME_NOTIFY_BROKER=local, or set it to 'cache' when running several.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
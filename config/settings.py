@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # PRIME Service Portal Apps
     'core',
@@ -73,6 +75,7 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'service_desk.context_processors.global_system_health',  # Updated function name
                 'service_desk.context_processors.site_configuration',
+                'service_desk.context_processors.notification_channel',
             ],
         },
     },
@@ -91,9 +94,91 @@ DATABASES = {
         'PASSWORD': 'admin',
         'HOST': 'localhost',
         'PORT': '5432',
+        'OPTIONS': {
+            # Lets the health endpoint find our sessions in pg_stat_activity
+            'application_name': 'prime_service_portal',
+        },
     }
 }
 
+# Connection reuse for the Waitress production engine (run_production.py).
+# PRIME_DB_POOL:
+#   off         - new connection per request (Django default; runserver / tests)
+#   persistent  - each Waitress thread keeps its own connection (CONN_MAX_AGE),
+#                 so at most WAITRESS_THREADS connections; works with psycopg2
+#   pool        - Django's psycopg 3 connection pool, capped at WAITRESS_THREADS
+#                 (requires `psycopg[binary,pool]` in place of psycopg2-binary)
+# Both reuse modes health-check a connection before handing it to a request.
+WAITRESS_THREADS = int(os.environ.get('PRIME_WAITRESS_THREADS', 32))
+PRIME_DB_POOL = os.environ.get('PRIME_DB_POOL', 'off')
+
+if PRIME_DB_POOL == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = 600
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif PRIME_DB_POOL == 'pool':
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': min(4, WAITRESS_THREADS),
+        'max_size': WAITRESS_THREADS,
+        'timeout': 10,      # Seconds a request waits for a free connection
+        'max_idle': 300,
+    }
+
+# Caching
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# PRIME_CACHE selects the backend (see services/cache.py for key conventions):
+#   locmem  - per-process memory (default; runserver / tests)
+#   file    - on-disk cache shared by every process on the host (run_production.py)
+#   redis   - any Redis-compatible server at PRIME_REDIS_URL (requires the `redis` package)
+PRIME_CACHE = os.environ.get('PRIME_CACHE', 'locmem')
+
+if PRIME_CACHE == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('PRIME_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        }
+    }
+elif PRIME_CACHE == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'prime-service-portal',
+        }
+    }
+
+# Server-push notifications (services/notification_broker.py). The SSE stream
+# needs an ASGI server (config/asgi.py); pages served over WSGI keep polling.
+#   local   - in-process fan-out (default; a single ASGI worker process)
+#   cache   - fan-out through CACHES for several worker processes on one host
+PRIME_NOTIFY_BROKER = os.environ.get('PRIME_NOTIFY_BROKER', 'local')
+
+# Ticket notifications are written behind the request (services/notification_dispatcher.py).
+#   background  - bounded queue drained by a worker thread in batches (default)
+#   inline      - written on commit in the calling thread
+PRIME_NOTIFY_DISPATCH = os.environ.get('PRIME_NOTIFY_DISPATCH', 'background')
+
+# Notification retention (services/retention_service.py, `prune_notifications`).
+# Read notifications older than this are archived to NOTIFICATION_ARCHIVE_DIR
+# (gzip JSONL) and deleted. PRIME_RETENTION_HOURS > 0 makes run_production.py
+# run a pass on that interval as well.
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('PRIME_NOTIFICATION_RETENTION_DAYS', 180))
+NOTIFICATION_ARCHIVE_DIR = BASE_DIR / 'data' / 'archive'
+RETENTION_INTERVAL_HOURS = float(os.environ.get('PRIME_RETENTION_HOURS', 0))
+
+# Bulk ticket intake API (POST /service-desk/api/tickets/intake/, services/intake_service.py).
+# Integrations authenticate with "Authorization: Bearer <token>"; staff sessions
+# work too. Leave unset to accept staff sessions only.
+PRIME_INTAKE_TOKEN = os.environ.get('PRIME_INTAKE_TOKEN', '')
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
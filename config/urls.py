@@ -7,6 +7,7 @@ from service_desk import views
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.dashboard, name='dashboard'),
+    path('health/', views.health_check, name='health_check'),
     path('service-desk/', include('service_desk.urls')),
     path('kb/', include('knowledge_base.urls')),
     path('inventory/', include('inventory.urls')),
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:59
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Django emits UPPER(col::text) LIKE UPPER('%q%') for icontains on PostgreSQL,
+# so the trigram indexes are built on that same expression.
+ASSET_TRIGRAM_SQL = """
+CREATE INDEX IF NOT EXISTS asset_tag_trgm ON inventory_hardwareasset USING gin (UPPER(asset_tag::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS asset_serial_trgm ON inventory_hardwareasset USING gin (UPPER(serial_number::text) gin_trgm_ops);
+"""
+
+ASSET_TRIGRAM_REVERSE_SQL = """
+DROP INDEX IF EXISTS asset_tag_trgm;
+DROP INDEX IF EXISTS asset_serial_trgm;
+"""
+
+
+def postgres_sql(sql):
+    """RunPython callable that executes `sql` on PostgreSQL only."""
+
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0005_assetaudit"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(
+            postgres_sql(ASSET_TRIGRAM_SQL), postgres_sql(ASSET_TRIGRAM_REVERSE_SQL)
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:59
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The trigger keeps search_vector current on every INSERT and on any UPDATE
+# that touches a searched column, so bulk imports stay covered.
+ARTICLE_SEARCH_SQL = """
+CREATE OR REPLACE FUNCTION knowledge_base_article_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', concat_ws(' ', NEW.subcategory, NEW.category)), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.problem, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.solution, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER knowledge_base_article_search_vector_trg
+    BEFORE INSERT OR UPDATE OF title, category, subcategory, problem, solution, search_vector
+    ON knowledge_base_article
+    FOR EACH ROW EXECUTE FUNCTION knowledge_base_article_search_vector();
+
+UPDATE knowledge_base_article SET title = title;
+
+CREATE INDEX article_search_vector_gin ON knowledge_base_article USING gin (search_vector);
+"""
+
+ARTICLE_SEARCH_REVERSE_SQL = """
+DROP INDEX IF EXISTS article_search_vector_gin;
+DROP TRIGGER IF EXISTS knowledge_base_article_search_vector_trg ON knowledge_base_article;
+DROP FUNCTION IF EXISTS knowledge_base_article_search_vector();
+"""
+
+
+def postgres_sql(sql):
+    """RunPython callable that executes `sql` on PostgreSQL only."""
+
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "knowledge_base",
+            "0003_kbcategory_article_category_fk_kbsubcategory_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(
+            postgres_sql(ARTICLE_SEARCH_SQL), postgres_sql(ARTICLE_SEARCH_REVERSE_SQL)
+        ),
+    ]
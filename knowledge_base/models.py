@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 
 class KBCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -72,5 +73,8 @@ class Article(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     connectwise_id = models.IntegerField(null=True, blank=True, unique=True)
 
+    # Maintained by a database trigger (see migration 0004), never by Django
+    search_vector = SearchVectorField(null=True, editable=False)
+
     def __str__(self):
         return f"[{self.category}] {self.title}"
\ No newline at end of file
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from .models import Article, KBCategory, KBSubcategory
+from services import cache as portal_cache
+
+
+def invalidate_kb_cache(sender, **kwargs):
+    """KB home browse pages are cached (service_desk.views.kb_home); drop them on any change."""
+    portal_cache.invalidate('kb')
+
+
+for model in (Article, KBCategory, KBSubcategory):
+    post_save.connect(invalidate_kb_cache, sender=model, dispatch_uid=f'kb_cache_save_{model.__name__}')
+    post_delete.connect(invalidate_kb_cache, sender=model, dispatch_uid=f'kb_cache_delete_{model.__name__}')
@@ -1,12 +1,28 @@
 import os
 import sys
 import socket
+import importlib.util
 import django
 from waitress import serve
+
+
+def _default_db_pool_mode():
+    """Real pool when psycopg 3 + psycopg_pool are installed, else per-thread persistent connections."""
+    if importlib.util.find_spec('psycopg') and importlib.util.find_spec('psycopg_pool'):
+        return 'pool'
+    return 'persistent'
+
+
+# Must be set before settings load (config.wsgi imports them)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('PRIME_CACHE', 'file')
+os.environ.setdefault('PRIME_DB_POOL', _default_db_pool_mode())
+
 from config.wsgi import application
+from django.conf import settings
+from services import health_service, retention_service
 
 # Initialize Django to access version info
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
 def start_server():
@@ -34,7 +50,28 @@ def start_server():
     print(f"\n[INFO] Environment: {BOLD}Production (Waitress){ENDC}")
     print(f"[INFO] Django Version: {django.get_version()}")
     print(f"[INFO] Database: PostgreSQL 18.1")
-    print(f"[INFO] Threads: 32 (Enterprise Scale)")
+    print(f"[INFO] Threads: {settings.WAITRESS_THREADS} (Enterprise Scale)")
+    print(f"[INFO] Cache: {settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]} ({settings.PRIME_CACHE})")
+
+    # Warm up one connection (opens the pool) and report what we got
+    database = health_service.database_status()
+    conn = health_service.connection_stats()
+    print(f"\n{CYAN}--- DATABASE CONNECTIONS ---{ENDC}")
+    print(f"Mode:           {conn['mode']} (health checks {'on' if conn['health_checks'] else 'off'})")
+    if conn['pool']:
+        pool = conn['pool']
+        print(f"Pool:           {pool['pool_size']} open / {pool['pool_available']} idle (min {pool['pool_min']}, max {pool['pool_max']})")
+    elif conn['mode'] == 'persistent':
+        print(f"Persistent:     up to {settings.WAITRESS_THREADS} (one per thread, recycled after {conn['conn_max_age']}s)")
+    if database['ok']:
+        print(f"Round-trip:     {database['latency_ms']} ms")
+    else:
+        print(f"Round-trip:     FAILED ({database['error']})")
+    print(f"Health:         http://localhost:8000/health/")
+
+    if settings.RETENTION_INTERVAL_HOURS > 0:
+        retention_service.start_scheduler(settings.RETENTION_INTERVAL_HOURS)
+        print(f"Retention:      every {settings.RETENTION_INTERVAL_HOURS:g}h (read notifications > {settings.NOTIFICATION_RETENTION_DAYS} days)")
     
     print(f"\n{CYAN}--- NETWORK ACCESS ---{ENDC}")
     print(f"Local Access:   http://localhost:8000")
@@ -49,7 +86,7 @@ def start_server():
     print("\n" + "-"*58 + "\n")
 
     # Start Waitress on 0.0.0.0 to listen to the whole network
-    serve(application, host='0.0.0.0', port=8000, threads=32, channel_timeout=60)
+    serve(application, host='0.0.0.0', port=8000, threads=settings.WAITRESS_THREADS, channel_timeout=60)
 
 if __name__ == "__main__":
     start_server()
\ No newline at end of file
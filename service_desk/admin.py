@@ -2,15 +2,15 @@ from django.contrib import admin
 from .models import (
     Ticket, Comment, UserProfile, GlobalSettings, 
     CSATSurvey, Notification, ServiceBoard, 
-    ServiceType, ServiceSubtype, ServiceItem
+    ServiceType, ServiceSubtype, ServiceItem, SystemLogEntry
 )
 
 # --- TAXONOMY ADMIN (ConnectWise Architecture) ---
 
 @admin.register(ServiceBoard)
 class ServiceBoardAdmin(admin.ModelAdmin):
-    list_display = ('name', 'sort_order', 'is_active', 'created_at')
-    list_editable = ('sort_order', 'is_active')
+    list_display = ('name', 'sort_order', 'auto_assign', 'is_active', 'created_at')
+    list_editable = ('sort_order', 'auto_assign', 'is_active')
     search_fields = ('name', 'description')
     filter_horizontal = ('members', 'restricted_groups', 'allowed_types')
 
@@ -119,4 +119,11 @@ class GlobalSettingsAdmin(admin.ModelAdmin):
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('user', 'title', 'is_read', 'created_at')
     list_filter = ('is_read', 'created_at')
-    search_fields = ('title', 'message', 'user__username')
\ No newline at end of file
+    search_fields = ('title', 'message', 'user__username')
+
+@admin.register(SystemLogEntry)
+class SystemLogEntryAdmin(admin.ModelAdmin):
+    list_display = ('timestamp', 'user', 'action', 'target')
+    list_filter = ('action', 'timestamp')
+    search_fields = ('user', 'action', 'target', 'details')
+    readonly_fields = ('timestamp', 'user', 'action', 'target', 'details')
@@ -15,89 +15,22 @@ Usage:
     variables become available in ALL templates automatically.
 """
 
-from services import ticket_service
-from service_desk.models import GlobalSettings
+from django.core.handlers.asgi import ASGIRequest
+
+from services import settings_service
 
 
 def global_system_health(request):
     """
     Injects global settings and system health data into every template context.
 
-    This function ensures that the GlobalSettings model is used as the single source of truth
-    for system announcements and vendor statuses.
+    GlobalSettings is the single source of truth for system announcements and
+    vendor statuses. The template-ready structure (vendor colors, summary pill)
+    is built once per settings change by services.settings_service, so a warm
+    render costs no queries.
     """
-    # Fetch the GlobalSettings object, or create a default one if it doesn't exist
-    settings = GlobalSettings.objects.first()
-    if not settings:
-        settings = GlobalSettings.objects.create()
-
-    # Define mappings for status priorities and colors (all lowercase keys)
-    status_priority = {
-        'major outage': 3,
-        'partial outage': 2,
-        'degraded performance': 1,
-        'operational': 0,
-    }
-    status_colors = {
-        'operational': 'text-green-500',
-        'degraded performance': 'text-orange-500',
-        'partial outage': 'text-orange-600',
-        'major outage': 'text-red-600',
-    }
-
-    # Initialize vendor summary stats
-    non_operational_count = 0
-    worst_status = 'operational'  # Default to operational
-
-    # robustly handle the list by assigning it locally
-    vendor_list = settings.vendor_status if settings.vendor_status else []
-
-    # Process vendor statuses
-    for vendor in vendor_list:
-        # Normalize status
-        status_key = vendor.get('status', 'operational').lower()
-
-        # Inject UI data (Color and Title Case Text)
-        vendor['ui_color'] = status_colors.get(status_key, 'text-red-600')  # Default to red if unknown
-        vendor['display_status'] = status_key.title()  # Capitalize for display
-
-        # Calculate summary stats
-        priority = status_priority.get(status_key, 0)
-        if priority > 0:  # Non-operational statuses have priority > 0
-            non_operational_count += 1
-            if priority > status_priority[worst_status]:
-                worst_status = status_key
-
-    # Determine summary color and label based on worst status
-    summary_color = status_colors.get(worst_status, 'text-green-500')
-    
-    if worst_status == 'major outage':
-        label = f"{non_operational_count} Service{'s' if non_operational_count > 1 else ''} Down"
-    elif worst_status in ['partial outage', 'degraded performance']:
-        label = f"{non_operational_count} Service{'s' if non_operational_count > 1 else ''} Degraded"
-    else:
-        label = "All Systems Operational"
-
-    # Create the vendor summary dictionary
-    vendor_summary = {
-        "count": non_operational_count,
-        "color": summary_color,
-        "label": label,
-    }
-
-    # Return the context structure
     return {
-        'system_health': {
-            'announcement': {
-                'title': settings.announcement_title,
-                'message': settings.announcement_message,
-                'type': settings.announcement_type,
-                'start_datetime': settings.announcement_start,
-                'end_datetime': settings.announcement_end,
-            },
-            'vendor_status': vendor_list,  # Return the modified list
-            'vendor_summary': vendor_summary,
-        }
+        'system_health': settings_service.get_system_health()
     }
 
 
@@ -105,8 +38,8 @@ def site_configuration(request):
     """
     Injects global site configuration into every template context.
     
-    This function loads the singleton GlobalSettings model and exposes
-    it to all templates, providing access to:
+    This function exposes the cached singleton GlobalSettings model
+    to all templates, providing access to:
         - Feature toggles (maintenance_mode, use_mock_data)
         - KB recommendation logic
         - Support contact information
@@ -126,10 +59,22 @@ def site_configuration(request):
                     - support_hours (str)
             }
     """
-    # Load the singleton GlobalSettings instance
-    config = GlobalSettings.load()
-    
-    # Return as a dictionary (Django will merge this into the template context)
     return {
-        'site_config': config
-    }
\ No newline at end of file
+        'site_config': settings_service.get_site_settings()
+    }
+
+
+def notification_channel(request):
+    """
+    Tells the notification bell how to stay current.
+
+    Pages served by the ASGI application (config/asgi.py) open a Server-Sent
+    Events stream and receive badge/notification pushes. Under WSGI (Waitress,
+    runserver) a stream would pin a worker thread, so the bell keeps polling.
+
+    Returns:
+        {'notification_push': bool}
+    """
+    return {
+        'notification_push': isinstance(request, ASGIRequest)
+    }
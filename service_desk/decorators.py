@@ -0,0 +1,39 @@
+"""
+View Decorators for the Service Desk App
+
+versioned_partial:
+    Conditional GET for polled HTMX partials. The ETag is built from the
+    requesting user's version stamps (services.stamp_service), so a repeat
+    poll with a matching If-None-Match gets 304 Not Modified without running
+    the view. Apply it under @login_required:
+
+        @login_required
+        @versioned_partial(stamp_service.TICKETS)
+        def dashboard_stats(request): ...
+"""
+
+from functools import wraps
+
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from services import stamp_service
+
+
+def versioned_partial(*scopes):
+    def etag_func(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return None
+        return stamp_service.etag(request.user.pk, scopes)
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            # Per-user content: the browser may keep it but must revalidate every poll
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
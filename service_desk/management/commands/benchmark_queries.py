@@ -0,0 +1,189 @@
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from service_desk.models import Ticket, Comment, Notification, ServiceBoard
+from services import counter_service, rollup_service
+
+User = get_user_model()
+
+# --- CONFIGURATION ---
+DAYS_BACK = 365
+CLOSED_STATUSES = ['Resolved', 'Closed', 'Cancelled']
+OPEN_STATUSES = ['New', 'User Commented', 'Work In Progress', 'Reopened', 'Assigned', 'In Progress', 'Awaiting User Reply', 'On Hold']
+
+# Indexes added for the hot paths (service_desk 0009). --compare drops these
+# inside a rolled-back transaction to produce the "before" numbers.
+INDEX_PLAN_MODELS = [Ticket, Comment, Notification]
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+class Command(BaseCommand):
+    help = 'Seeds N synthetic tickets (rolled back afterwards) and reports EXPLAIN plans and p50/p95 timings for the hot view queries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickets', type=int, default=5000, help='Number of synthetic tickets to seed.')
+        parser.add_argument('--runs', type=int, default=25, help='Timed executions per query.')
+        parser.add_argument('--explain', action='store_true', help='Print the EXPLAIN plan for each query.')
+        parser.add_argument('--compare', action='store_true', help='Also measure with the index plan dropped (before/after).')
+        parser.add_argument('--keep', action='store_true', help='Commit the seeded rows instead of rolling them back.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING("--- QUERY BENCHMARK ---"))
+
+        with transaction.atomic():
+            ctx = self._seed(options['tickets'])
+
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    for model in INDEX_PLAN_MODELS:
+                        cursor.execute(f"ANALYZE {model._meta.db_table};")
+
+            if options['compare']:
+                with transaction.atomic():
+                    self._drop_index_plan()
+                    before = self._run_suite(ctx, options, "WITHOUT index plan")
+                    transaction.set_rollback(True)
+
+            after = self._run_suite(ctx, options, "WITH index plan")
+
+            if options['compare']:
+                self._print_comparison(before, after)
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        if options['keep']:
+            # bulk_create and .update() skip the signals: rebuild what they would maintain
+            rollup_service.rebuild_daily_stats()
+            counter_service.reconcile(ctx['submitter_ids'])
+            self.stdout.write(self.style.SUCCESS("SUCCESS: Benchmark data kept."))
+        else:
+            self.stdout.write(self.style.SUCCESS("SUCCESS: Benchmark complete (seed data rolled back)."))
+
+    # --- SEEDING ---
+    def _seed(self, count):
+        self.stdout.write(f" > Seeding {count} tickets...")
+        submitters = [
+            User.objects.get_or_create(username=f"bench.user{i}", defaults={'first_name': 'Bench', 'last_name': f'User{i}'})[0]
+            for i in range(50)
+        ]
+        techs = [
+            User.objects.get_or_create(username=f"bench.tech{i}", defaults={'first_name': 'Bench', 'last_name': f'Tech{i}', 'is_staff': True})[0]
+            for i in range(8)
+        ]
+        boards = [ServiceBoard.objects.get_or_create(name=f"Benchmark Board {i}")[0] for i in range(4)]
+
+        statuses = OPEN_STATUSES + ['Resolved'] * 12 + ['Closed'] * 4 + ['Cancelled']
+        tickets = Ticket.objects.bulk_create(
+            [
+                Ticket(
+                    title=f"Benchmark Ticket {i}",
+                    description="Synthetic ticket for query benchmarking.",
+                    submitter=random.choice(submitters),
+                    technician=random.choice(techs + [None]),
+                    board=random.choice(boards),
+                    status=random.choice(statuses),
+                )
+                for i in range(count)
+            ],
+            batch_size=1000,
+        )
+
+        # auto_now_add stamps "now" on insert; spread creation dates over a year
+        now = timezone.now()
+        by_day = {}
+        for t in tickets:
+            by_day.setdefault(t.pk % DAYS_BACK, []).append(t.pk)
+        for days_ago, ids in by_day.items():
+            Ticket.objects.filter(pk__in=ids).update(created_at=now - timedelta(days=days_ago))
+
+        Comment.objects.bulk_create(
+            [
+                Comment(ticket=t, author=random.choice(techs), text="Benchmark note.")
+                for t in tickets[:1000] for _ in range(3)
+            ],
+            batch_size=1000,
+        )
+        Notification.objects.bulk_create(
+            [
+                Notification(user=random.choice(techs + submitters), title="Benchmark", message="Synthetic alert.",
+                             is_read=random.random() < 0.8)
+                for _ in range(count * 2)
+            ],
+            batch_size=1000,
+        )
+
+        return {
+            'submitter': submitters[0],
+            'submitter_ids': [u.id for u in submitters],
+            'tech': techs[0],
+            'board_ids': [b.id for b in boards[:2]],
+            'ticket_id': tickets[0].pk,
+            'now': now,
+        }
+
+    def _drop_index_plan(self):
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model in INDEX_PLAN_MODELS:
+                for index in model._meta.indexes:
+                    cursor.execute(editor.sql_delete_index % {
+                        'table': editor.quote_name(model._meta.db_table),
+                        'name': editor.quote_name(index.name),
+                    })
+
+    # --- MEASUREMENT ---
+    def _queries(self, ctx):
+        """(label, queryset, mode) for the queries behind the busiest pages and polls."""
+        user, tech = ctx['submitter'], ctx['tech']
+        return [
+            ("dashboard: open count", Ticket.objects.filter(submitter=user, status__in=OPEN_STATUSES), 'count'),
+            ("notification poll: unread count", Notification.objects.filter(user=tech, is_read=False), 'count'),
+            ("notification list: latest unread", Notification.objects.filter(user=tech, is_read=False).order_by('-created_at')[:5], 'fetch'),
+            ("workspace: open grid", Ticket.objects.filter(board__id__in=ctx['board_ids']).exclude(status__in=CLOSED_STATUSES).order_by('-created_at')[:100], 'fetch'),
+            ("workspace: my open tickets", Ticket.objects.filter(Q(technician=tech)).exclude(status__in=CLOSED_STATUSES), 'fetch'),
+            ("manager: 30d created range", Ticket.objects.filter(created_at__gte=ctx['now'] - timedelta(days=30)), 'count'),
+            ("ticket_detail: comments", Comment.objects.filter(ticket_id=ctx['ticket_id']).order_by('created_at'), 'fetch'),
+            ("registry: first page", Ticket.objects.order_by('-created_at')[:25], 'fetch'),
+        ]
+
+    def _run_suite(self, ctx, options, label):
+        self.stdout.write(f"\n{label}")
+        self.stdout.write("-" * 72)
+        results = {}
+        for name, qs, mode in self._queries(ctx):
+            samples = []
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                if mode == 'count':
+                    qs.count()
+                else:
+                    list(qs.all())
+                samples.append((time.perf_counter() - started) * 1000)
+
+            p50, p95 = _percentile(samples, 50), _percentile(samples, 95)
+            results[name] = (p50, p95)
+            self.stdout.write(f"{name:<40} p50 {p50:8.2f} ms   p95 {p95:8.2f} ms")
+
+            if options['explain']:
+                for line in qs.explain().splitlines():
+                    self.stdout.write(f"    {line}")
+        return results
+
+    def _print_comparison(self, before, after):
+        self.stdout.write("\nBEFORE -> AFTER (p95)")
+        self.stdout.write("-" * 72)
+        for name, (_, p95_after) in after.items():
+            p95_before = before[name][1]
+            change = (p95_before / p95_after) if p95_after else 0
+            self.stdout.write(f"{name:<40} {p95_before:8.2f} -> {p95_after:8.2f} ms  ({change:.1f}x)")
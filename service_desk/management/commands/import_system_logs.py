@@ -0,0 +1,64 @@
+import json
+import os
+from datetime import timezone as dt_timezone
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from service_desk.models import SystemLogEntry
+from services.ticket_service import SYSTEM_LOG_FILE
+
+
+class Command(BaseCommand):
+    help = 'One-time import of the legacy data/system_logs.json audit file into SystemLogEntry.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=os.path.join(settings.BASE_DIR, 'data', SYSTEM_LOG_FILE),
+                            help='Path to the legacy JSON log file.')
+        parser.add_argument('--archive', action='store_true',
+                            help='Rename the file to *.imported once the import succeeds.')
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if not os.path.exists(path):
+            raise CommandError(f"Log file not found: {path}")
+
+        self.stdout.write(f"--- Importing system logs from {path} ---")
+        with open(path, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+        if not isinstance(legacy, list):
+            raise CommandError("Expected a JSON list of log entries.")
+
+        # Re-running is safe: entries already present (same timestamp/user/action/target) are skipped
+        existing = set(SystemLogEntry.objects.values_list('timestamp', 'user', 'action', 'target'))
+
+        entries, skipped = [], 0
+        for row in legacy:
+            ts = parse_datetime(row.get('timestamp') or '')
+            if ts is None:
+                skipped += 1
+                continue
+            if timezone.is_naive(ts):
+                ts = timezone.make_aware(ts, dt_timezone.utc)
+            entry = SystemLogEntry(
+                timestamp=ts,
+                user=str(row.get('user') or 'unknown')[:150],
+                action=str(row.get('action') or '')[:100],
+                target=str(row.get('target') or '')[:255],
+                details=str(row.get('details') or ''),
+            )
+            key = (entry.timestamp, entry.user, entry.action, entry.target)
+            if key in existing:
+                skipped += 1
+                continue
+            existing.add(key)
+            entries.append(entry)
+
+        SystemLogEntry.objects.bulk_create(entries, batch_size=1000)
+        self.stdout.write(f" > Imported {len(entries)} entries ({skipped} skipped).")
+
+        if options['archive']:
+            os.replace(path, path + '.imported')
+            self.stdout.write(f" > Archived legacy file to {path}.imported")
+
+        self.stdout.write(self.style.SUCCESS("SUCCESS: System log import complete."))
@@ -0,0 +1,75 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = ('Fire concurrent requests at a URL through the full Django stack and report latency, '
+            'throughput and how many new database connections were opened.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=settings.WAITRESS_THREADS,
+                            help='Concurrent worker threads (defaults to WAITRESS_THREADS).')
+        parser.add_argument('--requests', type=int, default=500, help='Total requests to send.')
+        parser.add_argument('--path', default='/health/', help='URL to request.')
+        parser.add_argument('--baseline', action='store_true',
+                            help='Disable connection reuse for this run (per-request connect) to compare against.')
+
+    def handle(self, *args, **options):
+        threads, total, path = options['threads'], options['requests'], options['path']
+        if threads < 1 or total < 1:
+            raise CommandError("--threads and --requests must be positive.")
+
+        db = connections.settings['default']
+        saved = {'CONN_MAX_AGE': db.get('CONN_MAX_AGE', 0), 'pool': db.get('OPTIONS', {}).get('pool')}
+        if options['baseline']:
+            db['CONN_MAX_AGE'] = 0
+            db.get('OPTIONS', {}).pop('pool', None)
+        mode = 'baseline (no reuse)' if options['baseline'] else settings.PRIME_DB_POOL
+
+        opened = []
+        lock = threading.Lock()
+
+        def on_connect(sender, connection, **kwargs):
+            with lock:
+                opened.append(connection.alias)
+
+        def fire(_):
+            started = time.perf_counter()
+            response = Client(HTTP_HOST='localhost').get(path)
+            # The test Client skips the request_finished cleanup the WSGI handler does;
+            # run it so CONN_MAX_AGE / pool return behave as they do under Waitress
+            close_old_connections()
+            elapsed = time.perf_counter() - started
+            return elapsed, response.status_code
+
+        self.stdout.write(f"--- Load test: {total} x GET {path} on {threads} threads [{mode}] ---")
+        connection_created.connect(on_connect)
+        try:
+            wall_start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='loadtest') as pool:
+                results = list(pool.map(fire, range(total)))
+            wall = time.perf_counter() - wall_start
+        finally:
+            connection_created.disconnect(on_connect)
+            db['CONN_MAX_AGE'] = saved['CONN_MAX_AGE']
+            if saved['pool'] is not None:
+                db.setdefault('OPTIONS', {})['pool'] = saved['pool']
+
+        latencies = sorted(r[0] * 1000 for r in results)
+        errors = sum(1 for r in results if r[1] >= 400)
+        p95 = latencies[max(0, int(round(len(latencies) * 0.95)) - 1)]
+
+        self.stdout.write(f" > Throughput:      {total / wall:.1f} req/s ({wall:.2f}s wall)")
+        self.stdout.write(f" > Latency p50/p95: {statistics.median(latencies):.1f} / {p95:.1f} ms")
+        self.stdout.write(f" > New connections: {len(opened)} for {total} requests")
+        if errors:
+            self.stdout.write(self.style.WARNING(f" > {errors} responses had status >= 400"))
+        self.stdout.write(self.style.SUCCESS("SUCCESS: Load test complete."))
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from services import retention_service
+
+
+def _size(num_bytes):
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+    for unit in ('KB', 'MB', 'GB'):
+        num_bytes /= 1024
+        if num_bytes < 1024 or unit == 'GB':
+            return f"{num_bytes:.1f} {unit}"
+
+
+class Command(BaseCommand):
+    help = 'Archives read notifications past the retention window to gzip JSONL and deletes them in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.NOTIFICATION_RETENTION_DAYS,
+                            help='Keep read notifications newer than this many days.')
+        parser.add_argument('--batch-size', type=int, default=retention_service.DEFAULT_BATCH_SIZE,
+                            help='Rows archived and deleted per transaction.')
+        parser.add_argument('--no-archive', action='store_true', help='Delete without writing an archive file.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be removed.')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError("--days must be >= 0 and --batch-size >= 1.")
+
+        self.stdout.write(f"--- Notification retention (read, older than {options['days']} days) ---")
+        report = retention_service.run_locked(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            archive=not options['no_archive'],
+            dry_run=options['dry_run'],
+        )
+        if report is None:
+            raise CommandError("Another retention pass is already running.")
+
+        if options['dry_run']:
+            self.stdout.write(f" > {report['rows']} notification(s) created before {report['cutoff']:%Y-%m-%d} would be removed.")
+            return
+
+        self.stdout.write(f" > Deleted {report['rows']} row(s) ({_size(report['payload_bytes'])} of row data).")
+        if report['archive_path']:
+            self.stdout.write(f" > Archive: {report['archive_path']} ({_size(report['archive_bytes'])})")
+        if report['table_bytes_before'] is not None:
+            reclaimed = report['table_bytes_before'] - report['table_bytes_after']
+            self.stdout.write(
+                f" > Table size: {_size(report['table_bytes_before'])} -> {_size(report['table_bytes_after'])}"
+                f" ({_size(max(reclaimed, 0))} reclaimed; run VACUUM to return dead space to PostgreSQL)"
+            )
+        self.stdout.write(self.style.SUCCESS("SUCCESS: Notification retention complete."))
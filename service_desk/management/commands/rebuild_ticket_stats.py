@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from services import rollup_service
+
+
+def _parse_day(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}' (expected YYYY-MM-DD).")
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds (or backfills) the TicketDailyStat rollup from the Ticket table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD). Default: beginning of history.')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD). Default: today.')
+        parser.add_argument('--days', type=int, help='Shortcut: rebuild only the last N days.')
+
+    def handle(self, *args, **options):
+        start_day = _parse_day(options['start']) if options['start'] else None
+        end_day = _parse_day(options['end']) if options['end'] else None
+
+        if options['days']:
+            end_day = timezone.localdate()
+            start_day = end_day - timedelta(days=options['days'] - 1)
+
+        if start_day and end_day and start_day > end_day:
+            raise CommandError("--start must be on or before --end.")
+
+        label = f"{start_day or 'beginning'} -> {end_day or 'today'}"
+        self.stdout.write(f"--- Rebuilding ticket rollup ({label}) ---")
+
+        written = rollup_service.rebuild_daily_stats(start_day, end_day)
+
+        self.stdout.write(self.style.SUCCESS(f"SUCCESS: Wrote {written} rollup row(s)."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from services import counter_service
+
+
+class Command(BaseCommand):
+    help = 'Recomputes UserTicketCounters from the Ticket table and corrects any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only reconcile this user id (repeatable). Default: every user.')
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+        label = ', '.join(str(u) for u in user_ids) if user_ids else 'all users'
+        self.stdout.write(f"--- Reconciling ticket counters ({label}) ---")
+
+        checked, corrected = counter_service.reconcile(user_ids)
+
+        self.stdout.write(f" > Checked {checked} user(s), {corrected} drifted.")
+        self.stdout.write(self.style.SUCCESS("SUCCESS: Ticket counters reconciled."))
@@ -10,6 +10,7 @@ from service_desk.models import (
     Ticket, Comment, CSATSurvey, ServiceBoard, 
     ServiceType, ServiceSubtype, ServiceItem, UserProfile
 )
+from services import rollup_service
 
 User = get_user_model()
 
@@ -328,4 +329,8 @@ class Command(BaseCommand):
                 if created_count % 50 == 0:
                     self.stdout.write(f"   ... {created_count} tickets created")
 
+        # 5. REBUILD ROLLUP (timestamps were back-dated via .update(), which skips signals)
+        self.stdout.write(" > Rebuilding Ticket Rollup...")
+        rollup_service.rebuild_daily_stats()
+
         self.stdout.write(self.style.SUCCESS(f"SUCCESS: Generated {created_count} Tickets with Back to the Future cast."))
\ No newline at end of file
@@ -0,0 +1,170 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_daily_stats(apps, schema_editor):
+    """Seed the rollup from existing tickets (same grouping as rebuild_ticket_stats)."""
+    Ticket = apps.get_model("service_desk", "Ticket")
+    TicketDailyStat = apps.get_model("service_desk", "TicketDailyStat")
+
+    closed_q = Q(closed_at__isnull=False)
+    responded_q = Q(first_response_at__isnull=False)
+    rows = (
+        Ticket.objects.annotate(
+            bucket=TruncDate("created_at", tzinfo=timezone.get_default_timezone())
+        )
+        .values("bucket", "board", "type", "technician", "status", "priority")
+        .annotate(
+            n=Count("id"),
+            resolved=Count("id", filter=closed_q),
+            resolution=Sum(F("closed_at") - F("created_at"), filter=closed_q),
+            responded=Count("id", filter=responded_q),
+            first_response=Sum(
+                F("first_response_at") - F("created_at"), filter=responded_q
+            ),
+        )
+        .order_by()
+    )
+
+    TicketDailyStat.objects.bulk_create(
+        [
+            TicketDailyStat(
+                day=r["bucket"],
+                board_id=r["board"],
+                type_id=r["type"],
+                technician_id=r["technician"],
+                status=r["status"],
+                priority=r["priority"],
+                ticket_count=r["n"],
+                resolved_count=r["resolved"],
+                resolution_seconds=(
+                    int(r["resolution"].total_seconds()) if r["resolution"] else 0
+                ),
+                responded_count=r["responded"],
+                first_response_seconds=(
+                    int(r["first_response"].total_seconds())
+                    if r["first_response"]
+                    else 0
+                ),
+            )
+            for r in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service_desk", "0007_ticket_collaborators"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketDailyStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("status", models.CharField(max_length=30)),
+                ("priority", models.CharField(max_length=30)),
+                ("ticket_count", models.IntegerField(default=0)),
+                (
+                    "resolved_count",
+                    models.IntegerField(
+                        default=0, help_text="Tickets with a closed_at timestamp."
+                    ),
+                ),
+                (
+                    "resolution_seconds",
+                    models.BigIntegerField(
+                        default=0, help_text="Sum of (closed_at - created_at)."
+                    ),
+                ),
+                (
+                    "responded_count",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Tickets with a first_response_at timestamp.",
+                    ),
+                ),
+                (
+                    "first_response_seconds",
+                    models.BigIntegerField(
+                        default=0, help_text="Sum of (first_response_at - created_at)."
+                    ),
+                ),
+                (
+                    "board",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="service_desk.serviceboard",
+                    ),
+                ),
+                (
+                    "technician",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "type",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="service_desk.servicetype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ticket Daily Stat",
+                "verbose_name_plural": "Ticket Daily Stats",
+                "indexes": [
+                    models.Index(
+                        fields=["technician", "day"], name="ticket_daily_stat_tech_day"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=(
+                            "day",
+                            "board",
+                            "type",
+                            "technician",
+                            "status",
+                            "priority",
+                        ),
+                        name="ticket_daily_stat_key",
+                        nulls_distinct=False,
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
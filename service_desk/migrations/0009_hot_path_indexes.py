@@ -0,0 +1,64 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service_desk", "0008_ticketdailystat"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["ticket", "created_at"], name="comment_ticket_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "is_read", "-created_at"],
+                name="notif_user_read_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(fields=["status"], name="ticket_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(fields=["created_at"], name="ticket_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["submitter", "status"], name="ticket_submitter_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["technician", "status"], name="ticket_tech_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["board", "status"], name="ticket_board_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                condition=models.Q(
+                    ("status__in", ["Resolved", "Closed", "Cancelled"]), _negated=True
+                ),
+                fields=["board", "-created_at"],
+                name="ticket_open_board_idx",
+            ),
+        ),
+    ]
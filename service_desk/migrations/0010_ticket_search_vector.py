@@ -0,0 +1,87 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:59
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# The trigger keeps search_vector current on every INSERT and on any UPDATE
+# that touches a searched column, so bulk_create()/update() stay covered.
+TICKET_SEARCH_SQL = """
+CREATE OR REPLACE FUNCTION service_desk_ticket_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('english', concat_ws(' ',
+            NEW.application_name, NEW.computer_name, NEW.asset_tag, NEW.software_name
+        )), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER service_desk_ticket_search_vector_trg
+    BEFORE INSERT OR UPDATE OF title, description, application_name, computer_name, asset_tag, software_name, search_vector
+    ON service_desk_ticket
+    FOR EACH ROW EXECUTE FUNCTION service_desk_ticket_search_vector();
+
+UPDATE service_desk_ticket SET title = title;
+
+CREATE INDEX ticket_search_vector_gin ON service_desk_ticket USING gin (search_vector);
+"""
+
+TICKET_SEARCH_REVERSE_SQL = """
+DROP INDEX IF EXISTS ticket_search_vector_gin;
+DROP TRIGGER IF EXISTS service_desk_ticket_search_vector_trg ON service_desk_ticket;
+DROP FUNCTION IF EXISTS service_desk_ticket_search_vector();
+"""
+
+# Django emits UPPER(col::text) LIKE UPPER('%q%') for icontains on PostgreSQL,
+# so the trigram indexes are built on that same expression.
+USER_TRIGRAM_SQL = """
+CREATE INDEX IF NOT EXISTS auth_user_username_trgm ON auth_user USING gin (UPPER(username::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS auth_user_first_name_trgm ON auth_user USING gin (UPPER(first_name::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS auth_user_last_name_trgm ON auth_user USING gin (UPPER(last_name::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS auth_user_email_trgm ON auth_user USING gin (UPPER(email::text) gin_trgm_ops);
+"""
+
+USER_TRIGRAM_REVERSE_SQL = """
+DROP INDEX IF EXISTS auth_user_username_trgm;
+DROP INDEX IF EXISTS auth_user_first_name_trgm;
+DROP INDEX IF EXISTS auth_user_last_name_trgm;
+DROP INDEX IF EXISTS auth_user_email_trgm;
+"""
+
+
+def postgres_sql(sql):
+    """RunPython callable that executes `sql` on PostgreSQL only."""
+
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("service_desk", "0009_hot_path_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="ticket",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(
+            postgres_sql(TICKET_SEARCH_SQL), postgres_sql(TICKET_SEARCH_REVERSE_SQL)
+        ),
+        migrations.RunPython(
+            postgres_sql(USER_TRIGRAM_SQL), postgres_sql(USER_TRIGRAM_REVERSE_SQL)
+        ),
+    ]
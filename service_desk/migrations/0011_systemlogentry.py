@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service_desk", "0010_ticket_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SystemLogEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "timestamp",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("user", models.CharField(db_index=True, max_length=150)),
+                ("action", models.CharField(db_index=True, max_length=100)),
+                ("target", models.CharField(blank=True, max_length=255)),
+                ("details", models.TextField(blank=True)),
+            ],
+            options={
+                "verbose_name": "System Log Entry",
+                "verbose_name_plural": "System Log Entries",
+                "ordering": ["-timestamp", "-id"],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Free-text log search is icontains, i.e. UPPER(col::text) LIKE UPPER('%q%').
+# pg_trgm is installed by 0010.
+SYSLOG_TRIGRAM_SQL = """
+CREATE INDEX IF NOT EXISTS syslog_target_trgm ON service_desk_systemlogentry USING gin (UPPER(target::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS syslog_details_trgm ON service_desk_systemlogentry USING gin (UPPER(details::text) gin_trgm_ops);
+"""
+
+SYSLOG_TRIGRAM_REVERSE_SQL = """
+DROP INDEX IF EXISTS syslog_target_trgm;
+DROP INDEX IF EXISTS syslog_details_trgm;
+"""
+
+
+def postgres_sql(sql):
+    """RunPython callable that executes `sql` on PostgreSQL only."""
+
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service_desk", "0011_systemlogentry"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="systemlogentry",
+            name="action",
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name="systemlogentry",
+            name="timestamp",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name="systemlogentry",
+            name="user",
+            field=models.CharField(max_length=150),
+        ),
+        migrations.AddIndex(
+            model_name="systemlogentry",
+            index=models.Index(
+                fields=["timestamp", "id"], name="syslog_timestamp_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="systemlogentry",
+            index=models.Index(
+                fields=["user", "timestamp"], name="syslog_user_timestamp_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="systemlogentry",
+            index=models.Index(
+                fields=["action", "timestamp"], name="syslog_action_timestamp_idx"
+            ),
+        ),
+        migrations.RunPython(
+            postgres_sql(SYSLOG_TRIGRAM_SQL), postgres_sql(SYSLOG_TRIGRAM_REVERSE_SQL)
+        ),
+    ]
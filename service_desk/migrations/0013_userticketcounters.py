@@ -0,0 +1,91 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+OPEN_STATUSES = (
+    "New",
+    "User Commented",
+    "Work In Progress",
+    "Reopened",
+    "Assigned",
+    "In Progress",
+    "Awaiting User Reply",
+    "On Hold",
+)
+
+
+def backfill_counters(apps, schema_editor):
+    """Seed counters for every submitter (same query as reconcile_ticket_counters)."""
+    Ticket = apps.get_model("service_desk", "Ticket")
+    UserTicketCounters = apps.get_model("service_desk", "UserTicketCounters")
+
+    rows = (
+        Ticket.objects.values("submitter")
+        .annotate(
+            total=Count("id"),
+            open=Count("id", filter=Q(status__in=OPEN_STATUSES)),
+            resolved=Count("id", filter=Q(status__in=("Resolved", "Cancelled"))),
+            awaiting=Count("id", filter=Q(status="Resolved", survey__isnull=True)),
+        )
+        .order_by()
+    )
+
+    UserTicketCounters.objects.bulk_create(
+        [
+            UserTicketCounters(
+                user_id=r["submitter"],
+                total_count=r["total"],
+                open_count=r["open"],
+                resolved_count=r["resolved"],
+                awaiting_survey_count=r["awaiting"],
+            )
+            for r in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("service_desk", "0012_systemlog_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserTicketCounters",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="ticket_counters",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("total_count", models.IntegerField(default=0)),
+                ("open_count", models.IntegerField(default=0)),
+                (
+                    "resolved_count",
+                    models.IntegerField(default=0, help_text="Resolved or Cancelled."),
+                ),
+                (
+                    "awaiting_survey_count",
+                    models.IntegerField(
+                        default=0, help_text="Resolved tickets without a CSAT survey."
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "User Ticket Counters",
+                "verbose_name_plural": "User Ticket Counters",
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:18
+
+import re
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+LEGACY_EVENTS = {"New Ticket Assigned": "assigned", "Ticket Resolved": "resolved"}
+TICKET_LINK = re.compile(r"^/ticket/(\d+)/$")
+
+
+def backfill_ticket_events(apps, schema_editor):
+    """
+    Tag legacy ticket notifications with (ticket, event) from their title and
+    link, then mark all but the newest unread duplicate as read so the
+    one-unread-per-(user, ticket, event) constraint can be added.
+    """
+    Notification = apps.get_model("service_desk", "Notification")
+    Ticket = apps.get_model("service_desk", "Ticket")
+    postgres = schema_editor.connection.vendor == "postgresql"
+    if postgres:
+        # Check the new FK immediately; pending deferred checks would block the
+        # CREATE INDEX for the constraint below in the same transaction
+        schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+    tagged = []
+    legacy = Notification.objects.filter(title__in=LEGACY_EVENTS).only(
+        "id", "title", "link"
+    )
+    for note in legacy.iterator(chunk_size=2000):
+        match = TICKET_LINK.match(note.link or "")
+        if match:
+            note.ticket_id = int(match.group(1))
+            note.event = LEGACY_EVENTS[note.title]
+            tagged.append(note)
+
+    existing = set(
+        Ticket.objects.filter(id__in={n.ticket_id for n in tagged}).values_list(
+            "id", flat=True
+        )
+    )
+    tagged = [n for n in tagged if n.ticket_id in existing]
+    Notification.objects.bulk_update(tagged, ["ticket", "event"], batch_size=1000)
+
+    seen, duplicates = set(), []
+    unread = (
+        Notification.objects.filter(is_read=False, ticket__isnull=False)
+        .order_by("-created_at", "-id")
+        .values_list("id", "user_id", "ticket_id", "event")
+    )
+    for pk, *key in unread.iterator(chunk_size=2000):
+        if tuple(key) in seen:
+            duplicates.append(pk)
+        else:
+            seen.add(tuple(key))
+    for start in range(0, len(duplicates), 1000):
+        Notification.objects.filter(id__in=duplicates[start : start + 1000]).update(
+            is_read=True
+        )
+
+    if postgres:
+        schema_editor.execute("SET CONSTRAINTS ALL DEFERRED")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service_desk", "0013_userticketcounters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="event",
+            field=models.CharField(
+                blank=True,
+                choices=[("assigned", "Assigned"), ("resolved", "Resolved")],
+                max_length=30,
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="ticket",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="notifications",
+                to="service_desk.ticket",
+            ),
+        ),
+        migrations.RunPython(backfill_ticket_events, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="notification",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_read", False), ("ticket__isnull", False)),
+                fields=("user", "ticket", "event"),
+                name="notif_unread_ticket_event_uniq",
+            ),
+        ),
+    ]
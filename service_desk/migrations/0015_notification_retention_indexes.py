@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service_desk", "0014_notification_ticket_event"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="notif_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", True)),
+                fields=["created_at"],
+                name="notif_read_created_idx",
+            ),
+        ),
+    ]
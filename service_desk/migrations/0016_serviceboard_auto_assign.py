@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service_desk", "0015_notification_retention_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="serviceboard",
+            name="auto_assign",
+            field=models.BooleanField(
+                default=False,
+                help_text="Assign new, unassigned tickets to the board member with the fewest open tickets.",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="serviceboard",
+            name="auto_route_types",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Ticket Types (names or ids) that route here by default. Prefix with 'subtype:' or 'item:' to route a Subtype or Item instead.",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service_desk", "0016_serviceboard_auto_assign"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(fields=["updated_at"], name="ticket_updated_idx"),
+        ),
+    ]
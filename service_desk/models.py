@@ -1,13 +1,17 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User, Group  # Added Group import
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.core.validators import FileExtensionValidator, MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from PIL import Image
 # Using standard JSONField as we are in a Django environment that supports it
 # (PostgreSQL or SQLite with modern Django versions)
 from django.db.models import JSONField 
+from django.contrib.postgres.search import SearchVectorField
+
+from services import routing_service
 
 
 # --- FILE VALIDATORS ---
@@ -85,8 +89,17 @@ class ServiceBoard(models.Model):
     # Hierarchy: Which Types are available on this Board?
     allowed_types = models.ManyToManyField(ServiceType, related_name='boards', blank=True)
     
-    # Routing Logic: Legacy JSON field (kept for backward compat or complex routing)
-    auto_route_types = JSONField(default=list, blank=True, help_text="List of Ticket Types that route here by default")
+    # Routing Logic: compiled into the routing table (see services/routing_service.py)
+    auto_route_types = JSONField(
+        default=list,
+        blank=True,
+        help_text="Ticket Types (names or ids) that route here by default. "
+                  "Prefix with 'subtype:' or 'item:' to route a Subtype or Item instead.",
+    )
+    auto_assign = models.BooleanField(
+        default=False,
+        help_text="Assign new, unassigned tickets to the board member with the fewest open tickets.",
+    )
     
     # Sorting Field
     sort_order = models.PositiveIntegerField(default=0, help_text="Order in which to display the board")
@@ -225,23 +238,153 @@ class Ticket(models.Model):
         help_text="Timestamp when the ticket was resolved/closed."
     )
 
+    # --- Full-Text Search ---
+    # Maintained by a database trigger (see migration 0010), never by Django
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Service Ticket'
         verbose_name_plural = 'Service Tickets'
+        # Hot filters: dashboards, workspace grid, registry and the 30s polls.
+        # Benchmark with `python manage.py benchmark_queries --compare`.
+        indexes = [
+            models.Index(fields=['status'], name='ticket_status_idx'),
+            models.Index(fields=['created_at'], name='ticket_created_idx'),
+            models.Index(fields=['updated_at'], name='ticket_updated_idx'),  # Workspace delta sync
+            models.Index(fields=['submitter', 'status'], name='ticket_submitter_status_idx'),
+            models.Index(fields=['technician', 'status'], name='ticket_tech_status_idx'),
+            models.Index(fields=['board', 'status'], name='ticket_board_status_idx'),
+            models.Index(
+                fields=['board', '-created_at'],
+                name='ticket_open_board_idx',
+                condition=~models.Q(status__in=['Resolved', 'Closed', 'Cancelled']),
+            ),
+        ]
 
     def __str__(self):
         return f"#{self.id} - {self.title}"
 
+    # Fields mirrored into TicketDailyStat (see services/rollup_service.py)
+    ROLLUP_FIELDS = (
+        'created_at', 'board_id', 'type_id', 'technician_id',
+        'status', 'priority', 'closed_at', 'first_response_at',
+    )
+
+    # Fields mirrored into UserTicketCounters (see services/counter_service.py)
+    COUNTER_FIELDS = ('submitter_id', 'status')
+
+    # Persisted state post_save receivers compare against (transitions such as
+    # "moved into Resolved"); refreshed by save() once every receiver has run
+    TRANSITION_FIELDS = ('status', 'technician_id')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Remember the persisted rollup/counter state so post_save can apply a delta
+        instance = super().from_db(db, field_names, values)
+        if all(f in field_names for f in cls.ROLLUP_FIELDS):
+            instance._rollup_snapshot = instance.rollup_state()
+        if all(f in field_names for f in cls.COUNTER_FIELDS):
+            instance._counter_snapshot = instance.counter_state()
+        if all(f in field_names for f in cls.TRANSITION_FIELDS):
+            instance._saved_state = instance.transition_state()
+        return instance
+
+    def rollup_state(self):
+        return {f: getattr(self, f) for f in self.ROLLUP_FIELDS}
+
+    def counter_state(self):
+        return {f: getattr(self, f) for f in self.COUNTER_FIELDS}
+
+    def transition_state(self):
+        return {f: getattr(self, f) for f in self.TRANSITION_FIELDS}
+
+    @property
+    def saved_state(self):
+        """TRANSITION_FIELDS as last loaded or saved; None for new or hand-built tickets."""
+        return getattr(self, '_saved_state', None)
+
     def save(self, *args, **kwargs):
-        # Fallback Logic: If no board is set, try to default to Tier 1
-        if not self.board:
-            # Fallback: Tier 1 (if it exists)
-            t1 = ServiceBoard.objects.filter(name__icontains='Tier 1').first()
-            if t1:
-                self.board = t1
-                    
-        super().save(*args, **kwargs)
+        # Fallback Logic: If no board is set, route by item/subtype/type or default to Tier 1
+        # (compiled routing table: no query once warm, see services/routing_service.py)
+        if not self.board_id:
+            self.board_id = routing_service.resolve_board_id(
+                self.type_id, self.subtype_id, self.item_id, self.legacy_ticket_type
+            )
+            # A partial save (services/ticket_mutation.py) must still persist the routed board
+            if kwargs.get('update_fields') is not None and self.board_id:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'board'}
+        # New, unassigned tickets on an auto-assign board go to the least-loaded member
+        if self._state.adding and not self.technician_id and self.board_id:
+            self.technician_id = routing_service.assign_technician(self.board_id)
+
+        # One transaction for the row and the post_save bookkeeping (rollup, counters)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self._saved_state = self.transition_state()
+
+
+class TicketDailyStat(models.Model):
+    """
+    Materialized daily rollup of ticket volume and timing.
+    One row per (day, board, type, technician, status, priority), keyed on the
+    local creation date. Maintained incrementally by service_desk.signals and
+    rebuilt with `python manage.py rebuild_ticket_stats`.
+    """
+    day = models.DateField()
+
+    # Plain references (no FK constraint) so deleting a board/type/user never
+    # collapses two rollup keys into one
+    board = models.ForeignKey(ServiceBoard, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+')
+    type = models.ForeignKey(ServiceType, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+')
+    technician = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=30)
+    priority = models.CharField(max_length=30)
+
+    # Measures
+    ticket_count = models.IntegerField(default=0)
+    resolved_count = models.IntegerField(default=0, help_text="Tickets with a closed_at timestamp.")
+    resolution_seconds = models.BigIntegerField(default=0, help_text="Sum of (closed_at - created_at).")
+    responded_count = models.IntegerField(default=0, help_text="Tickets with a first_response_at timestamp.")
+    first_response_seconds = models.BigIntegerField(default=0, help_text="Sum of (first_response_at - created_at).")
+
+    class Meta:
+        verbose_name = 'Ticket Daily Stat'
+        verbose_name_plural = 'Ticket Daily Stats'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'board', 'type', 'technician', 'status', 'priority'],
+                name='ticket_daily_stat_key',
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['technician', 'day'], name='ticket_daily_stat_tech_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} - {self.status} ({self.ticket_count})"
+
+
+class UserTicketCounters(models.Model):
+    """
+    Denormalized per-submitter ticket counts for the user dashboard header.
+    Maintained transactionally by service_desk.signals (ticket create, status
+    change, delete; CSAT survey create/delete) and repaired in bulk with
+    `python manage.py reconcile_ticket_counters`.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='ticket_counters')
+    total_count = models.IntegerField(default=0)
+    open_count = models.IntegerField(default=0)
+    resolved_count = models.IntegerField(default=0, help_text="Resolved or Cancelled.")
+    awaiting_survey_count = models.IntegerField(default=0, help_text="Resolved tickets without a CSAT survey.")
+
+    class Meta:
+        verbose_name = 'User Ticket Counters'
+        verbose_name_plural = 'User Ticket Counters'
+
+    def __str__(self):
+        return f"{self.user_id}: {self.open_count} open / {self.total_count} total"
 
 
 class Comment(models.Model):
@@ -256,6 +399,9 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['ticket', 'created_at'], name='comment_ticket_created_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author} on #{self.ticket.id}"
@@ -516,8 +662,16 @@ class GlobalSettings(models.Model):
 class Notification(models.Model):
     """
     User notification model.
+    Ticket notifications carry (ticket, event) so services.notification_dispatcher
+    can keep at most one unread row per (user, ticket, event).
     """
+    class Event(models.TextChoices):
+        ASSIGNED = 'assigned', 'Assigned'
+        RESOLVED = 'resolved', 'Resolved'
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    ticket = models.ForeignKey(Ticket, on_delete=models.SET_NULL, null=True, blank=True, related_name='notifications')
+    event = models.CharField(max_length=30, choices=Event.choices, blank=True)
     title = models.CharField(max_length=255)
     message = models.TextField()
     link = models.CharField(max_length=255, blank=True, null=True) # e.g., /ticket/902/
@@ -526,6 +680,48 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ticket', 'event'],
+                condition=models.Q(is_read=False, ticket__isnull=False),
+                name='notif_unread_ticket_event_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_read_created_idx'),
+            # Notification history (keyset on created_at, id) and the retention scan
+            models.Index(fields=['user', '-created_at', '-id'], name='notif_user_created_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(is_read=True), name='notif_read_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.user.username}: {self.title}"
+
+
+class SystemLogEntry(models.Model):
+    """
+    Append-only audit trail shown on the System Logs page.
+    Written by services.ticket_service.log_system_event (one INSERT per event).
+    `user` is stored as a username so entries survive account deletion.
+    """
+    timestamp = models.DateTimeField(default=timezone.now)
+    user = models.CharField(max_length=150)
+    action = models.CharField(max_length=100)
+    target = models.CharField(max_length=255, blank=True)
+    details = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-timestamp', '-id']
+        verbose_name = 'System Log Entry'
+        verbose_name_plural = 'System Log Entries'
+        # Keyset pagination on (timestamp, id), optionally narrowed by actor/action
+        # (see services/pagination.py). Free-text search uses the trigram
+        # indexes created in migration 0012.
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='syslog_timestamp_id_idx'),
+            models.Index(fields=['user', 'timestamp'], name='syslog_user_timestamp_idx'),
+            models.Index(fields=['action', 'timestamp'], name='syslog_action_timestamp_idx'),
+        ]
 
     def __str__(self):
-        return f"Notification for {self.user.username}: {self.title}"
\ No newline at end of file
+        return f"{self.timestamp:%Y-%m-%d %H:%M} {self.user}: {self.action}"
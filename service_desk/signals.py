@@ -1,31 +1,174 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Ticket, Notification
+from .models import (
+    Ticket, Notification, GlobalSettings, CSATSurvey,
+    ServiceBoard, ServiceType, ServiceSubtype, ServiceItem
+)
+from services import counter_service, notification_broker, notification_dispatcher, rollup_service, routing_service, settings_service, stamp_service
+from services import cache as portal_cache
 
 @receiver(post_save, sender=Ticket)
-def create_ticket_notification(sender, instance, created, **kwargs):
+def create_ticket_notification(sender, instance, created, raw=False, **kwargs):
     """
     Triggers whenever a Ticket is saved.
     1. If new ticket -> Notify the Assignee (if exists).
-    2. If status changes to Resolved -> Notify the Submitter.
+    2. If status changes to Resolved -> Notify the Submitter (once per transition).
+    Rows are queued via services.notification_dispatcher and written after commit.
     """
+    if raw:
+        return
+
     # Case 1: New Ticket Assigned to Technician
-    if created and instance.technician:
-        Notification.objects.create(
-            user=instance.technician,
+    if created and instance.technician_id:
+        notification_dispatcher.dispatch(
+            user_id=instance.technician_id,
+            ticket_id=instance.id,
+            event=Notification.Event.ASSIGNED,
             title="New Ticket Assigned",
             message=f"Ticket #{instance.id}: {instance.title} has been assigned to you.",
             link=f"/ticket/{instance.id}/"
         )
 
-    # Case 2: Existing Ticket Updated (Generic check, can be expanded)
-    if not created:
-        # If resolved, notify the user
-        if instance.status == 'Resolved':
-            Notification.objects.create(
-                user=instance.submitter,
+    # Case 2: Existing Ticket moved into Resolved (Ticket.saved_state is the state
+    # before this save; Ticket.save refreshes it after every receiver has run)
+    if not created and instance.status == 'Resolved':
+        previous = instance.saved_state
+        if previous is None or previous['status'] != 'Resolved':
+            notification_dispatcher.dispatch(
+                user_id=instance.submitter_id,
+                ticket_id=instance.id,
+                event=Notification.Event.RESOLVED,
                 title="Ticket Resolved",
                 message=f"Ticket #{instance.id} has been marked as Resolved.",
                 link=f"/ticket/{instance.id}/"
-            )
\ No newline at end of file
+            )
+
+
+@receiver(post_save, sender=Notification)
+def push_notification(sender, instance, created, raw=False, **kwargs):
+    """Push the new unread count (and the row, if new) to the user's open streams."""
+    if raw:
+        return
+    new_row = instance if created else None
+    transaction.on_commit(lambda: notification_broker.notify_user(instance.user_id, new_row))
+
+
+@receiver(post_delete, sender=Notification)
+def push_notification_removed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: notification_broker.notify_user(instance.user_id))
+
+
+@receiver(post_save, sender=Ticket)
+def update_ticket_rollup(sender, instance, created, raw=False, **kwargs):
+    """
+    Keeps TicketDailyStat in step with the ticket (moves it between buckets).
+    Fixture loads (raw) are skipped; run `rebuild_ticket_stats` afterwards.
+    """
+    if raw:
+        return
+    rollup_service.record_ticket_save(instance, created)
+
+
+@receiver(post_delete, sender=Ticket)
+def remove_ticket_rollup(sender, instance, **kwargs):
+    rollup_service.record_ticket_delete(instance)
+
+
+@receiver(post_save, sender=Ticket)
+def update_ticket_counters(sender, instance, created, raw=False, **kwargs):
+    """
+    Keeps the submitter's UserTicketCounters in step (runs inside Ticket.save's
+    transaction). Fixture loads (raw) are skipped; run `reconcile_ticket_counters`.
+    """
+    if raw:
+        return
+    counter_service.record_ticket_save(instance, created)
+
+
+@receiver(post_delete, sender=Ticket)
+def remove_ticket_counters(sender, instance, **kwargs):
+    counter_service.record_ticket_delete(instance)
+
+
+@receiver(post_save, sender=Ticket)
+def update_technician_load(sender, instance, created, raw=False, **kwargs):
+    """Keeps the cached auto-assign load map (services/routing_service.py) in step."""
+    if raw:
+        return
+    routing_service.record_ticket_save(instance, created)
+
+
+@receiver(post_delete, sender=Ticket)
+def remove_technician_load(sender, instance, **kwargs):
+    routing_service.record_ticket_delete(instance)
+
+
+@receiver(post_save, sender=CSATSurvey)
+def survey_submitted(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counter_service.record_survey_change(instance, created=True)
+
+
+@receiver(post_delete, sender=CSATSurvey)
+def survey_removed(sender, instance, **kwargs):
+    counter_service.record_survey_change(instance, created=False)
+
+
+# --- VERSION STAMPS (see services/stamp_service.py) ---
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def bump_ticket_stamp(sender, instance, **kwargs):
+    """The submitter's dashboard_stats partial is stale."""
+    stamp_service.bump(stamp_service.TICKETS, instance.submitter_id)
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def bump_notification_stamp(sender, instance, **kwargs):
+    stamp_service.bump(stamp_service.NOTIFICATIONS, instance.user_id)
+
+
+@receiver(post_save, sender=GlobalSettings)
+def publish_global_settings(sender, instance, **kwargs):
+    """Rebuild the cached settings/system-health snapshot once the save commits."""
+    transaction.on_commit(lambda: settings_service.publish(instance))
+
+
+@receiver(post_delete, sender=GlobalSettings)
+def drop_global_settings(sender, instance, **kwargs):
+    transaction.on_commit(settings_service.invalidate)
+
+
+# --- CACHE INVALIDATION (see services/cache.py) ---
+TAXONOMY_MODELS = (ServiceBoard, ServiceType, ServiceSubtype, ServiceItem)
+TAXONOMY_LINKS = (
+    ServiceBoard.allowed_types.through,
+    ServiceBoard.members.through,  # Auto-assign pools (services/routing_service.py)
+    ServiceSubtype.parent_types.through,
+    ServiceItem.parent_subtypes.through,
+)
+
+
+def invalidate_taxonomy_cache(sender, **kwargs):
+    """Board/type/subtype/item dropdowns and the routing table are cached; any taxonomy edit drops them."""
+    portal_cache.invalidate('taxonomy')
+
+
+@receiver(post_save, sender=User)
+def invalidate_assignment_pools(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Deactivating (or re-enabling) a technician changes the auto-assign pools."""
+    if raw or created:
+        return  # A new user belongs to no board yet
+    if update_fields is not None and not {'is_active', 'is_staff'} & set(update_fields):
+        return  # e.g. the last_login update on every sign-in
+    if routing_service.user_changed(instance):
+        portal_cache.invalidate('taxonomy')
+
+
+for model in TAXONOMY_MODELS:
+    post_save.connect(invalidate_taxonomy_cache, sender=model, dispatch_uid=f'taxonomy_cache_save_{model.__name__}')
+    post_delete.connect(invalidate_taxonomy_cache, sender=model, dispatch_uid=f'taxonomy_cache_delete_{model.__name__}')
+for link in TAXONOMY_LINKS:
+    m2m_changed.connect(invalidate_taxonomy_cache, sender=link, dispatch_uid=f'taxonomy_cache_m2m_{link.__name__}')
@@ -1,3 +1,1186 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from services import (
+    analytics_service, counter_service, export_service, health_service, notification_broker, notification_dispatcher,
+    rollup_service, routing_service, search_service, settings_service, ticket_mutation, ticket_service,
+)
+from services import cache as portal_cache
+
+from . import views
+from .context_processors import global_system_health, site_configuration
+from .models import (
+    Comment, CSATSurvey, GlobalSettings, Notification, ServiceBoard, ServiceItem, ServiceSubtype, ServiceType, SystemLogEntry,
+    Ticket, TicketDailyStat, UserTicketCounters,
+)
+
+
+
+class QueryBudgetMixin:
+    """assert_max_queries(): fail with the executed SQL when a block goes over its query budget."""
+
+    @contextmanager
+    def assert_max_queries(self, budget, using='default'):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        if len(context) > budget:
+            statements = '\n'.join(f"  {i}. {q['sql']}" for i, q in enumerate(context.captured_queries, 1))
+            self.fail(f"{len(context)} queries executed, budget is {budget}:\n{statements}")
+
+class ManagerAnalyticsTests(TestCase):
+    """Regression tests for services.analytics_service."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='Service Desk')
+        cls.submitter = User.objects.create_user('submitter', first_name='Sam', last_name='Submitter')
+        cls.techs = []
+        for i in range(3):
+            tech = User.objects.create_user(f'tech{i}', first_name=f'Tech{i}', last_name='Member')
+            tech.groups.add(cls.group)
+            cls.techs.append(tech)
+
+    def _make_ticket(self, created_at, technician=None, status='New', closed_after=None, priority='Priority 3 - Medium'):
+        ticket = Ticket.objects.create(
+            title='Outlook Crashing',
+            description='Outlook closes on launch.',
+            submitter=self.submitter,
+            technician=technician,
+            status=status,
+            priority=priority,
+        )
+        Ticket.objects.filter(pk=ticket.pk).update(
+            created_at=created_at,
+            closed_at=created_at + closed_after if closed_after else None,
+        )
+        # Back-dating bypasses signals, so refresh the rollup like seed_tickets does
+        rollup_service.rebuild_daily_stats()
+        return ticket
+
+    def test_query_count_is_independent_of_range_and_roster(self):
+        now = timezone.now()
+        for days_ago in range(0, 60, 3):
+            self._make_ticket(now - timedelta(days=days_ago), technician=self.techs[days_ago % 3])
+
+        with self.assertNumQueries(12):
+            analytics_service.get_manager_analytics(now - timedelta(days=7), now, now=now)
+
+        # Longer range and a larger roster must not add queries
+        for i in range(3, 8):
+            User.objects.create_user(f'tech{i}').groups.add(self.group)
+        with self.assertNumQueries(12):
+            analytics_service.get_manager_analytics(now - timedelta(days=365), now, now=now)
+
+    def test_totals_trend_and_roster_stats(self):
+        now = timezone.now()
+        tech = self.techs[0]
+        self._make_ticket(now - timedelta(days=1), technician=tech, status='Resolved', closed_after=timedelta(hours=2))
+        self._make_ticket(now - timedelta(days=2), technician=tech, status='Resolved', closed_after=timedelta(hours=4))
+        self._make_ticket(now - timedelta(days=2), technician=tech, priority='Priority 1 - Critical')
+        self._make_ticket(now - timedelta(days=90), technician=tech)
+
+        analytics = analytics_service.get_manager_analytics(now - timedelta(days=7), now, now=now)
+
+        self.assertEqual(analytics['total_tickets'], 3)
+        self.assertEqual(analytics['avg_resolution_time'], '3.0 hours')
+        self.assertEqual(analytics['priority_escalations'], 1)
+        self.assertEqual(len(analytics['sla_breaches']), 1)
+        self.assertEqual(sum(analytics['trend_data']['data']), 3)
+        self.assertEqual(len(analytics['trend_data']['labels']), 8)
+
+        roster = {row['id']: row for row in analytics['roster']}
+        self.assertEqual(roster[tech.id]['stats']['open_tickets'], 2)
+        self.assertEqual(roster[self.techs[1].id]['stats']['open_tickets'], 0)
+        self.assertEqual(analytics['avg_resolution_time_by_member'], {'labels': ['Tech0'], 'data': [3.0]})
+
+    def test_single_day_range_uses_hourly_buckets(self):
+        now = timezone.now()
+        start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        self._make_ticket(start + timedelta(minutes=5))
+
+        analytics = analytics_service.get_manager_analytics(start, now, now=now)
+
+        self.assertEqual(analytics['trend_data']['labels'][0], '12am')
+        self.assertEqual(analytics['trend_data']['data'][0], 1)
+
+
+class TicketRollupTests(TestCase):
+    """TicketDailyStat must track saves/deletes exactly like a full rebuild."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.submitter = User.objects.create_user('submitter')
+        cls.tech = User.objects.create_user('tech')
+
+    def _snapshot(self):
+        fields = ('day', 'board_id', 'type_id', 'technician_id', 'status', 'priority') + rollup_service.MEASURES
+        return set(TicketDailyStat.objects.filter(ticket_count__gt=0).values_list(*fields))
+
+    def assertRollupConsistent(self):
+        incremental = self._snapshot()
+        rollup_service.rebuild_daily_stats()
+        self.assertEqual(incremental, self._snapshot())
+
+    def test_incremental_updates_match_rebuild(self):
+        ticket = Ticket.objects.create(title='VPN Connection Issue', description='Cannot connect.', submitter=self.submitter)
+        Ticket.objects.create(title='Printer Low on Toner', description='Needs cyan.', submitter=self.submitter)
+        self.assertRollupConsistent()
+
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.technician = self.tech
+        ticket.status = 'In Progress'
+        ticket.first_response_at = ticket.created_at + timedelta(minutes=10)
+        ticket.save()
+        self.assertRollupConsistent()
+
+        ticket.status = 'Resolved'
+        ticket.closed_at = ticket.created_at + timedelta(hours=3)
+        ticket.save()
+        self.assertRollupConsistent()
+
+        ticket.delete()
+        self.assertRollupConsistent()
+
+    def test_technician_summary_combines_rollup_and_today(self):
+        old = Ticket.objects.create(title='Outlook Crashing', description='Won\'t open.', submitter=self.submitter,
+                                    technician=self.tech, status='Resolved')
+        created = timezone.now() - timedelta(days=10)
+        Ticket.objects.filter(pk=old.pk).update(created_at=created, closed_at=created + timedelta(hours=2))
+        rollup_service.rebuild_daily_stats()
+
+        today = Ticket.objects.create(title='Monitor Flicker', description='Flickers.', submitter=self.submitter,
+                                      technician=self.tech, status='Resolved')
+        Ticket.objects.filter(pk=today.pk).update(closed_at=today.created_at + timedelta(hours=4))
+
+        count, avg = rollup_service.technician_resolution_summary(self.tech)
+        self.assertEqual(count, 2)
+        self.assertEqual(round(avg.total_seconds() / 3600), 3)
+
+
+class SearchServiceTests(TestCase):
+    """services.search_service must behave the same on PostgreSQL and the icontains fallback."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.submitter = User.objects.create_user('submitter', first_name='Sam', last_name='Submitter')
+        cls.tech = User.objects.create_user('tech', first_name='Terry', last_name='Fixit')
+        cls.outlook = Ticket.objects.create(title='Outlook Crashing', description='Outlook closes on launch.',
+                                            submitter=cls.submitter, technician=cls.tech)
+        cls.printer = Ticket.objects.create(title='Printer Low on Toner', description='Needs cyan.',
+                                            submitter=cls.submitter)
+
+    def test_ticket_text_and_id_lookup(self):
+        self.assertEqual(list(search_service.search_tickets('outlook')), [self.outlook])
+        self.assertEqual(list(search_service.search_tickets(f'#{self.printer.id}')), [self.printer])
+
+    def test_registry_matches_people(self):
+        results = search_service.search_tickets('Fixit', include_people=True)
+        self.assertEqual(list(results), [self.outlook])
+        self.assertEqual(search_service.search_tickets('Fixit').count(), 0)
+
+    def test_users_by_name(self):
+        self.assertEqual(list(search_service.search_users('terry')), [self.tech])
+
+    def test_omni_search_fetches_each_type_once(self):
+        with self.assertNumQueries(4):
+            results = search_service.omni_search('outlook')
+        self.assertEqual(results['tickets'], [self.outlook])
+        self.assertEqual(results['total_count'], 1)
+
+
+class OmniSearchPoolTests(TransactionTestCase):
+    """With the connection pool (and outside a transaction) the four lookups run on the shared thread pool."""
+
+    def setUp(self):
+        submitter = User.objects.create_user('submitter', first_name='Sam', last_name='Submitter')
+        self.ticket = Ticket.objects.create(title='VPN Connection Issue', description='Cannot connect.', submitter=submitter)
+
+    @override_settings(PRIME_DB_POOL='pool')
+    def test_pool_results_match_serial(self):
+        with mock.patch.object(search_service._omni_pool, 'submit', wraps=search_service._omni_pool.submit) as submit:
+            results = search_service.omni_search('vpn')
+
+        self.assertEqual(submit.call_count, 4)
+        self.assertEqual(results['tickets'], [self.ticket])
+        self.assertEqual(results['total_count'], 1)
+
+    def test_without_pooling_lookups_share_the_request_connection(self):
+        with mock.patch.object(search_service._omni_pool, 'submit') as submit:
+            results = search_service.omni_search('vpn')
+
+        submit.assert_not_called()
+        self.assertEqual(results['tickets'], [self.ticket])
+
+
+class SystemLogTests(TestCase):
+    """Audit log writes, the System Logs page and the legacy JSON importer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('marty.mcfly', 'marty@example.com', 'pw')
+
+    def test_log_event_accepts_user_or_username(self):
+        ticket_service.log_system_event(self.admin, 'User Deleted', 'doc.brown', 'Deleted user account: doc.brown')
+        ticket_service.log_system_event('biff', 'Update', 'System Health', 'Announcement set')
+        self.assertEqual(list(ticket_service.get_system_logs().values_list('user', flat=True)), ['biff', 'marty.mcfly'])
+
+    def test_log_event_truncates_to_column_limits(self):
+        entry = ticket_service.log_system_event('u' * 200, 'A' * 150, 't' * 300, 'details')
+        self.assertEqual((len(entry.user), len(entry.action), len(entry.target)), (150, 100, 255))
+
+    def test_system_logs_filters_and_sorts_in_db(self):
+        old = ticket_service.log_system_event('biff', 'Update', 'System Health', 'Old change')
+        SystemLogEntry.objects.filter(pk=old.pk).update(timestamp=timezone.now() - timedelta(days=40))
+        ticket_service.log_system_event('biff', 'User Updated', 'lorraine', 'Updated profile for user: lorraine')
+        ticket_service.log_system_event('marty.mcfly', 'User Created', 'george', 'Created user')
+
+        self.client.force_login(self.admin)
+        self.addCleanup(timezone.deactivate)  # the view activates the chosen display timezone
+        response = self.client.get(reverse('system_logs'), {'range': '7d', 'q': 'user', 'sort': 'user'})
+
+        self.assertEqual([log.target for log in response.context['logs']], ['lorraine', 'george'])
+
+    def test_importer_is_idempotent(self):
+        legacy = [
+            {'id': 1, 'timestamp': '2025-12-25T20:45:26.473524Z', 'user': 'marty.mcfly',
+             'action': 'User Updated', 'target': 'stella.baines', 'details': 'Updated profile'},
+            {'id': 2, 'timestamp': 'not-a-date', 'user': 'x', 'action': 'y', 'target': 'z', 'details': ''},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'system_logs.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(legacy, f)
+            call_command('import_system_logs', file=path, stdout=open(os.devnull, 'w'))
+            call_command('import_system_logs', file=path, stdout=open(os.devnull, 'w'))
+
+        self.assertEqual(SystemLogEntry.objects.count(), 1)
+
+    def test_keyset_pages_cover_every_entry_once(self):
+        now = timezone.now()
+        SystemLogEntry.objects.bulk_create([
+            # Pairs share a timestamp so the id tie-breaker is exercised
+            SystemLogEntry(timestamp=now - timedelta(minutes=i // 2), user='biff', action='Update', target=f't{i}')
+            for i in range(120)
+        ])
+        self.client.force_login(self.admin)
+        self.addCleanup(timezone.deactivate)
+
+        response = self.client.get(reverse('system_logs'), {'range': '7d'}, HTTP_HX_REQUEST='true')
+        seen = [log.pk for log in response.context['logs']]
+        next_url = response.context['next_url']
+        while next_url:
+            response = self.client.get(reverse('system_logs') + next_url, HTTP_HX_REQUEST='true')
+            self.assertTrue(response.context['rows_only'])
+            self.assertNotContains(response, 'id="logs-table-container"')
+            seen += [log.pk for log in response.context['logs']]
+            next_url = response.context['next_url']
+
+        self.assertEqual(len(seen), 120)
+        self.assertEqual(seen, list(SystemLogEntry.objects.order_by('-timestamp', '-id').values_list('pk', flat=True)))
+
+    def test_actor_and_action_filters(self):
+        ticket_service.log_system_event('biff', 'Update', 'System Health', 'Announcement set')
+        ticket_service.log_system_event('biff', 'User Deleted', 'george', 'Deleted user')
+        ticket_service.log_system_event('marty.mcfly', 'Update', 'System Health', 'Announcement cleared')
+        self.client.force_login(self.admin)
+        self.addCleanup(timezone.deactivate)
+
+        response = self.client.get(reverse('system_logs'), {'user': 'biff', 'action': 'Update'})
+
+        self.assertEqual([log.details for log in response.context['logs']], ['Announcement set'])
+
+
+class SettingsCacheTests(TestCase):
+    """Context processors read GlobalSettings through services.settings_service."""
+
+    def setUp(self):
+        settings_service.invalidate()
+        self.addCleanup(settings_service.invalidate)
+
+    def test_warm_cache_costs_no_queries(self):
+        global_system_health(None)  # cold: loads and publishes the singleton
+
+        with self.assertNumQueries(0):
+            health = global_system_health(None)['system_health']
+            config = site_configuration(None)['site_config']
+
+        self.assertEqual(health['vendor_summary']['label'], 'All Systems Operational')
+        self.assertEqual(config.pk, 1)
+
+    def test_save_republishes_snapshot(self):
+        global_system_health(None)
+        config = GlobalSettings.load()
+        config.announcement_title = 'Azure Outage'
+        config.vendor_status = [
+            {'name': 'Azure', 'status': 'Major Outage'},
+            {'name': 'Zoom', 'status': 'Degraded Performance'},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            config.save()
+
+        with self.assertNumQueries(0):
+            health = global_system_health(None)['system_health']
+
+        self.assertEqual(health['announcement']['title'], 'Azure Outage')
+        self.assertEqual(health['vendor_summary'], {'count': 2, 'color': 'text-red-600', 'label': '2 Services Down'})
+        self.assertEqual(health['vendor_status'][1]['ui_color'], 'text-orange-500')
+
+
+class PortalCacheTests(TestCase):
+    """services.cache namespaces, invalidation hooks and counters."""
+
+    def setUp(self):
+        cache.clear()
+        portal_cache.reset_stats()
+
+    def test_get_or_set_counts_hits_and_misses(self):
+        calls = []
+        producer = lambda: calls.append(1) or None  # None is a cacheable value
+
+        for _ in range(3):
+            self.assertIsNone(portal_cache.get_or_set('demo', ('a', 1), producer))
+        portal_cache.invalidate('demo')
+        portal_cache.get_or_set('demo', ('a', 1), producer)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(portal_cache.stats()['demo'], {'hits': 2, 'misses': 2, 'hit_rate': 0.5})
+
+    def test_taxonomy_dropdown_invalidated_on_change(self):
+        user = User.objects.create_user('agent')
+        self.client.force_login(user)
+        board = ServiceBoard.objects.create(name='Tier 1 Support')
+        board.allowed_types.add(ServiceType.objects.create(name='Hardware Issue'))
+        url = reverse('hx_load_types')
+
+        self.assertContains(self.client.get(url, {'board': board.id}), 'Hardware Issue')
+        self.client.get(url, {'board': board.id})
+        board.allowed_types.add(ServiceType.objects.create(name='Printer & Scanner'))
+        self.assertContains(self.client.get(url, {'board': board.id}), 'Printer &amp; Scanner')
+
+        self.assertEqual(portal_cache.stats()['taxonomy']['hits'], 1)
+        self.assertEqual(portal_cache.stats()['taxonomy']['misses'], 2)
+
+
+class HealthCheckTests(TestCase):
+    """/health/ endpoint used by the production engine banner and monitors."""
+
+    def test_health_reports_database_and_connection_mode(self):
+        response = self.client.get(reverse('health_check'))
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload['status'], 'ok')
+        self.assertTrue(payload['database']['ok'])
+        self.assertNotIn('connections', payload)  # Staff only
+
+        self.client.force_login(User.objects.create_user('ops', is_staff=True))
+        payload = self.client.get(reverse('health_check')).json()
+        self.assertEqual(payload['connections']['mode'], 'off')
+        self.assertIsNone(payload['connections']['pool'])
+
+    def test_failure_details_stay_out_of_the_public_probe(self):
+        failure = Exception('could not connect to server "db.internal" as user "prime"')
+        with mock.patch.object(health_service.connection, 'cursor', side_effect=failure), \
+                self.assertLogs('services.health_service', 'ERROR'):
+            response = self.client.get(reverse('health_check'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'status': 'error', 'database': {'ok': False, 'error': 'unavailable'}})
+
+    def test_signed_in_probe_still_reports_503_when_the_database_is_down(self):
+        self.client.force_login(User.objects.create_user('ops', is_staff=True))
+        with mock.patch.object(health_service.connection, 'cursor', side_effect=OperationalError('down')), \
+                self.assertLogs('services.health_service', 'ERROR'):
+            response = self.client.get(reverse('health_check'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['database'], {'ok': False, 'error': 'unavailable'})
+
+
+class NotificationPushTests(TestCase):
+    """services.notification_broker fan-out and the notification_stream SSE view."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('requester')
+
+    def test_local_broker_delivers_to_subscriber_from_another_thread(self):
+        broker = notification_broker.LocalBroker()
+
+        async def scenario():
+            subscription = broker.subscribe(self.user.id)
+            publisher = threading.Thread(target=broker.publish, args=(self.user.id, {'unread_count': 4}))
+            publisher.start()
+            event = await asyncio.wait_for(subscription.next_event(), 1)
+            publisher.join()
+            subscription.close()
+            return event
+
+        self.assertEqual(asyncio.run(scenario()), {'unread_count': 4})
+        self.assertFalse(broker.has_subscribers(self.user.id))
+
+    @override_settings(PRIME_NOTIFY_BROKER='cache')
+    def test_new_notification_published_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.user, title='Ticket Resolved', message='Done')
+
+        _, event = cache.get(f"notifications:event:{self.user.id}")
+        self.assertEqual(event['unread_count'], 1)
+        self.assertEqual(event['notification']['title'], 'Ticket Resolved')
+
+    def test_stream_declines_under_wsgi(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('notification_stream'))
+        self.assertEqual(response.status_code, 204)
+        self.assertContains(self.client.get(reverse('dashboard')), 'every 30s')
+
+    async def test_stream_sends_current_badge_first(self):
+        await sync_to_async(Notification.objects.create)(user=self.user, title='New Ticket Assigned')
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('notification_stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        first = await anext(aiter(response.streaming_content))
+        await response.streaming_content.aclose()
+
+        self.assertTrue(first.startswith(b'event: badge\n'))
+        self.assertIn(b'1', first)
+
+
+class VersionedPartialTests(TestCase):
+    """ETag/304 handling for polled HTMX partials (services.stamp_service)."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('requester')
+        self.client.force_login(self.user)
+
+    def test_unchanged_partial_returns_304_without_queries(self):
+        url = reverse('dashboard_stats')
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(2):  # session + user lookup only
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(title='Printer jam', submitter=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_mark_all_read_bumps_notification_stamp(self):
+        url = reverse('get_notifications')
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.user, title='New Ticket Assigned')
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('mark_all_read'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class TicketCounterTests(TestCase):
+    """UserTicketCounters maintenance (services.counter_service) and reconciliation."""
+
+    def setUp(self):
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+        counter_service.get_counters(self.alice)
+        counter_service.get_counters(self.bob)
+
+    def counts(self, user):
+        row = UserTicketCounters.objects.get(user=user)
+        return row.total_count, row.open_count, row.resolved_count, row.awaiting_survey_count
+
+    def test_counters_follow_ticket_lifecycle(self):
+        ticket = Ticket.objects.create(title='VPN drops', submitter=self.alice)
+        Ticket.objects.create(title='New laptop', submitter=self.alice, status='Cancelled')
+        self.assertEqual(self.counts(self.alice), (2, 1, 1, 0))
+
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.status = 'Resolved'
+        ticket.save()
+        self.assertEqual(self.counts(self.alice), (2, 0, 2, 1))
+
+        CSATSurvey.objects.create(ticket=ticket, rating=5)
+        self.assertEqual(self.counts(self.alice), (2, 0, 2, 0))
+
+        ticket.submitter = self.bob
+        ticket.save()
+        self.assertEqual(self.counts(self.alice), (1, 0, 1, 0))
+        self.assertEqual(self.counts(self.bob), (1, 0, 1, 0))
+
+        ticket.delete()
+        self.assertEqual(self.counts(self.bob), (0, 0, 0, 0))
+
+    def test_reconcile_repairs_drift(self):
+        Ticket.objects.create(title='VPN drops', submitter=self.alice)
+        Ticket.objects.filter(submitter=self.alice).update(status='Resolved')  # Bypasses signals
+
+        out = StringIO()
+        call_command('reconcile_ticket_counters', stdout=out)
+
+        self.assertIn('1 drifted', out.getvalue())
+        self.assertEqual(self.counts(self.alice), (1, 0, 1, 1))
+
+    def test_dashboard_stats_reads_one_row(self):
+        Ticket.objects.create(title='VPN drops', submitter=self.alice)
+        self.client.force_login(self.alice)
+
+        with self.assertNumQueries(3):  # session, user, counters
+            response = self.client.get(reverse('dashboard_stats'))
+        self.assertEqual((response.context['open_tickets'], response.context['total_tickets']), (1, 1))
+
+
+@override_settings(PRIME_NOTIFY_DISPATCH='inline')
+class NotificationDispatchTests(TestCase):
+    """Ticket notifications go through services.notification_dispatcher."""
+
+    def setUp(self):
+        self.submitter = User.objects.create_user('requester')
+        self.tech = User.objects.create_user('tech')
+
+    def test_resolved_notifies_once_per_transition(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.create(title='VPN drops', submitter=self.submitter, technician=self.tech)
+        self.assertEqual(Notification.objects.get(user=self.tech).event, Notification.Event.ASSIGNED)
+
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        for _ in range(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                ticket.status = 'Resolved'
+                ticket.save()
+
+        resolved = Notification.objects.filter(user=self.submitter, event=Notification.Event.RESOLVED)
+        self.assertEqual(resolved.count(), 1)
+        self.assertEqual(resolved.get().ticket_id, ticket.pk)
+
+    def test_resolved_transition_does_not_depend_on_other_snapshots(self):
+        ticket = Ticket.objects.create(title='Disk full', submitter=self.submitter)
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.status = 'Resolved'
+        # Another save path refreshed the counter/rollup snapshots first
+        ticket._counter_snapshot = ticket.counter_state()
+        ticket._rollup_snapshot = ticket.rollup_state()
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.save()
+        self.assertTrue(Notification.objects.filter(user=self.submitter, event=Notification.Event.RESOLVED).exists())
+
+
+
+
+class TicketRoutingTests(TestCase):
+    """Board-less tickets are routed from the cached table in services.routing_service."""
+
+    def setUp(self):
+        cache.clear()
+        self.submitter = User.objects.create_user('requester')
+        self.printers = ServiceType.objects.create(name='Printer & Scanner')
+        self.vpn = ServiceType.objects.create(name='VPN')
+        self.tier1 = ServiceBoard.objects.create(name='Tier 1 Support', sort_order=2)
+        self.field = ServiceBoard.objects.create(
+            name='Field Services', sort_order=1, auto_route_types=['printer & scanner', self.vpn.pk],
+        )
+
+    def test_routes_by_type_then_tier1_without_queries(self):
+        routing_service.routing_table()  # Warm
+        with self.assertNumQueries(0):
+            self.assertEqual(routing_service.resolve_board_id(self.printers.pk), self.field.pk)
+            self.assertEqual(routing_service.resolve_board_id(self.vpn.pk), self.field.pk)
+            self.assertEqual(routing_service.resolve_board_id(None, legacy_type='Printer & Scanner'), self.field.pk)
+            self.assertEqual(routing_service.resolve_board_id(None), self.tier1.pk)
+
+        ticket = Ticket.objects.create(title='Paper jam', submitter=self.submitter, type=self.printers)
+        self.assertEqual(ticket.board_id, self.field.pk)
+
+    def test_board_changes_invalidate_routing(self):
+        self.assertEqual(routing_service.resolve_board_id(self.printers.pk), self.field.pk)
+        self.field.is_active = False
+        self.field.save()
+        self.assertEqual(routing_service.resolve_board_id(self.printers.pk), self.tier1.pk)
+
+        self.tier1.delete()
+        self.assertIsNone(routing_service.resolve_board_id(None))
+
+    def test_most_specific_route_wins(self):
+        toner = ServiceSubtype.objects.create(name='Toner')
+        empty = ServiceItem.objects.create(name='Toner Empty')
+        supplies = ServiceBoard.objects.create(name='Supplies', auto_route_types=[f'subtype:{toner.pk}'])
+        depot = ServiceBoard.objects.create(name='Depot', auto_route_types=['item:toner empty'])
+
+        self.assertEqual(routing_service.resolve_board_id(self.printers.pk, toner.pk, empty.pk), depot.pk)
+        self.assertEqual(routing_service.resolve_board_id(self.printers.pk, toner.pk), supplies.pk)
+        self.assertEqual(routing_service.resolve_board_id(self.printers.pk), self.field.pk)
+
+    def test_auto_assign_balances_cached_open_load(self):
+        busy = User.objects.create_user('busy', is_staff=True)
+        idle = User.objects.create_user('idle', is_staff=True)
+        for n in range(2):
+            Ticket.objects.create(title=f'Backlog {n}', submitter=self.submitter, technician=busy)
+        self.field.auto_assign = True
+        self.field.save()
+        self.field.members.set([busy, idle])
+
+        with mock.patch.object(routing_service, '_count_load', wraps=routing_service._count_load) as count:
+            assigned = [
+                Ticket.objects.create(title=f'Jam {n}', submitter=self.submitter, type=self.printers).technician_id
+                for n in range(3)
+            ]
+        self.assertEqual(assigned, [idle.pk, idle.pk, busy.pk])
+        self.assertEqual(count.call_count, 1)  # One grouped COUNT, then the cached map
+
+        # Tier 1 doesn't auto-assign
+        self.assertIsNone(Ticket.objects.create(title='Question', submitter=self.submitter).technician_id)
+
+    def auto_assign_pool(self):
+        first = User.objects.create_user('first', is_staff=True)
+        second = User.objects.create_user('second', is_staff=True)
+        self.field.auto_assign = True
+        self.field.save()
+        self.field.members.set([first, second])
+        return first, second
+
+    def jam(self):
+        return Ticket.objects.create(title='Jam', submitter=self.submitter, type=self.printers)
+
+    def test_load_follows_ticket_changes_and_recounts_each_window(self):
+        first, second = self.auto_assign_pool()
+        resolved, _ = self.jam(), self.jam()
+        resolved = Ticket.objects.get(pk=resolved.pk)
+        resolved.status = 'Resolved'
+        resolved.save()
+        self.assertEqual(routing_service.technician_load(), {first.pk: 0, second.pk: 1})
+        self.assertEqual(self.jam().technician_id, first.pk)
+
+        # Writes inside the window keep its expiry; once it ends the map is recounted
+        later = mock.Mock(time=lambda: time.time() + routing_service.LOAD_CACHE_TTL + 1)
+        with mock.patch.object(routing_service, 'time', later), \
+                mock.patch.object(routing_service, '_count_load', wraps=routing_service._count_load) as count:
+            routing_service.technician_load()
+        self.assertEqual(count.call_count, 1)
+
+    def test_deactivated_technician_leaves_the_pool(self):
+        first, second = self.auto_assign_pool()
+        self.jam()
+        second.is_active = False
+        second.save()
+        self.assertEqual([self.jam().technician_id for _ in range(3)], [first.pk] * 3)
+
+        second.is_active = True
+        second.save()
+        self.assertEqual(self.jam().technician_id, second.pk)
+
+
+@override_settings(PRIME_NOTIFY_DISPATCH='inline', PRIME_INTAKE_TOKEN='s3cret')
+class TicketIntakeTests(TestCase):
+    """JSON bulk intake (services.intake_service) creates tickets without per-row signals."""
+
+    def setUp(self):
+        self.tier1 = ServiceBoard.objects.create(name='Tier 1 Support')
+        self.hardware = ServiceType.objects.create(name='Hardware Issue', form_class_name='HardwareIssueForm')
+        self.general = ServiceType.objects.create(name='General Question')
+        self.requester = User.objects.create_user('requester', email='req@example.com')
+        self.tech = User.objects.create_user('tech', is_staff=True)
+        counter_service.get_counters(self.requester)
+
+    def post(self, tickets, **headers):
+        headers.setdefault('HTTP_AUTHORIZATION', 'Bearer s3cret')
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse('ticket_intake'), json.dumps({'source': 'Phone', 'tickets': tickets}),
+                content_type='application/json', **headers,
+            )
+
+    def item(self, n, **extra):
+        return {'type': 'General Question', 'submitter': 'req@example.com',
+                'fields': {'summary': f'Question {n}', 'description': 'Details'}, **extra}
+
+    def test_batch_reports_per_item_results(self):
+        response = self.post([
+            {'type': self.hardware.pk, 'submitter': 'requester', 'technician': self.tech.pk,
+             'fields': {'hardware_type': 'Monitor / Display', 'summary': 'No signal', 'description': 'Blank'}},
+            {'type': 'Hardware Issue', 'submitter': 'requester', 'fields': {'summary': 'Missing type'}},
+            self.item(1, submitter='nobody'),
+        ])
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual((body['status'], body['created'], body['invalid']), ('partial', 1, 2))
+        self.assertIn('hardware_type', body['results'][1]['errors'])
+        self.assertIn('submitter', body['results'][2]['errors'])
+
+        ticket = Ticket.objects.get(pk=body['results'][0]['ticket_id'])
+        self.assertEqual(ticket.title, 'Hardware Issue - No signal')
+        self.assertEqual((ticket.board, ticket.source, ticket.contact_email), (self.tier1, 'Phone', 'req@example.com'))
+        self.assertEqual(ticket.form_data['hardware_type'], 'Monitor / Display')
+
+        # Bookkeeping the post_save signals would have done
+        self.assertEqual(Notification.objects.get(user=self.tech).ticket_id, ticket.pk)
+        self.assertEqual(UserTicketCounters.objects.get(user=self.requester).open_count, 1)
+        stats = TicketDailyStat.objects.filter(ticket_count__gt=0).values_list('board_id', 'ticket_count')
+        self.assertEqual(list(stats), [(self.tier1.pk, 1)])
+
+    def test_query_count_does_not_grow_with_batch(self):
+        def queries(n):
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.post([self.item(i) for i in range(n)]).json()['created'], n)
+            return len(ctx)
+
+        queries(1)  # First batch creates the rollup bucket
+        self.assertEqual(queries(2), queries(20))  # 20 rows fit one INSERT even on SQLite
+
+    def test_oversized_values_are_rejected_per_item(self):
+        oversized = {'hardware_type': 'Monitor / Display', 'summary': 'No signal', 'description': 'Blank',
+                     'asset_tag': 'X' * 51}
+        response = self.post([
+            {'type': 'Hardware Issue', 'submitter': 'requester', 'fields': oversized},
+            self.item(1),
+        ])
+        self.assertEqual(response.status_code, 201)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['invalid', 'created'])
+        self.assertIn('asset_tag', results[0]['errors'])
+
+    def test_malformed_items_are_reported_not_fatal(self):
+        digits = User.objects.create_user(str(self.tech.pk), is_staff=True)
+        response = self.post([
+            self.item(1, submitter={'id': 1}),
+            self.item(2, type=['General Question']),
+            {**self.item(3), 'fields': ['summary']},
+            self.item(4, technician=self.requester.pk),
+            self.item(5, technician=str(self.tech.pk)),
+        ])
+        self.assertEqual(response.status_code, 201)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['invalid'] * 4 + ['created'])
+        for result, field in zip(results, ('submitter', 'type', 'fields', 'technician')):
+            self.assertIn(field, result['errors'])
+        # A digit string is a username, never a pk
+        self.assertEqual(Ticket.objects.get(pk=results[4]['ticket_id']).technician, digits)
+
+    def test_rejects_unauthorized_and_malformed_requests(self):
+        self.assertEqual(self.post([self.item(1)], HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.post([]).status_code, 400)
+        self.client.force_login(self.tech)
+        response = self.client.post(reverse('ticket_intake'), {'tickets': 'x'})
+        self.assertEqual(response.status_code, 415)
+
+
+class NotificationWorkerTests(TransactionTestCase):
+    """Background worker batches, dedupes and flushes on shutdown."""
+
+    def test_worker_bulk_writes_deduplicated_batch(self):
+        user = User.objects.create_user('tech')
+        ticket = Ticket.objects.create(title='Printer jam', submitter=user)
+        item = {'user_id': user.id, 'ticket_id': ticket.id, 'event': 'assigned',
+                'title': 'New Ticket Assigned', 'message': '', 'link': ''}
+        dispatcher = notification_dispatcher.NotificationDispatcher(flush_interval=0.05)
+
+        for _ in range(5):
+            dispatcher.submit(dict(item))
+        dispatcher.submit(dict(item, event='resolved', title='Ticket Resolved'))
+        dispatcher.shutdown()
+
+        self.assertEqual(
+            sorted(Notification.objects.values_list('event', flat=True)), ['assigned', 'resolved']
+        )
+
+
+class NotificationRetentionTests(TestCase):
+    """prune_notifications archives old read rows and leaves the rest."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('requester')
+        old = timezone.now() - timedelta(days=400)
+        self.expired = [
+            Notification.objects.create(user=self.user, title=f'Old {i}', is_read=True) for i in range(3)
+        ]
+        self.kept_unread = Notification.objects.create(user=self.user, title='Old unread')
+        self.kept_recent = Notification.objects.create(user=self.user, title='Recent', is_read=True)
+        Notification.objects.exclude(pk=self.kept_recent.pk).update(created_at=old)
+
+    def test_prune_archives_and_deletes_in_batches(self):
+        archive_dir = self.enterContext(tempfile.TemporaryDirectory())
+
+        with self.settings(NOTIFICATION_ARCHIVE_DIR=archive_dir):
+            out = StringIO()
+            call_command('prune_notifications', days=180, batch_size=2, stdout=out)
+
+        self.assertIn('Deleted 3 row(s)', out.getvalue())
+        self.assertQuerySetEqual(
+            Notification.objects.order_by('id'), [self.kept_unread, self.kept_recent]
+        )
+        (archive,) = os.listdir(archive_dir)
+        with gzip.open(os.path.join(archive_dir, archive), 'rt', encoding='utf-8') as f:
+            archived = [json.loads(line) for line in f]
+        self.assertEqual([row['title'] for row in archived], ['Old 0', 'Old 1', 'Old 2'])
+
+    def test_dry_run_changes_nothing(self):
+        out = StringIO()
+        call_command('prune_notifications', dry_run=True, stdout=out)
+        self.assertIn('3 notification(s)', out.getvalue())
+        self.assertEqual(Notification.objects.count(), 5)
+
+    def test_history_pages_with_cursor(self):
+        self.client.force_login(self.user)
+
+        with mock.patch.object(views, 'NOTIFICATION_PAGE_SIZE', 3):
+            first = self.client.get(reverse('notification_history'))
+            second = self.client.get(reverse('notification_history') + first.context['next_url'])
+
+        self.assertEqual(len(first.context['notifications']), 3)
+        self.assertEqual(len(second.context['notifications']), 2)
+        self.assertIsNone(second.context['next_url'])
+
+    def test_mark_unread_keeps_one_unread_per_ticket_event(self):
+        ticket = Ticket.objects.create(title='VPN drops', submitter=self.user)
+        notes = [
+            Notification.objects.create(user=self.user, ticket=ticket, event='resolved', title='Ticket Resolved', is_read=True)
+            for _ in range(2)
+        ]
+        self.client.force_login(self.user)
+
+        self.client.post(reverse('notification_bulk_action'), {
+            'action': 'mark_unread', 'selected_ids': [n.pk for n in notes],
+        })
+        self.assertEqual(Notification.objects.filter(ticket=ticket, is_read=False).count(), 1)
+
+
+class TicketRegistryPagingTests(TestCase):
+    """ticket_registry keyset pages on (created_at, id) at a fixed query cost."""
+
+    def setUp(self):
+        cache.clear()
+        settings_service.get_snapshot()  # Warm the per-render settings cache
+        self.agent = User.objects.create_user('agent', is_staff=True)
+        self.client.force_login(self.agent)
+        self.tickets = [
+            Ticket.objects.create(title=f'Ticket {i}', submitter=self.agent, technician=self.agent)
+            for i in range(7)
+        ]
+
+    def test_pages_walk_newest_first_without_offset(self):
+        url = reverse('ticket_registry')
+        seen = []
+        param = ''
+        with mock.patch.object(views, 'REGISTRY_PAGE_SIZE', 3):
+            while param is not None:
+                with self.assertNumQueries(4):  # session, user, rows, count
+                    response = self.client.get(f"{url}?{param}", HTTP_HX_REQUEST='true')
+                seen += [t.pk for t in response.context['tickets']]
+                param = response.context['next_param']
+
+        self.assertEqual(seen, [t.pk for t in reversed(self.tickets)])
+        self.assertEqual(response.context['total_count'], 7)
+        self.assertFalse(response.context['total_is_estimate'])
+        self.assertContains(self.client.get(url, {'q': 'Ticket'}), 'Ticket 6')
+
+
+class TicketRegistryExportTests(TestCase):
+    """Registry exports stream the filtered result set as CSV or XLSX."""
+
+    def setUp(self):
+        self.agent = User.objects.create_user('agent', first_name='Ada', last_name='Tech', is_staff=True)
+        self.client.force_login(self.agent)
+        Ticket.objects.create(title='Printer jam', priority='P1', submitter=self.agent, technician=self.agent)
+        Ticket.objects.create(title='VPN, "again"', priority='P1', submitter=self.agent)
+        Ticket.objects.create(title='Monitor flicker', priority='P3', submitter=self.agent)
+
+    def test_csv_streams_filtered_rows(self):
+        response = self.client.get(reverse('ticket_registry_export'), {'format': 'csv', 'priority': 'P1'})
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+
+        body = b''.join(response.streaming_content).decode('utf-8-sig')
+        lines = body.splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['ID', 'Title', 'Status'])
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"VPN, ""again"""', body)
+        self.assertIn('Ada Tech', body)
+        self.assertNotIn('Monitor flicker', body)
+
+    def test_xlsx_is_a_readable_workbook(self):
+        response = self.client.get(reverse('ticket_registry_export'), {'format': 'xlsx', 'q': 'printer'})
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertIn('Printer jam', sheet)
+        self.assertNotIn('Monitor flicker', sheet)
+        self.assertEqual(sheet.count('<row '), 2)
+
+    def test_user_text_cannot_inject_formulas_or_break_the_workbook(self):
+        Ticket.objects.create(title='=HYPERLINK("http://evil")\x07', priority='P4', submitter=self.agent)
+        params = {'priority': 'P4'}
+
+        csv_body = b''.join(self.client.get(
+            reverse('ticket_registry_export'), {'format': 'csv', **params}
+        ).streaming_content).decode('utf-8-sig')
+        self.assertIn('"\'=HYPERLINK(""http://evil"")\x07"', csv_body)
+
+        archive = zipfile.ZipFile(BytesIO(b''.join(self.client.get(
+            reverse('ticket_registry_export'), {'format': 'xlsx', **params}
+        ).streaming_content)))
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertIn('<t>=HYPERLINK("http://evil")</t>', sheet)  # Inline strings are never evaluated
+        ElementTree.fromstring(sheet)  # Well-formed XML
+
+    def test_xlsx_keeps_leading_symbols_verbatim(self):
+        row = export_service._xlsx_row(2, [1, '-3 monitors dead', '+1 seat', '@team', '=SUM'])
+        texts = [t.text for t in ElementTree.fromstring(row).iter('t')]
+        self.assertEqual(texts, ['-3 monitors dead', '+1 seat', '@team', '=SUM'])
+
+    def test_requires_staff_and_known_format(self):
+        self.assertEqual(self.client.get(reverse('ticket_registry_export'), {'format': 'pdf'}).status_code, 400)
+        self.client.force_login(User.objects.create_user('requester'))
+        self.assertEqual(self.client.get(reverse('ticket_registry_export')).status_code, 302)
+
+
+
+class TicketActivityFeedTests(TestCase):
+    """The activity log pages backwards on scroll and only ever sends rows the client hasn't seen."""
+
+    def setUp(self):
+        self.agent = User.objects.create_user('agent', is_staff=True)
+        self.client.force_login(self.agent)
+        self.ticket = Ticket.objects.create(title='Long thread', submitter=self.agent)
+        self.comments = [
+            Comment.objects.create(ticket=self.ticket, author=self.agent, text=f'Note {n:02}') for n in range(25)
+        ]
+        self.activity_url = reverse('ticket_activity', args=[self.ticket.pk])
+
+    def test_detail_renders_newest_page_and_scrolls_back(self):
+        with mock.patch.object(views, 'ACTIVITY_PAGE_SIZE', 10):
+            response = self.client.get(reverse('ticket_detail', args=[self.ticket.pk]))
+            self.assertContains(response, 'Note 24')
+            self.assertNotContains(response, 'Note 14')
+            self.assertEqual(response.context['last_comment_id'], self.comments[-1].pk)
+            cursor = response.context['older_cursor']
+
+            older = self.client.get(self.activity_url, {'before': cursor})
+            self.assertEqual([c.text for c in older.context['older_comments']], [f'Note {n:02}' for n in range(5, 15)])
+            oldest = self.client.get(self.activity_url, {'before': older.context['older_cursor']})
+            self.assertIsNone(oldest.context['older_cursor'])
+            self.assertNotContains(oldest, 'activity-older')
+
+    def test_poll_and_reply_send_only_new_rows_out_of_band(self):
+        last_seen = self.comments[-1].pk
+        self.assertEqual(self.client.get(self.activity_url, {'after': last_seen}).status_code, 204)
+
+        response = self.client.post(
+            reverse('ticket_detail', args=[self.ticket.pk]),
+            {'comment': 'Fresh reply', 'after': last_seen}, HTTP_HX_REQUEST='true',
+        )
+        self.assertContains(response, 'hx-swap-oob="beforeend:#activity-log-content"')
+        self.assertContains(response, 'Fresh reply')
+        self.assertNotContains(response, 'Note 24')
+        newest = Comment.objects.latest('id').pk
+        self.assertContains(response, f'value="{newest}" hx-swap-oob="true"')
+
+
+class TicketMutationTests(TestCase):
+    """ticket_detail updates go through services.ticket_mutation: one partial save, one change event."""
+
+    def setUp(self):
+        self.agent = User.objects.create_user('agent', is_staff=True)
+        self.client.force_login(self.agent)
+        self.ticket = Ticket.objects.create(
+            title='Printer jam', submitter=self.agent, status='Awaiting User Reply', priority=Ticket.Priority.P3,
+        )
+        self.url = reverse('ticket_detail', args=[self.ticket.pk])
+        self.events = []
+        ticket_mutation.ticket_changed.connect(self._record, dispatch_uid='mutation_test')
+        self.addCleanup(ticket_mutation.ticket_changed.disconnect, dispatch_uid='mutation_test')
+
+    def _record(self, sender, **event):
+        self.events.append(event)
+
+    def _post(self, data):
+        with mock.patch.object(Ticket, 'save', autospec=True, side_effect=Ticket.save) as save:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(self.url, {'board': self.ticket.board_id or '', **data})
+        return save
+
+    def test_update_saves_changed_columns_once(self):
+        save = self._post({'priority': Ticket.Priority.P1, 'status': 'Awaiting User Reply', 'comment': 'Still jammed'})
+
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(set(save.call_args.kwargs['update_fields']), {'priority', 'status', 'updated_at'})
+        self.ticket.refresh_from_db()
+        self.assertEqual((self.ticket.priority, self.ticket.status), (Ticket.Priority.P1, 'User Commented'))
+        self.assertEqual(Comment.objects.get(ticket=self.ticket).text, 'Still jammed')
+
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(self.events[0]['changes']['status'], ('Awaiting User Reply', 'User Commented'))
+        self.assertEqual(len(self.events[0]['comments']), 1)
+
+    def test_unchanged_post_writes_nothing(self):
+        save = self._post({'priority': Ticket.Priority.P3, 'status': 'Awaiting User Reply', 'technician': ''})
+        self.assertEqual(save.call_count, 0)
+        self.assertEqual(self.events, [])
+
+    def test_change_reverted_in_same_update_is_dropped(self):
+        mutation = ticket_mutation.TicketMutation(self.ticket, actor=self.agent)
+        mutation.set('priority', Ticket.Priority.P1)
+        mutation.set('priority', Ticket.Priority.P3)
+        self.assertFalse(mutation.has_changes)
+        self.assertFalse(mutation.apply())
+
+
+class WorkspaceKanbanTests(QueryBudgetMixin, TestCase):
+    """The Task Queue is one fetch of the technician's tickets, bucketed into columns in Python."""
+
+    def setUp(self):
+        cache.clear()
+        settings_service.get_snapshot()
+        self.tech = User.objects.create_user('tech', is_staff=True)
+        self.other = User.objects.create_user('other', is_staff=True)
+        self.client.force_login(self.tech)
+        self.url = reverse('workspace') + '?view=kanban'
+
+    def ticket(self, title, status, technician=None, collaborators=()):
+        ticket = Ticket.objects.create(title=title, submitter=self.other, technician=technician, status=status)
+        ticket.collaborators.add(*collaborators)
+        return ticket
+
+    def test_columns_hold_each_ticket_once(self):
+        mine = self.ticket('Mine', 'New', technician=self.tech, collaborators=[self.tech, self.other])
+        shared = self.ticket('Shared', 'In Progress', technician=self.other, collaborators=[self.tech])
+        self.ticket('Someone else', 'New', technician=self.other)
+        self.ticket('Waiting', 'Awaiting User Reply', technician=self.tech)
+        done = [self.ticket(f'Done {n}', 'Resolved', technician=self.tech) for n in range(12)]
+
+        context = self.client.get(self.url).context
+        self.assertEqual(context['kanban_new'], [mine])
+        self.assertEqual(context['kanban_progress'], [shared])
+        self.assertEqual(context['kanban_done'], done[::-1][:views.KANBAN_DONE_LIMIT])
+
+    def test_kanban_budget_is_flat(self):
+        # session, user, boards (exists + ids), tickets (+people, board), collaborators, viewer profile
+        for count in (1, 15):
+            for n in range(count):
+                self.ticket(f'{count}-{n}', 'New', technician=self.tech, collaborators=[self.other])
+            with self.assert_max_queries(7):
+                self.assertEqual(self.client.get(self.url).status_code, 200)
+
+
+class WorkspaceSyncTests(QueryBudgetMixin, TestCase):
+    """The Service Grid stays current from rows changed since the client's updated_at watermark."""
+
+    def setUp(self):
+        cache.clear()
+        settings_service.get_snapshot()
+        self.tech = User.objects.create_user('tech', is_staff=True)
+        self.client.force_login(self.tech)
+        self.board = ServiceBoard.objects.create(name='Tier 1 Support')
+        self.other_board = ServiceBoard.objects.create(name='Infrastructure')
+        self.url = reverse('workspace_sync')
+        self.since = timezone.now() - timedelta(minutes=5)
+
+    def ticket(self, title, board, status='New'):
+        return Ticket.objects.create(title=title, submitter=self.tech, technician=self.tech, board=board, status=status)
+
+    def sync(self, since=None):
+        return self.client.get(self.url, {'since': (since or self.since).isoformat(), 'boards': str(self.board.pk)})
+
+    def test_changed_rows_come_back_and_closed_or_moved_rows_are_removed(self):
+        stale = self.ticket('Stale', self.board)
+        Ticket.objects.filter(pk=stale.pk).update(updated_at=self.since - timedelta(hours=1))
+        fresh = self.ticket('Fresh', self.board)
+        closed = self.ticket('Closed', self.board, status='Resolved')
+        moved = self.ticket('Moved', self.other_board)
+
+        delta = self.sync().json()
+        self.assertEqual([row['id'] for row in delta['rows']], [fresh.pk])
+        self.assertIn(f'id="ws-row-{fresh.pk}"', delta['rows'][0]['html'])
+        self.assertEqual(sorted(delta['removed']), sorted([closed.pk, moved.pk]))
+        self.assertLess(parse_datetime(delta['watermark']), timezone.now())
+
+        self.assertEqual(self.sync(since=timezone.now()).json()['rows'], [])
+
+    def test_workspace_hands_out_a_watermark(self):
+        response = self.client.get(reverse('workspace'), {'boards': self.board.pk})
+        self.assertIsNotNone(parse_datetime(response.context['sync_watermark']))
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': '2024-13-45T00:00:00'}).status_code, 400)
+
+    def test_budget_is_flat_and_large_deltas_ask_for_reload(self):
+        # session, user, changed rows (+people, board), collaborators, removed ids
+        for count in (1, 15):
+            for n in range(count):
+                self.ticket(f'{count}-{n}', self.board)
+            with self.assert_max_queries(5):
+                self.assertEqual(self.sync().status_code, 200)
+
+        with mock.patch.object(views, 'WORKSPACE_SYNC_LIMIT', 5):
+            self.assertTrue(self.sync().json()['reload'])
+
+    def test_other_boards_do_not_count_toward_the_limit(self):
+        for n in range(10):
+            self.ticket(f'Elsewhere {n}', self.other_board)
+        mine = self.ticket('Mine', self.board)
+        with mock.patch.object(views, 'WORKSPACE_SYNC_LIMIT', 5):
+            delta = self.sync().json()
+        self.assertNotIn('reload', delta)
+        self.assertEqual([row['id'] for row in delta['rows']], [mine.pk])
+        self.assertEqual(len(delta['removed']), 10)
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Heavy pages run a fixed number of queries, however much data they show."""
+
+    def setUp(self):
+        cache.clear()
+        settings_service.get_snapshot()  # Warm the per-render settings cache
+        self.agent = User.objects.create_user('agent', is_staff=True, is_superuser=True)
+        self.client.force_login(self.agent)
+
+    def ticket_with(self, people):
+        ticket = Ticket.objects.create(title=f'{people} people', submitter=self.agent, technician=self.agent)
+        for n in range(people):
+            user = User.objects.create_user(f'user-{people}-{n}')
+            ticket.collaborators.add(user)
+            Comment.objects.create(ticket=ticket, author=user, text=f'Comment {n}')
+        return ticket
+
+    def test_ticket_detail_budget_is_flat(self):
+        # session, user, ticket (+people, board, type), collaborators, viewer profile, comments (+authors)
+        for people in (1, 15):
+            url = reverse('ticket_detail', args=[self.ticket_with(people).pk])
+            self.client.get(url)  # Warm the board picker cache
+            with self.assert_max_queries(6):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_heavy_views_stay_within_budget(self):
+        budgets = {
+            'dashboard': 6,
+            'workspace': 6,
+            'ticket_registry': 7,
+            'notification_history': 4,
+            'manager_dashboard': 3,
+        }
+        for people in (1, 15):
+            self.ticket_with(people)
+            for name, budget in budgets.items():
+                self.client.get(reverse(name))  # Warm the caches
+                with self.subTest(view=name, people=people), self.assert_max_queries(budget):
+                    self.assertEqual(self.client.get(reverse(name)).status_code, 200)
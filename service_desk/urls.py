@@ -19,6 +19,9 @@ urlpatterns = [
 
     # --- Agent Ticket Creation (Power Form) ---
     path('agent/ticket/new/', views.agent_create_ticket, name='agent_create_ticket'),
+
+    # --- Bulk Intake API (Email / Phone Integrations) ---
+    path('api/tickets/intake/', views.ticket_intake, name='ticket_intake'),
     
     # --- HTMX Helpers (Cascading Dropdowns) ---
     path('htmx/load-types/', views.hx_load_types, name='hx_load_types'),
@@ -33,9 +36,11 @@ urlpatterns = [
 
     # --- Ticket Registry ---
     path('registry/', views.ticket_registry, name='ticket_registry'),
+    path('registry/export/', views.ticket_registry_export, name='ticket_registry_export'),
 
     # --- Ticket Detail & Survey ---
     path('ticket/<int:ticket_id>/', views.ticket_detail, name='ticket_detail'),
+    path('ticket/<int:ticket_id>/activity/', views.ticket_activity, name='ticket_activity'),
     path('survey/<int:ticket_id>/', views.ticket_survey, name='ticket_survey'),
 
     # --- Asset Management ---
@@ -56,6 +61,7 @@ urlpatterns = [
     path('manager/technician/<str:name>/', views.technician_profile, name='technician_profile'),
     path('manager/csat/<str:tech_id>/', views.csat_report, name='csat_report_tech'),
     path('manager/csat/', views.csat_report, name='csat_report'),
+    path('manager/cache-stats/', views.cache_stats, name='cache_stats'),
     
     # --- NEW: Service Board Management ---
     path('manager/service-boards/', views.manage_service_boards, name='manage_service_boards'),
@@ -90,6 +96,7 @@ urlpatterns = [
 
     # --- Notifications ---
     path('notifications/poll/', views.get_notifications, name='get_notifications'),
+    path('notifications/stream/', views.notification_stream, name='notification_stream'),
     path('notifications/list/', views.notification_list, name='notification_list'),
     path('notifications/mark-read-all/', views.mark_all_read, name='mark_all_read'),
     path('notifications/history/', views.notification_history, name='notification_history'),
@@ -104,6 +111,7 @@ urlpatterns = [
     # UPDATED: Points to 'workspace' instead of 'kanban_board'
     path('workspace/', views.workspace, name='workspace'),
     path('workspace/update/', views.workspace_update, name='workspace_update'),
+    path('workspace/sync/', views.workspace_sync, name='workspace_sync'),
     
     # --- Ticket Quick View (Side Drawer) ---
     path('ticket/quick-view/<int:ticket_id>/', views.ticket_quick_view, name='ticket_quick_view'),
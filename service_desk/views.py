@@ -1,9 +1,10 @@
 ﻿from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.db.models import Q, Count, Avg, F
+from django.db.models import Q, Count, Avg, F, Prefetch
 from django.utils import timezone
 from django.views.decorators.http import require_POST
+import hmac
 import re
 import sys
 
@@ -18,25 +19,33 @@ from .models import (
     CSATSurvey, ServiceBoard, ServiceType, ServiceSubtype, ServiceItem
 )
 
-from services import ticket_service
+from services import ticket_service, analytics_service, rollup_service, search_service, pagination, settings_service, counter_service
+from services import cache as portal_cache
+from services import export_service, health_service, intake_service, notification_broker, stamp_service
+from .decorators import versioned_partial
 from datetime import datetime, timedelta
 import random
 from django.contrib.auth.models import User, Group
 from django.contrib.admin.models import LogEntry, ADDITION, CHANGE, DELETION
 from django.contrib.contenttypes.models import ContentType
 from knowledge_base.models import KBCategory, KBSubcategory, Article
-from django.db import transaction
+from django.db import DatabaseError, transaction
 import pytz
 from django.utils.dateparse import parse_datetime
 import json
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
 from django.views.decorators.csrf import csrf_exempt
 from services.ticket_service import log_system_event
+from services.ticket_mutation import TicketMutation
 import os
 
 from inventory.models import HardwareAsset
 from knowledge_base.models import Article
 from django.core.paginator import Paginator
+from django.conf import settings as django_settings
 
 # ============================================================================
 # USER DASHBOARD
@@ -47,19 +56,17 @@ def dashboard(request):
     # UPDATED: Added select_related/prefetch_related for Technician & Collaborators
     user_tickets = Ticket.objects.filter(submitter=request.user).select_related('technician', 'technician__profile').prefetch_related('collaborators').order_by('-created_at')
     
-    open_statuses = ['New', 'User Commented', 'Work In Progress', 'Reopened', 'Assigned', 'In Progress', 'Awaiting User Reply', 'On Hold']
-    resolved_statuses = ['Resolved', 'Cancelled']
+    # Header counts come from one denormalized row (services/counter_service.py)
+    counters = counter_service.get_counters(request.user)
     
-    open_tickets = user_tickets.filter(status__in=open_statuses).count()
-    resolved_tickets = user_tickets.filter(status__in=resolved_statuses).count()
-    total_tickets = user_tickets.count()
-    
-    feedback_ticket = Ticket.objects.filter(
-        submitter=request.user,
-        status='Resolved'
-    ).filter(
-        survey__isnull=True
-    ).order_by('-updated_at').first()
+    feedback_ticket = None
+    if counters.awaiting_survey_count:
+        feedback_ticket = Ticket.objects.filter(
+            submitter=request.user,
+            status='Resolved'
+        ).filter(
+            survey__isnull=True
+        ).order_by('-updated_at').first()
     
     sort_param = request.GET.get('sort', '-created_at')
     valid_sort_fields = ['id', '-id', 'title', '-title', 'ticket_type', '-ticket_type', 
@@ -69,9 +76,9 @@ def dashboard(request):
     
     context = {
         'tickets': user_tickets,
-        'open_tickets': open_tickets,
-        'resolved_tickets': resolved_tickets,
-        'total_tickets': total_tickets,
+        'open_tickets': counters.open_count,
+        'resolved_tickets': counters.resolved_count,
+        'total_tickets': counters.total_count,
         'feedback_ticket': feedback_ticket,
         'current_sort': sort_param,
     }
@@ -79,20 +86,14 @@ def dashboard(request):
     return render(request, 'service_desk/dashboard.html', context)
 
 @login_required
+@versioned_partial(stamp_service.TICKETS)
 def dashboard_stats(request):
-    user_tickets = Ticket.objects.filter(submitter=request.user)
-    
-    open_statuses = ['New', 'User Commented', 'Work In Progress', 'Reopened', 'Assigned', 'In Progress', 'Awaiting User Reply', 'On Hold']
-    resolved_statuses = ['Resolved', 'Cancelled']
-    
-    open_tickets = user_tickets.filter(status__in=open_statuses).count()
-    resolved_tickets = user_tickets.filter(status__in=resolved_statuses).count()
-    total_tickets = user_tickets.count()
+    counters = counter_service.get_counters(request.user)
     
     return render(request, 'service_desk/partials/dashboard_stats.html', {
-        'open_tickets': open_tickets,
-        'resolved_tickets': resolved_tickets,
-        'total_tickets': total_tickets,
+        'open_tickets': counters.open_count,
+        'resolved_tickets': counters.resolved_count,
+        'total_tickets': counters.total_count,
     })
 
 # ============================================================================
@@ -101,9 +102,10 @@ def dashboard_stats(request):
 
 @login_required
 def service_catalog(request):
-    settings = GlobalSettings.load()
+    settings = settings_service.get_site_settings()
 
-    articles = ticket_service.get_knowledge_base_articles()
+    # Parsed article pool is cached; the pick itself stays per-request (may be random)
+    articles = portal_cache.get_or_set('catalog', 'kb_articles', ticket_service.get_knowledge_base_articles, timeout=600)
     recommended_articles = []
 
     if articles:
@@ -321,184 +323,173 @@ def report_vp_permissions(request):
 # TICKET DETAIL & SURVEY
 # ============================================================================
 
+# Query plan for the detail page: ticket + people + board/type in one query,
+# collaborators (with profiles) in one more, comments (with authors) in one more.
+# Budget enforced by QueryBudgetTests in service_desk/tests.py.
+def _ticket_detail_queryset():
+    return Ticket.objects.select_related(
+        'submitter__profile', 'technician__profile', 'board', 'type',
+    ).prefetch_related(
+        Prefetch('collaborators', queryset=User.objects.select_related('profile')),
+    )
+
+def _ticket_comments(ticket):
+    return ticket.comments.select_related('author__profile').order_by('created_at')
+
+# The activity log renders its newest page; older pages load on scroll (?before=)
+# and new rows arrive as out-of-band appends after the client's cursor (?after=).
+ACTIVITY_PAGE_SIZE = 20
+
+def _activity_page(ticket, before=None):
+    """Newest ACTIVITY_PAGE_SIZE comments (below `before`), oldest first, plus the cursor for the page above."""
+    rows = _ticket_comments(ticket).order_by('-id')
+    if before:
+        rows = rows.filter(id__lt=before)
+    rows = list(rows[:ACTIVITY_PAGE_SIZE + 1])
+    older_cursor = None
+    if len(rows) > ACTIVITY_PAGE_SIZE:
+        rows = rows[:ACTIVITY_PAGE_SIZE]
+        older_cursor = rows[-1].id
+    rows.reverse()
+    return rows, older_cursor
+
+def _activity_context(ticket):
+    comments, older_cursor = _activity_page(ticket)
+    return {
+        'ticket': ticket,
+        'comments': comments,
+        'older_cursor': older_cursor,
+        'last_comment_id': comments[-1].id if comments else 0,
+    }
+
+def _render_activity_since(request, ticket, after):
+    """Only the comments newer than `after`, as out-of-band swaps; 204 when there are none."""
+    comments = list(_ticket_comments(ticket).filter(id__gt=after).order_by('id'))
+    if not comments:
+        return HttpResponse(status=204)
+    return render(request, 'service_desk/partials/activity_delta.html', {
+        'ticket': ticket,
+        'comments': comments,
+        'last_comment_id': comments[-1].id,
+    })
+
+@login_required
+def ticket_activity(request, ticket_id):
+    """HTMX: the activity log's poll (?after=<id>) and scroll-back pages (?before=<id>)."""
+    ticket = get_object_or_404(Ticket.objects.only('id'), id=ticket_id)
+    after = request.GET.get('after', '')
+    if after.isdigit():
+        return _render_activity_since(request, ticket, int(after))
+
+    before = request.GET.get('before', '')
+    older_comments, older_cursor = _activity_page(ticket, int(before) if before.isdigit() else None)
+    return render(request, 'service_desk/partials/activity_older.html', {
+        'ticket': ticket,
+        'older_comments': older_comments,
+        'older_cursor': older_cursor,
+    })
+
+def _active_boards():
+    """Board picker options, cached with the rest of the taxonomy."""
+    return portal_cache.get_or_set(
+        'taxonomy', ('boards', 'active'),
+        lambda: list(ServiceBoard.objects.filter(is_active=True).values('id', 'name')),
+        timeout=TAXONOMY_CACHE_TTL,
+    )
+
+def _person_json(user):
+    profile = getattr(user, 'profile', None)
+    return {
+        'id': user.id,
+        'name': user.get_full_name(),
+        'avatar': profile.avatar.url if profile and profile.avatar else f"https://ui-avatars.com/api/?name={user.first_name}+{user.last_name}&background=0D8ABC&color=fff"
+    }
+
 @login_required
 def ticket_detail(request, ticket_id):
-    ticket = get_object_or_404(Ticket, id=ticket_id)
+    ticket = get_object_or_404(_ticket_detail_queryset(), id=ticket_id)
     
     if request.method == 'POST':
         form = TicketReplyForm(request.POST)
-        changes_made = False
-        action_summary = []
-        
-        # --- 1. Collaborators Update (New) ---
-        # Get list of IDs from the multiple hidden inputs named 'collaborators'
-        new_collab_ids = request.POST.getlist('collaborators')
-        # Convert to integers for comparison
-        new_collab_ids = [int(id) for id in new_collab_ids if id.isdigit()]
-        
-        # Get current IDs
-        current_collab_ids = list(ticket.collaborators.values_list('id', flat=True))
-        
-        # Compare sorted lists to see if change occurred
-        if sorted(new_collab_ids) != sorted(current_collab_ids):
-            # Update the Many-to-Many relationship
-            ticket.collaborators.set(new_collab_ids)
-            action_summary.append("collaborators updated")
-            changes_made = True
+        actor_name = request.user.get_full_name() or request.user.username
+        # Every change below is staged, then written in one transaction with one save
+        mutation = TicketMutation(ticket, actor=request.user)
+
+        # --- 1. Collaborators Update ---
+        # Multiple hidden inputs named 'collaborators'; diffed against the prefetched set
+        new_collab_ids = [int(id) for id in request.POST.getlist('collaborators') if id.isdigit()]
+        mutation.set_collaborators(new_collab_ids)
 
         # --- 2. Standard Field Updates ---
         if request.POST.get('reopen_ticket'):
-            ticket.status = 'Reopened'
-            ticket.closed_at = None
-            action_summary.append('ticket reopened')
-            changes_made = True
-            Comment.objects.create(
-                ticket=ticket,
-                author=request.user,
-                text=f"Ticket reopened by {request.user.get_full_name() or request.user.username}.",
-                is_internal=True
-            )
+            mutation.set('status', 'Reopened')
+            mutation.set('closed_at', None)
+            mutation.add_comment(f"Ticket reopened by {actor_name}.", is_internal=True, summary='ticket reopened')
 
         elif request.POST.get('close_ticket'):
-            ticket.status = 'Resolved'
-            ticket.closed_at = timezone.now()
-            action_summary.append('ticket marked as Resolved')
-            changes_made = True
-            
-            if not ticket.technician:
-                ticket.technician = request.user
-                action_summary.append(f'assigned to {request.user.get_full_name()}')
-            
-            Comment.objects.create(
-                ticket=ticket,
-                author=request.user,
-                text=f"Ticket closed by {request.user.get_full_name() or request.user.username}.",
-                is_internal=True
-            )
+            mutation.set('status', 'Resolved')
+            mutation.set('closed_at', timezone.now())
+            mutation.add_comment(f"Ticket closed by {actor_name}.", is_internal=True, summary='ticket marked as Resolved')
+            if not ticket.technician_id:
+                mutation.set('technician_id', request.user.id, summary=f'assigned to {request.user.get_full_name()}')
 
         new_status = request.POST.get('status')
-        if new_status and new_status != ticket.status and not (request.POST.get('close_ticket') or request.POST.get('reopen_ticket')):
-            ticket.status = new_status
-            action_summary.append(f"status updated to {new_status}")
-            changes_made = True
-            if new_status in ['Resolved', 'Closed', 'Cancelled']:
-                ticket.closed_at = timezone.now()
-            elif new_status in ['New', 'Reopened', 'In Progress']:
-                ticket.closed_at = None
+        if new_status and not (request.POST.get('close_ticket') or request.POST.get('reopen_ticket')):
+            if mutation.set('status', new_status, summary=f"status updated to {new_status}"):
+                if new_status in ['Resolved', 'Closed', 'Cancelled']:
+                    mutation.set('closed_at', timezone.now())
+                elif new_status in ['New', 'Reopened', 'In Progress']:
+                    mutation.set('closed_at', None)
 
         new_priority = request.POST.get('priority')
-        if new_priority and new_priority != ticket.priority:
-            ticket.priority = new_priority
-            action_summary.append(f"priority updated to {new_priority}")
-            changes_made = True
+        if new_priority:
+            mutation.set('priority', new_priority, summary=f"priority updated to {new_priority}")
 
         new_tech_id = request.POST.get('technician')
-        if new_tech_id is not None:
-            if new_tech_id == "":
-                if ticket.technician:
-                    ticket.technician = None
-                    action_summary.append("technician unassigned")
-                    changes_made = True
-            elif str(ticket.technician_id) != new_tech_id:
-                ticket.technician_id = int(new_tech_id)
-                action_summary.append("technician updated")
-                changes_made = True
+        if new_tech_id == "":
+            mutation.set('technician_id', None, summary="technician unassigned")
+        elif new_tech_id is not None:
+            mutation.set('technician_id', int(new_tech_id), summary="technician updated")
 
         new_board_id = request.POST.get('board')
-        if new_board_id and str(ticket.board_id) != new_board_id:
-            ticket.board_id = int(new_board_id)
-            action_summary.append("board moved")
-            changes_made = True
+        if new_board_id:
+            mutation.set('board_id', int(new_board_id), summary="board moved")
 
         if form.is_valid():
             comment_text = form.cleaned_data.get('comment', '').strip()
             if comment_text:
-                Comment.objects.create(
-                    ticket=ticket,
-                    author=request.user,
-                    text=comment_text,
-                    is_internal=False
-                )
-                action_summary.append('comment added')
-                changes_made = True
-                
-                if ticket.status == 'Awaiting User Reply':
-                    ticket.status = 'User Commented'
-                    ticket.save()
+                mutation.add_comment(comment_text, summary='comment added')
+                if mutation.value('status') == 'Awaiting User Reply':
+                    mutation.set('status', 'User Commented')
 
-        if changes_made:
-            ticket.save()
-            message = f"Ticket updated: {', '.join(action_summary)}."
+        if mutation.apply():
+            message = f"Ticket updated: {', '.join(mutation.summary)}."
             if not request.headers.get('HX-Request'):
                 messages.success(request, message)
-        
+
         if request.headers.get('HX-Request'):
-            updated_comments = ticket.comments.all().order_by('created_at')
-            return render(request, 'service_desk/partials/ticket_activities.html', {
-                'comments': updated_comments, 
-                'request': request
-            })
+            # Send back only what the client hasn't seen; without a cursor, the newest page
+            after = request.POST.get('after', '')
+            if after.isdigit():
+                return _render_activity_since(request, ticket, int(after))
+            return render(request, 'service_desk/partials/ticket_activities.html', _activity_context(ticket))
 
         return redirect('ticket_detail', ticket_id=ticket_id)
 
-    comments = ticket.comments.all().order_by('created_at')
     form = TicketReplyForm(initial={'priority': ticket.priority})
     
     if ticket.attachment:
         ticket.filename = os.path.basename(ticket.attachment.name)
 
-    technicians = User.objects.filter(groups__name='Service Desk') 
-    boards = ServiceBoard.objects.filter(is_active=True)
-    status_choices = Ticket.Status.choices
-    
-    # Pre-fetch collaborators for the JS widget
-    current_collaborators = [
-        {
-            'id': u.id,
-            'name': u.get_full_name(),
-            'avatar': u.profile.avatar.url if u.profile.avatar else f"https://ui-avatars.com/api/?name={u.first_name}+{u.last_name}&background=0D8ABC&color=fff"
-        } 
-        for u in ticket.collaborators.all()
-    ]
+    # Collaborators/technician as JSON for the Alpine pickers (profiles already joined)
+    current_collaborators = [_person_json(u) for u in ticket.collaborators.all()]
+    current_tech = _person_json(ticket.technician) if ticket.technician_id else None
 
     context = {
-        'ticket': ticket,
-        'comments': comments,
+        **_activity_context(ticket),
         'form': form,
-        'technicians': technicians,
-        'boards': boards,
-        'status_choices': status_choices,
-        'current_collaborators_json': json.dumps(current_collaborators), # Pass as JSON for Alpine
-        'is_demo_mode': False,
-    }
-    
-# 1. Pre-fetch Collaborators for JS
-    current_collaborators = [
-        {
-            'id': u.id,
-            'name': u.get_full_name(),
-            'avatar': u.profile.avatar.url if u.profile.avatar else f"https://ui-avatars.com/api/?name={u.first_name}+{u.last_name}&background=0D8ABC&color=fff"
-        } 
-        for u in ticket.collaborators.all()
-    ]
-
-    # 2. Pre-fetch Technician for JS (NEW)
-    current_tech = None
-    if ticket.technician:
-        u = ticket.technician
-        current_tech = {
-            'id': u.id,
-            'name': u.get_full_name(),
-            'avatar': u.profile.avatar.url if u.profile.avatar else f"https://ui-avatars.com/api/?name={u.first_name}+{u.last_name}&background=0D8ABC&color=fff"
-        }
-
-    context = {
-        'ticket': ticket,
-        'comments': comments,
-        'form': form,
-        'technicians': technicians,
-        'boards': boards,
-        'status_choices': status_choices,
+        'boards': _active_boards(),
+        'status_choices': Ticket.Status.choices,
         'current_collaborators_json': json.dumps(current_collaborators),
         'current_tech_json': json.dumps(current_tech) if current_tech else 'null', # Pass Tech as JSON
         'is_demo_mode': False,
@@ -556,6 +547,8 @@ def management_hub(request):
     return render(request, 'service_desk/management_hub.html')
 
 
+DASHBOARD_CACHE_TTL = 60
+
 @user_passes_test(lambda u: u.is_superuser)
 def manager_dashboard(request):
     date_range = request.GET.get('range', '7d')
@@ -587,120 +580,13 @@ def manager_dashboard(request):
         except ValueError:
             pass
 
-    tickets = Ticket.objects.filter(created_at__gte=start_date, created_at__lte=end_date)
-    total_tickets = tickets.count()
-
-    resolved = tickets.filter(status__in=['Resolved', 'Closed'], closed_at__isnull=False)
-    
-    if resolved.exists():
-        avg = resolved.aggregate(t=Avg(F('closed_at') - F('created_at')))['t']
-        avg_resolution_time = f"{avg.total_seconds()/3600:.1f} hours" if avg else "0 hours"
-    else:
-        avg_resolution_time = "0 hours"
-        
-    responded = tickets.filter(first_response_at__isnull=False)
-    if responded.exists():
-        avg = responded.aggregate(t=Avg(F('first_response_at') - F('created_at')))['t']
-        first_response_time = f"{int(avg.total_seconds()/60)} mins" if avg else "N/A"
-    else:
-        first_response_time = "N/A"
-        
-    priority_escalations = tickets.filter(priority__icontains='Critical').exclude(status__in=['Resolved', 'Closed']).count()
-    
-    sla_breaches_qs = tickets.filter(priority__icontains='Critical').exclude(status__in=['Resolved', 'Closed'])
-    sla_breaches = []
-    for t in sla_breaches_qs[:5]:
-        age = (now - t.created_at).total_seconds() / 3600
-        sla_breaches.append({
-            'ticket_id': t.id,
-            'title': t.title,
-            'age_hours': round(age, 1),
-            'technician': t.technician.get_full_name() if t.technician else 'Unassigned'
-        })
-
-    days_in_range = (end_date - start_date).days + 1
-    trend_labels = []
-    trend_data = []
-    
-    for i in range(days_in_range):
-        current_day_start = start_date + timedelta(days=i)
-        current_day_end = current_day_start + timedelta(days=1)
-        
-        if current_day_start > now:
-            break
-            
-        if days_in_range <= 2:
-            label = current_day_start.strftime('%b %d') 
-        elif days_in_range <= 10:
-            label = current_day_start.strftime('%a')
-        else:
-            label = current_day_start.strftime('%b %d')
-            
-        trend_labels.append(label)
-        
-        count = Ticket.objects.filter(created_at__gte=current_day_start, created_at__lt=current_day_end).count()
-        trend_data.append(count)
-
-    roster = []
-    res_labels = []
-    res_data = []
-    
-    service_desk = Group.objects.filter(name='Service Desk').first()
-    if service_desk:
-        for member in service_desk.user_set.all():
-            open_count = Ticket.objects.filter(technician=member).exclude(status__in=['Resolved', 'Closed']).count()
-            
-            if hasattr(member, 'profile') and member.profile.prefer_initials:
-                avatar = f"https://ui-avatars.com/api/?name={member.first_name}+{member.last_name}&background=random&color=fff"
-            elif hasattr(member, 'profile') and member.profile.avatar:
-                avatar = member.profile.avatar.url
-            else:
-                avatar = f"https://ui-avatars.com/api/?name={member.first_name}+{member.last_name}&background=random&color=fff"
-            
-            roster.append({
-                'name': member.get_full_name(),
-                'role': 'Service Desk',
-                'avatar': avatar,
-                'stats': {'open_tickets': open_count},
-                'id': member.id
-            })
-            
-            tech_resolved = tickets.filter(technician=member, status__in=['Resolved', 'Closed'], closed_at__isnull=False)
-            if tech_resolved.exists():
-                avg = tech_resolved.aggregate(a=Avg(F('closed_at') - F('created_at')))['a']
-                res_labels.append(member.first_name)
-                res_data.append(round(avg.total_seconds()/3600, 1))
-
-    status_counts = tickets.values('status').annotate(c=Count('id'))
-    vol_data = {'Open': 0, 'In Progress': 0, 'Resolved': 0, 'Closed': 0}
-    for i in status_counts:
-        s = i['status']
-        if s in ['New', 'Reopened']:
-            vol_data['Open'] += i['c']
-        elif s == 'Resolved':
-            vol_data['Resolved'] += i['c']
-        elif s in ['Closed', 'Cancelled']:
-            vol_data['Closed'] += i['c']
-        else:
-            vol_data['In Progress'] += i['c']
-
-    type_counts = tickets.values('type__name').annotate(c=Count('id')).order_by('-c')[:5]
-
-    analytics = {
-        'total_tickets': total_tickets,
-        'avg_resolution_time': avg_resolution_time,
-        'first_response_time': first_response_time,
-        'priority_escalations': priority_escalations,
-        'sla_breaches': sla_breaches,
-        'volume_by_status': {'labels': list(vol_data.keys()), 'data': list(vol_data.values())},
-        'tickets_by_type': {
-            'labels': [x['type__name'] or 'Uncategorized' for x in type_counts], 
-            'data': [x['c'] for x in type_counts]
-        },
-        'trend_data': {'labels': trend_labels, 'data': trend_data},
-        'avg_resolution_time_by_member': {'labels': res_labels, 'data': res_data},
-        'roster': roster
-    }
+    # Short TTL instead of per-ticket invalidation: analytics may lag by up to a minute
+    cache_parts = ('analytics', date_range, request.GET.get('start', ''), request.GET.get('end', ''))
+    analytics = portal_cache.get_or_set(
+        'dashboard', cache_parts,
+        lambda: analytics_service.get_manager_analytics(start_date, end_date, now=now),
+        timeout=DASHBOARD_CACHE_TTL,
+    )
 
     return render(request, 'service_desk/manager_dashboard.html', {
         'analytics': analytics,
@@ -708,6 +594,29 @@ def manager_dashboard(request):
     })
 
 
+@user_passes_test(lambda u: u.is_superuser)
+def cache_stats(request):
+    """Hit/miss counters per cache namespace for this server process (services/cache.py)."""
+    return JsonResponse({
+        'backend': django_settings.CACHES['default']['BACKEND'],
+        'namespaces': portal_cache.stats(),
+    })
+
+
+def health_check(request):
+    """
+    Liveness/readiness probe for the production engine (no login).
+    503 when the database is unreachable. Error details and connection stats are staff-only.
+    """
+    try:
+        # request.user reads the session/user tables; with the database down, answer as anonymous
+        detailed = request.user.is_staff
+    except DatabaseError:
+        detailed = False
+    report = health_service.health_report(detailed=detailed)
+    return JsonResponse(report, status=200 if report['status'] == 'ok' else 503)
+
+
 @user_passes_test(lambda u: u.is_superuser)
 def admin_settings(request):
     stats = ticket_service.get_dashboard_stats()
@@ -759,17 +668,16 @@ def technician_profile(request, name):
         messages.error(request, "Technician not found.")
         return redirect('manager_dashboard')
 
-    resolved_qs = Ticket.objects.filter(technician=user, status__in=['Resolved', 'Closed'])
+    # Historical days come from the daily rollup; only today's rows are scanned live
+    resolved_count, avg_duration = rollup_service.technician_resolution_summary(user)
     
     avg_res_str = "N/A"
-    if resolved_qs.filter(closed_at__isnull=False).exists():
-        avg_duration = resolved_qs.filter(closed_at__isnull=False).aggregate(t=Avg(F('closed_at') - F('created_at')))['t']
-        if avg_duration:
-            hours = avg_duration.total_seconds() / 3600
-            if hours < 1:
-                avg_res_str = f"{int(hours * 60)} mins"
-            else:
-                avg_res_str = f"{hours:.1f} hours"
+    if avg_duration:
+        hours = avg_duration.total_seconds() / 3600
+        if hours < 1:
+            avg_res_str = f"{int(hours * 60)} mins"
+        else:
+            avg_res_str = f"{hours:.1f} hours"
 
     csat_avg = CSATSurvey.objects.filter(ticket__technician=user).aggregate(avg=Avg('rating'))['avg']
     csat_score_str = f"{csat_avg:.1f}/5" if csat_avg else "N/A"
@@ -796,7 +704,7 @@ def technician_profile(request, name):
         'avatar': avatar_url,
         'stats': {
             'open_tickets': Ticket.objects.filter(technician=user).exclude(status__in=['Resolved', 'Closed', 'Cancelled']).count(),
-            'resolved_this_month': resolved_qs.count(),
+            'resolved_this_month': resolved_count,
             'avg_response': avg_res_str,
             'csat_score': csat_score_str
         },
@@ -829,7 +737,13 @@ def kb_home(request):
     if category_filter and category_filter != 'All':
         articles = articles.filter(category=category_filter)
 
-    recent_articles = articles[:10]
+    if search_query:
+        recent_articles = articles[:10]
+    else:
+        # Browse pages are identical for everyone; invalidated on Article changes
+        recent_articles = portal_cache.get_or_set(
+            'kb', ('home', category_filter or 'All'), lambda: list(articles[:10]), timeout=600
+        )
     
     if request.headers.get('HX-Request'):
         return render(request, 'knowledge_base/partials/kb_results.html', {
@@ -1021,6 +935,8 @@ def kb_bulk_action(request):
 # SYSTEM LOGS
 # ============================================================================
 
+LOG_PAGE_SIZE = 50
+
 @user_passes_test(lambda u: u.is_superuser)
 def system_logs(request):
     NA_TIMEZONES = [
@@ -1073,52 +989,47 @@ def system_logs(request):
             except ValueError:
                 pass 
 
-    logs = ticket_service.get_system_logs()
-    processed_logs = []
-    
-    for log in logs:
-        entry = log.copy()
-        if 'timestamp' in entry:
-            dt = parse_datetime(entry['timestamp'])
-            if dt:
-                if dt.tzinfo is None:
-                    dt = pytz.utc.localize(dt)
-                entry['dt_obj'] = dt
-            else:
-                entry['dt_obj'] = timezone.now()
-        processed_logs.append(entry)
-
-    filtered_logs = []
-    for log in processed_logs:
-        log_dt = log.get('dt_obj')
-        if log_dt and start_date <= log_dt <= end_date:
-            filtered_logs.append(log)
+    actor_filter = request.GET.get('user', '').strip()
+    action_filter = request.GET.get('action', '').strip()
 
+    logs = ticket_service.get_system_logs().filter(timestamp__gte=start_date, timestamp__lte=end_date)
+    if actor_filter:
+        logs = logs.filter(user=actor_filter)
+    if action_filter:
+        logs = logs.filter(action=action_filter)
     if search_query:
-        query = search_query.lower()
-        filtered_logs = [
-            l for l in filtered_logs
-            if query in str(l.get('user', '')).lower()
-            or query in str(l.get('action', '')).lower()
-            or query in str(l.get('target', '')).lower()
-            or query in str(l.get('details', '')).lower()
-        ]
-
-    reverse = sort_param.startswith('-')
+        logs = logs.filter(
+            Q(user__icontains=search_query) |
+            Q(action__icontains=search_query) |
+            Q(target__icontains=search_query) |
+            Q(details__icontains=search_query)
+        )
+
     sort_key = sort_param.lstrip('-')
-    key_map = {'timestamp': 'timestamp', 'user': 'user', 'action': 'action'}
-    dict_key = key_map.get(sort_key, 'timestamp')
-    
-    try:
-        filtered_logs.sort(key=lambda x: x.get(dict_key, ''), reverse=reverse)
-    except:
-        pass 
+    if sort_key not in ('timestamp', 'user', 'action'):
+        sort_key = 'timestamp'
+
+    # Keyset pagination: each page (and each infinite-scroll fetch) is one LIMITed index scan
+    cursor = request.GET.get('cursor')
+    page, next_cursor = pagination.keyset_page(
+        logs, sort_key, cursor, page_size=LOG_PAGE_SIZE, descending=sort_param.startswith('-')
+    )
+
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_url = f"?{params.urlencode()}"
 
     context = {
-        'logs': filtered_logs,
+        'logs': page,
+        'next_url': next_url,
+        'rows_only': bool(cursor),
         'na_timezones': NA_TIMEZONES,
         'selected_tz': selected_tz,
         'search_query': search_query,
+        'actor_filter': actor_filter,
+        'action_filter': action_filter,
         'current_sort': sort_param,
         'current_range': date_range,
         'start_date': custom_start_str,
@@ -1507,12 +1418,65 @@ def kb_update_status(request, pk):
 # ============================================================================
 
 @login_required
+@versioned_partial(stamp_service.NOTIFICATIONS)
 def get_notifications(request):
     unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
     return render(request, 'service_desk/partials/notification_badge.html', {
         'unread_count': unread_count
     })
 
+def _sse(event, html):
+    """One Server-Sent Event; every line of the payload needs its own data: prefix."""
+    data = '\n'.join(f"data: {line}" for line in html.splitlines() or [''])
+    return f"event: {event}\n{data}\n\n"
+
+
+def _notification_events(event):
+    yield _sse('badge', render_to_string('service_desk/partials/notification_badge.html', {
+        'unread_count': event['unread_count']
+    }))
+    if event['notification']:
+        yield _sse('notification', render_to_string('service_desk/partials/notification_item.html', {
+            'note': event['notification']
+        }))
+
+
+@login_required
+async def notification_stream(request):
+    """
+    Server-Sent Events feed for the notification bell (replaces the 30s poll).
+    Sends the current badge, then a badge (and new row) on every change pushed
+    through services.notification_broker, with a comment line as heartbeat.
+    Only served under ASGI; a WSGI worker would be pinned for the whole stream,
+    so there it answers 204, which tells EventSource not to reconnect.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+
+    async def stream():
+        # Subscribe before reading the initial count so no change slips in between
+        subscription = notification_broker.subscribe(user.pk)
+        try:
+            initial = await sync_to_async(notification_broker.build_event)(user.pk)
+            for chunk in _notification_events(initial):
+                yield chunk
+            while True:
+                event = await subscription.next_event()
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                for chunk in _notification_events(event):
+                    yield chunk
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Keep reverse proxies from buffering the stream
+    return response
+
 @login_required
 def notification_list(request):
     notifications = Notification.objects.filter(user=request.user, is_read=False).order_by('-created_at')[:5]
@@ -1523,6 +1487,9 @@ def notification_list(request):
 @login_required
 def mark_all_read(request):
     Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    # update() skips the post_save hooks
+    stamp_service.bump(stamp_service.NOTIFICATIONS, request.user.id)
+    notification_broker.notify_user(request.user.id)
     return render(request, 'service_desk/partials/notification_list.html', {
         'notifications': []
     })
@@ -1557,13 +1524,22 @@ def mark_notification_read(request, notification_id):
         messages.error(request, "We couldn't take you to that specific page (the link might be outdated), so here is your Dashboard.")
         return redirect('dashboard')
 
+NOTIFICATION_PAGE_SIZE = 50
+
 @login_required
 def notification_history(request):
     from .models import Notification
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
+    notifications = Notification.objects.filter(user=request.user)
+    
+    # Keyset pages on (created_at, id): older pages cost the same as the first
+    page, next_cursor = pagination.keyset_page(
+        notifications, 'created_at', request.GET.get('cursor'), page_size=NOTIFICATION_PAGE_SIZE
+    )
     
     return render(request, 'service_desk/notification_history.html', {
-        'notifications': notifications
+        'notifications': page,
+        'next_url': f"?cursor={next_cursor}" if next_cursor else None,
+        'is_first_page': not request.GET.get('cursor'),
     })
 
 @login_required
@@ -1582,12 +1558,26 @@ def notification_bulk_action(request):
     count = qs.count()
 
     if action == 'mark_unread':
-        qs.update(is_read=False)
+        # At most one unread row per (ticket, event) (notif_unread_ticket_event_uniq)
+        unread_keys = set(
+            Notification.objects.filter(user=request.user, is_read=False, ticket__isnull=False)
+            .values_list('ticket_id', 'event')
+        )
+        reopen_ids = []
+        for pk, ticket_id, event in qs.filter(is_read=True).values_list('id', 'ticket_id', 'event'):
+            if ticket_id is None or (ticket_id, event) not in unread_keys:
+                unread_keys.add((ticket_id, event))
+                reopen_ids.append(pk)
+        Notification.objects.filter(id__in=reopen_ids).update(is_read=False)
         messages.success(request, f"Marked {count} notifications as unread.")
     elif action == 'mark_read':
         qs.update(is_read=True)
         messages.success(request, f"Marked {count} notifications as read.")
 
+    if action in ('mark_unread', 'mark_read'):
+        stamp_service.bump(stamp_service.NOTIFICATIONS, request.user.id)
+        notification_broker.notify_user(request.user.id)
+
     return redirect('notification_history')
 
 
@@ -1610,9 +1600,52 @@ def delete_notifications(request):
 # TECHNICIAN WORKSPACE
 # ============================================================================
 
+# Task Queue columns: status -> column; done tickets fill the third column
+KANBAN_COLUMNS = {
+    'kanban_new': ('New', 'Assigned', 'Reopened'),
+    'kanban_progress': ('In Progress', 'Work In Progress', 'Waiting on User'),
+}
+KANBAN_DONE_STATUSES = ('Resolved', 'Closed')
+KANBAN_DONE_LIMIT = 10
+
+# Service Grid delta sync: rows changed since the client's updated_at watermark
+GRID_CLOSED_STATUSES = ('Resolved', 'Closed', 'Cancelled')
+WORKSPACE_SYNC_LIMIT = 200
+# Watermarks trail the clock so a save that commits after the poll is still seen next time
+WORKSPACE_SYNC_OVERLAP = timedelta(seconds=10)
+
+def _sync_watermark():
+    return (timezone.now() - WORKSPACE_SYNC_OVERLAP).isoformat()
+
+def _workspace_kanban(user):
+    """
+    The Task Queue columns from one fetch: the user's open tickets (assignee or
+    collaborator) plus their most recently done ones, bucketed in Python.
+    Collaboration is an IN subquery rather than a join, so no row comes back twice.
+    """
+    collaborating = Ticket.collaborators.through.objects.filter(user_id=user.id).values('ticket_id')
+    recently_done = Ticket.objects.filter(
+        technician=user, status__in=KANBAN_DONE_STATUSES
+    ).order_by('-updated_at').values('pk')[:KANBAN_DONE_LIMIT]
+    open_statuses = [status for statuses in KANBAN_COLUMNS.values() for status in statuses]
+
+    tickets = Ticket.objects.filter(
+        (Q(technician=user) | Q(pk__in=collaborating)) & Q(status__in=open_statuses) | Q(pk__in=recently_done)
+    ).select_related(
+        'submitter__profile', 'technician__profile', 'board'
+    ).prefetch_related('collaborators').order_by('-priority', '-updated_at')
+
+    column_of = {status: column for column, statuses in KANBAN_COLUMNS.items() for status in statuses}
+    columns = {column: [] for column in (*KANBAN_COLUMNS, 'kanban_done')}
+    for ticket in tickets:
+        columns[column_of.get(ticket.status, 'kanban_done')].append(ticket)
+    columns['kanban_done'].sort(key=lambda t: t.updated_at, reverse=True)
+    return columns
+
 @login_required
 @user_passes_test(lambda u: u.is_staff)
 def workspace(request):
+    sync_watermark = _sync_watermark()  # Taken before the grid is read
     all_boards = ServiceBoard.objects.filter(is_active=True)
     
     selected_board_ids = request.GET.get('boards', '').split(',')
@@ -1649,32 +1682,65 @@ def workspace(request):
     grid_tickets = Ticket.objects.filter(
         board__id__in=selected_board_ids
     ).exclude(
-        status__in=['Resolved', 'Closed', 'Cancelled']
-    ).select_related('submitter', 'technician', 'board').prefetch_related('collaborators').order_by(db_sort_field)
-
-    # UPDATED: 'My Tickets' now includes tickets where user is Assignee OR Collaborator
-    my_tickets = Ticket.objects.filter(
-        Q(technician=request.user) | Q(collaborators=request.user)
-    ).exclude(
-        status__in=['Resolved', 'Closed', 'Cancelled']
-    ).select_related('submitter', 'technician').prefetch_related('collaborators').order_by('-priority').distinct()
-    
-    kanban_new = my_tickets.filter(status__in=['New', 'Assigned', 'Reopened'])
-    kanban_progress = my_tickets.filter(status__in=['In Progress', 'Work In Progress', 'Waiting on User'])
-    kanban_done = Ticket.objects.filter(technician=request.user, status__in=['Resolved', 'Closed']).order_by('-updated_at')[:10]
+        status__in=GRID_CLOSED_STATUSES
+    ).select_related('submitter', 'technician__profile', 'board').prefetch_related('collaborators').order_by(db_sort_field)
 
     context = {
         'all_boards': all_boards,
         'selected_board_ids': selected_board_ids,
         'grid_tickets': grid_tickets,
         'view_mode': view_mode,
-        'kanban_new': kanban_new,
-        'kanban_progress': kanban_progress,
-        'kanban_done': kanban_done,
+        'sync_watermark': sync_watermark,
     }
+    if view_mode != 'grid':
+        context.update(_workspace_kanban(request.user))
 
     return render(request, 'service_desk/workspace.html', context)
 
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+def workspace_sync(request):
+    """
+    Service Grid delta sync: ?since=<watermark>&boards=1,2 ->
+    {"watermark", "rows": [{"id", "html"}], "removed": [ids]}.
+    Changed tickets still open on the boards come back as rendered rows (the
+    client replaces or inserts them); changed tickets that closed or sit on
+    other boards are ids only, to drop if shown.
+    More than WORKSPACE_SYNC_LIMIT changed rows -> {"reload": true}.
+    """
+    try:
+        since = parse_datetime(request.GET.get('since', ''))
+    except ValueError:  # Well-formed but out of range, e.g. month 13
+        since = None
+    if since is None:
+        return JsonResponse({'status': 'error', 'message': 'Invalid watermark'}, status=400)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    board_ids = {int(id) for id in request.GET.get('boards', '').split(',') if id.isdigit()}
+
+    watermark = _sync_watermark()
+    changed = Ticket.objects.filter(updated_at__gt=since)
+    visible = list(
+        changed.filter(board_id__in=board_ids).exclude(status__in=GRID_CLOSED_STATUSES)
+        .select_related('submitter', 'technician__profile', 'board')
+        .prefetch_related('collaborators')
+        .order_by('updated_at')[:WORKSPACE_SYNC_LIMIT + 1]
+    )
+    if len(visible) > WORKSPACE_SYNC_LIMIT:
+        return JsonResponse({'reload': True, 'watermark': watermark})
+
+    # The row only needs request.user; skip the context processors per row
+    rows = [
+        {'id': ticket.id, 'html': render_to_string(
+            'service_desk/partials/workspace_row.html', {'ticket': ticket, 'request': request}
+        )}
+        for ticket in visible
+    ]
+    removed = list(
+        changed.filter(Q(status__in=GRID_CLOSED_STATUSES) | ~Q(board_id__in=board_ids)).values_list('id', flat=True)
+    )
+    return JsonResponse({'watermark': watermark, 'rows': rows, 'removed': removed})
+
 @login_required
 @user_passes_test(lambda u: u.is_staff)
 @csrf_exempt
@@ -1704,6 +1770,44 @@ def workspace_update(request):
             
     return JsonResponse({'status': 'invalid method'}, status=400)
 
+def _intake_authorized(request):
+    token = django_settings.PRIME_INTAKE_TOKEN
+    header = request.headers.get('Authorization', '')
+    if token and header.startswith('Bearer '):
+        return hmac.compare_digest(header[len('Bearer '):].encode(), token.encode())
+    return request.user.is_authenticated and request.user.is_staff
+
+@csrf_exempt
+@require_POST
+def ticket_intake(request):
+    """
+    JSON bulk intake for email/phone integrations:
+    {"source": "Email", "tickets": [...]} -> per-item results (see services/intake_service.py).
+    """
+    if not _intake_authorized(request):
+        return JsonResponse({'status': 'error', 'message': 'Not authorized'}, status=403)
+    # JSON only: a cross-site form can't send it without a CORS preflight
+    if request.content_type != 'application/json':
+        return JsonResponse({'status': 'error', 'message': 'Expected application/json'}, status=415)
+
+    try:
+        payload = json.loads(request.body)
+        if not isinstance(payload, dict):
+            raise ValueError("Expected a JSON object.")
+        results = intake_service.create_tickets(
+            payload.get('tickets'), source=payload.get('source', Ticket.Source.EMAIL)
+        )
+    except (ValueError, intake_service.IntakeError) as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    created = sum(1 for r in results if r['status'] == 'created')
+    return JsonResponse({
+        'status': 'success' if created == len(results) else 'partial',
+        'created': created,
+        'invalid': len(results) - created,
+        'results': results,
+    }, status=201 if created else 400)
+
 @user_passes_test(lambda u: u.is_superuser)
 def manage_service_boards(request):
     boards = ServiceBoard.objects.all()
@@ -1864,22 +1968,33 @@ def agent_create_ticket(request):
 
 # --- HTMX HELPER ENDPOINTS ---
 
+# Dropdown options are cached as (id, name) rows in the 'taxonomy' namespace,
+# invalidated by service_desk.signals whenever the taxonomy changes.
+TAXONOMY_CACHE_TTL = 60 * 60
+
+def _taxonomy_options(kind, parent_id, queryset):
+    return portal_cache.get_or_set(
+        'taxonomy', (kind, parent_id),
+        lambda: list(queryset.filter(is_active=True).order_by('name').values('id', 'name')),
+        timeout=TAXONOMY_CACHE_TTL,
+    )
+
 @login_required
 def hx_load_types(request):
     board_id = request.GET.get('board')
-    types = ServiceType.objects.filter(boards__id=board_id, is_active=True).order_by('name')
+    types = _taxonomy_options('types', board_id, ServiceType.objects.filter(boards__id=board_id))
     return render(request, 'service_desk/partials/options_list.html', {'options': types})
 
 @login_required
 def hx_load_subtypes(request):
     type_id = request.GET.get('type')
-    subtypes = ServiceSubtype.objects.filter(parent_types__id=type_id, is_active=True).order_by('name')
+    subtypes = _taxonomy_options('subtypes', type_id, ServiceSubtype.objects.filter(parent_types__id=type_id))
     return render(request, 'service_desk/partials/options_list.html', {'options': subtypes})
 
 @login_required
 def hx_load_items(request):
     subtype_id = request.GET.get('subtype')
-    items = ServiceItem.objects.filter(parent_subtypes__id=subtype_id, is_active=True).order_by('name')
+    items = _taxonomy_options('items', subtype_id, ServiceItem.objects.filter(parent_subtypes__id=subtype_id))
     return render(request, 'service_desk/partials/options_list.html', {'options': items})
 
 @login_required
@@ -1944,62 +2059,20 @@ def omni_search(request):
     if len(query) < 2:
         return HttpResponse('') 
 
-    tickets = Ticket.objects.filter(
-        Q(id__icontains=query) | 
-        Q(title__icontains=query) | 
-        Q(description__icontains=query)
-    ).distinct()[:5]
-
-    assets = HardwareAsset.objects.filter(
-        Q(asset_tag__icontains=query) | 
-        Q(serial_number__icontains=query) |
-        Q(assigned_to__username__icontains=query) |
-        Q(assigned_to__first_name__icontains=query) |
-        Q(assigned_to__last_name__icontains=query)
-    ).distinct()[:5]
-
-    users = User.objects.filter(
-        Q(username__icontains=query) | 
-        Q(first_name__icontains=query) | 
-        Q(last_name__icontains=query) |
-        Q(email__icontains=query)
-    ).distinct()[:5]
-
-    kb_articles = Article.objects.filter(
-        Q(title__icontains=query) | 
-        Q(problem__icontains=query) | 
-        Q(solution__icontains=query)
-    ).distinct()[:5]
-
-    context = {
-        'query': query,
-        'tickets': tickets,
-        'assets': assets,
-        'users': users,
-        'kb_articles': kb_articles,
-        'total_count': tickets.count() + assets.count() + users.count() + kb_articles.count()
-    }
+    context = {'query': query}
+    context.update(search_service.omni_search(query))
 
     return render(request, 'service_desk/partials/omni_search_results.html', context)
 
 # --- Ticket Registry (The "Power" Search) ---
-@login_required
-def ticket_registry(request):
-    tickets = Ticket.objects.all().order_by('-created_at')
+REGISTRY_PAGE_SIZE = 25
 
+def _registry_queryset(request, tickets):
+    """Apply the registry's filters (q, status, priority, tech, submitter, board) from the query string."""
     query = request.GET.get('q', '')
     if query:
-        tickets = tickets.filter(
-            Q(id__icontains=query) |
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(technician__first_name__icontains=query) |
-            Q(technician__last_name__icontains=query) |
-            Q(technician__username__icontains=query) |
-            Q(submitter__first_name__icontains=query) |
-            Q(submitter__last_name__icontains=query) |
-            Q(submitter__username__icontains=query)
-        )
+        # Ranked full-text match; best hits first instead of newest first
+        tickets = search_service.search_tickets(query, tickets, include_people=True)
 
     status = request.GET.get('status', '')
     if status:
@@ -2021,12 +2094,35 @@ def ticket_registry(request):
     if board_id:
         tickets = tickets.filter(board_id=board_id)
 
-    paginator = Paginator(tickets, 25)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    return tickets, query
+
+@login_required
+def ticket_registry(request):
+    # Every column the rows render, joined up front: one query per page at any depth
+    tickets = Ticket.objects.select_related('technician', 'submitter', 'board').order_by('-created_at')
+    tickets, query = _registry_queryset(request, tickets)
+
+    if query:
+        # Relevance order can't be keyset-paged; searches are narrow enough for OFFSET
+        page_obj = Paginator(tickets, REGISTRY_PAGE_SIZE).get_page(request.GET.get('page'))
+        rows = page_obj
+        total_count, total_is_estimate = page_obj.paginator.count, False
+        next_param = f"page={page_obj.next_page_number()}" if page_obj.has_next() else None
+        prev_param = f"page={page_obj.previous_page_number()}" if page_obj.has_previous() else None
+    else:
+        # Keyset on (created_at, id) and an estimated total: no OFFSET, no COUNT(*) per page
+        cursor = request.GET.get('cursor')
+        rows, next_cursor = pagination.keyset_page(tickets, 'created_at', cursor, page_size=REGISTRY_PAGE_SIZE)
+        total_count, total_is_estimate = pagination.estimated_count(tickets)
+        next_param = f"cursor={next_cursor}" if next_cursor else None
+        prev_param = 'cursor=' if cursor else None  # Back to the newest page
 
     context = {
-        'tickets': page_obj,
+        'tickets': rows,
+        'total_count': total_count,
+        'total_is_estimate': total_is_estimate,
+        'next_param': next_param,
+        'prev_param': prev_param,
         'query': query,
         'technicians': User.objects.filter(is_staff=True).order_by('first_name'),
         'boards': ServiceBoard.objects.all(),
@@ -2039,6 +2135,32 @@ def ticket_registry(request):
 
     return render(request, 'service_desk/ticket_registry.html', context)
 
+EXPORT_FORMATS = {
+    'csv': (export_service.stream_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (export_service.stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+def ticket_registry_export(request):
+    """
+    Download the registry's current result set (same filters, same order) as CSV or XLSX.
+    Rows stream straight from a database cursor, so memory stays flat at any size.
+    """
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return HttpResponse("Unsupported export format.", status=400)
+    writer, content_type = EXPORT_FORMATS[fmt]
+
+    tickets, _ = _registry_queryset(request, Ticket.objects.order_by('-created_at', '-id'))
+    header, rows = export_service.ticket_rows(tickets)
+
+    response = StreamingHttpResponse(writer(header, rows), content_type=content_type)
+    filename = f"ticket-registry-{timezone.localtime():%Y%m%d-%H%M}.{fmt}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'no-store'
+    return response
+
 # --- Asset Detail View (THE FIX) ---
 def asset_detail(request, asset_id):
     asset = get_object_or_404(HardwareAsset, id=asset_id)
@@ -0,0 +1,256 @@
+"""
+Analytics Service for the Manager Dashboard
+
+Builds the `analytics` dictionary consumed by manager_dashboard.html using a
+fixed number of grouped queries. The query count does not depend on the
+length of the date range or on the size of the Service Desk roster.
+
+Whole past days inside the range are read from the TicketDailyStat rollup;
+partial days and "today" are scanned live (see rollup_service.split_window).
+Each metric below costs one query per source:
+    1. Range totals (count, avg resolution, avg first response, escalations)
+    2. SLA breach rows (top 5 open criticals, technician joined; live only)
+    3. Trend buckets (rollup days / TruncDate / TruncHour grouped counts)
+    4. Status breakdown
+    5. Type breakdown
+    6. Service Desk roster (profiles joined)
+    7. Per-technician open counts + avg resolution (grouped by technician)
+"""
+
+from datetime import timedelta
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from service_desk.models import Ticket, TicketDailyStat
+from services import rollup_service
+
+# --- STATUS GROUPS (Dashboard semantics) ---
+DONE_STATUSES = ['Resolved', 'Closed']
+OPEN_BUCKET_STATUSES = ['New', 'Reopened']
+CLOSED_BUCKET_STATUSES = ['Closed', 'Cancelled']
+SERVICE_DESK_GROUP = 'Service Desk'
+
+
+# --- HELPER FUNCTIONS ---
+def _avatar_for(member):
+    """Return the avatar URL used on the roster cards."""
+    profile = getattr(member, 'profile', None)
+    if profile and not profile.prefer_initials and profile.avatar:
+        return profile.avatar.url
+    return f"https://ui-avatars.com/api/?name={member.first_name}+{member.last_name}&background=random&color=fff"
+
+
+def _hour_label(dt):
+    """Portable '8am' / '2pm' style label (no platform-specific strftime flags)."""
+    hour = dt.hour % 12 or 12
+    return f"{hour}{'am' if dt.hour < 12 else 'pm'}"
+
+
+def _seconds(delta):
+    return delta.total_seconds() if delta else 0
+
+
+def _build_trend(live, rolled, start_date, end_date, now):
+    """
+    Group ticket creation counts into buckets (one query per source).
+    Single-day ranges use hourly buckets; anything longer uses calendar days.
+    """
+    last_moment = min(end_date, now)
+    local_start = timezone.localtime(start_date)
+    local_end = timezone.localtime(last_moment)
+
+    labels = []
+    data = []
+
+    if end_date - start_date <= timedelta(days=1):
+        counts = Counter()
+        if live is not None:
+            for r in live.annotate(bucket=TruncHour('created_at')).values('bucket').annotate(c=Count('id')):
+                counts[timezone.localtime(r['bucket']).replace(minute=0, second=0, microsecond=0)] += r['c']
+
+        cursor = local_start.replace(minute=0, second=0, microsecond=0)
+        while cursor <= local_end:
+            labels.append(_hour_label(cursor))
+            data.append(counts.get(cursor, 0))
+            cursor = timezone.localtime(cursor + timedelta(hours=1))
+        return labels, data
+
+    counts = Counter()
+    if live is not None:
+        for r in live.annotate(bucket=TruncDate('created_at')).values('bucket').annotate(c=Count('id')):
+            counts[r['bucket']] += r['c']
+    if rolled is not None:
+        for r in rolled.values('day').annotate(c=Sum('ticket_count')):
+            counts[r['day']] += r['c']
+
+    first_day = local_start.date()
+    days_in_range = (local_end.date() - first_day).days + 1
+    for i in range(days_in_range):
+        day = first_day + timedelta(days=i)
+        label = day.strftime('%a') if 2 < days_in_range <= 10 else day.strftime('%b %d')
+        labels.append(label)
+        data.append(counts.get(day, 0))
+    return labels, data
+
+
+def _range_totals(live, rolled, resolved_q, open_critical_q):
+    """Headline sums from both sources, merged."""
+    totals = Counter()
+    if live is not None:
+        row = live.aggregate(
+            total=Count('id'),
+            resolved=Count('id', filter=resolved_q),
+            resolution=Sum(F('closed_at') - F('created_at'), filter=resolved_q),
+            responded=Count('id', filter=Q(first_response_at__isnull=False)),
+            first_response=Sum(F('first_response_at') - F('created_at'), filter=Q(first_response_at__isnull=False)),
+            escalations=Count('id', filter=open_critical_q),
+        )
+        row['resolution'] = _seconds(row['resolution'])
+        row['first_response'] = _seconds(row['first_response'])
+        totals.update({k: v or 0 for k, v in row.items()})
+    if rolled is not None:
+        done_q = Q(status__in=DONE_STATUSES)
+        row = rolled.aggregate(
+            total=Sum('ticket_count'),
+            resolved=Sum('resolved_count', filter=done_q),
+            resolution=Sum('resolution_seconds', filter=done_q),
+            responded=Sum('responded_count'),
+            first_response=Sum('first_response_seconds'),
+            escalations=Sum('ticket_count', filter=open_critical_q),
+        )
+        totals.update({k: v or 0 for k, v in row.items()})
+    return totals
+
+
+# --- PUBLIC API ---
+def get_manager_analytics(start_date, end_date, now=None):
+    """
+    Returns the analytics dictionary for the manager dashboard.
+
+    Args:
+        start_date: Aware datetime (inclusive lower bound on created_at)
+        end_date: Aware datetime (inclusive upper bound on created_at)
+        now: Optional aware datetime used for ages/trend cut-off (defaults to timezone.now())
+    """
+    now = now or timezone.now()
+    tickets = Ticket.objects.filter(created_at__gte=start_date, created_at__lte=end_date)
+
+    first_day, last_day, live_q = rollup_service.split_window(start_date, end_date, now=now)
+    live = Ticket.objects.filter(live_q) if live_q is not None else None
+    rolled = TicketDailyStat.objects.filter(day__gte=first_day, day__lte=last_day) if first_day else None
+
+    # 1. Headline totals
+    resolved_q = Q(status__in=DONE_STATUSES, closed_at__isnull=False)
+    open_critical_q = Q(priority__icontains='Critical') & ~Q(status__in=DONE_STATUSES)
+    totals = _range_totals(live, rolled, resolved_q, open_critical_q)
+
+    avg_resolution_time = "0 hours"
+    if totals['resolved'] and totals['resolution']:
+        avg_resolution_time = f"{totals['resolution'] / totals['resolved'] / 3600:.1f} hours"
+
+    first_response_time = "N/A"
+    if totals['responded'] and totals['first_response']:
+        first_response_time = f"{int(totals['first_response'] / totals['responded'] / 60)} mins"
+
+    # 2. SLA breaches (technician joined to avoid per-row lookups)
+    sla_breaches = []
+    for t in tickets.filter(open_critical_q).select_related('technician')[:5]:
+        age = (now - t.created_at).total_seconds() / 3600
+        sla_breaches.append({
+            'ticket_id': t.id,
+            'title': t.title,
+            'age_hours': round(age, 1),
+            'technician': t.technician.get_full_name() if t.technician else 'Unassigned'
+        })
+
+    # 3. Trend buckets
+    trend_labels, trend_data = _build_trend(live, rolled, start_date, end_date, now)
+
+    # 4. Status breakdown
+    status_counts = Counter()
+    if live is not None:
+        status_counts.update({r['status']: r['c'] for r in live.values('status').annotate(c=Count('id'))})
+    if rolled is not None:
+        status_counts.update({r['status']: r['c'] for r in rolled.values('status').annotate(c=Sum('ticket_count'))})
+
+    vol_data = {'Open': 0, 'In Progress': 0, 'Resolved': 0, 'Closed': 0}
+    for s, c in status_counts.items():
+        if s in OPEN_BUCKET_STATUSES:
+            vol_data['Open'] += c
+        elif s == 'Resolved':
+            vol_data['Resolved'] += c
+        elif s in CLOSED_BUCKET_STATUSES:
+            vol_data['Closed'] += c
+        else:
+            vol_data['In Progress'] += c
+
+    # 5. Type breakdown
+    type_counts = Counter()
+    if live is not None:
+        type_counts.update({r['type__name']: r['c'] for r in live.values('type__name').annotate(c=Count('id'))})
+    if rolled is not None:
+        type_counts.update({r['type__name']: r['c'] for r in rolled.values('type__name').annotate(c=Sum('ticket_count'))})
+    top_types = [(name, c) for name, c in type_counts.most_common() if c][:5]
+
+    # 6. Roster (profiles joined in the same query)
+    members = list(User.objects.filter(groups__name=SERVICE_DESK_GROUP).select_related('profile'))
+
+    # 7. Per-technician stats (live open counts + range resolution sums)
+    tech_open = {}
+    tech_resolved = Counter()
+    tech_seconds = Counter()
+    if members:
+        annotations = {'open_count': Count('id', filter=~Q(status__in=DONE_STATUSES))}
+        if live_q is not None:
+            annotations['resolved'] = Count('id', filter=resolved_q & live_q)
+            annotations['resolution'] = Sum(F('closed_at') - F('created_at'), filter=resolved_q & live_q)
+
+        for r in Ticket.objects.filter(technician__in=members).values('technician').annotate(**annotations):
+            tech_open[r['technician']] = r['open_count']
+            tech_resolved[r['technician']] += r.get('resolved', 0)
+            tech_seconds[r['technician']] += _seconds(r.get('resolution'))
+
+        if rolled is not None:
+            rows = rolled.filter(technician__in=members, status__in=DONE_STATUSES).values('technician').annotate(
+                resolved=Sum('resolved_count'),
+                resolution=Sum('resolution_seconds'),
+            )
+            for r in rows:
+                tech_resolved[r['technician']] += r['resolved'] or 0
+                tech_seconds[r['technician']] += r['resolution'] or 0
+
+    roster = []
+    res_labels = []
+    res_data = []
+    for member in members:
+        roster.append({
+            'name': member.get_full_name(),
+            'role': 'Service Desk',
+            'avatar': _avatar_for(member),
+            'stats': {'open_tickets': tech_open.get(member.id, 0)},
+            'id': member.id
+        })
+
+        if tech_resolved[member.id]:
+            res_labels.append(member.first_name)
+            res_data.append(round(tech_seconds[member.id] / tech_resolved[member.id] / 3600, 1))
+
+    return {
+        'total_tickets': totals['total'],
+        'avg_resolution_time': avg_resolution_time,
+        'first_response_time': first_response_time,
+        'priority_escalations': totals['escalations'],
+        'sla_breaches': sla_breaches,
+        'volume_by_status': {'labels': list(vol_data.keys()), 'data': list(vol_data.values())},
+        'tickets_by_type': {
+            'labels': [name or 'Uncategorized' for name, c in top_types],
+            'data': [c for name, c in top_types]
+        },
+        'trend_data': {'labels': trend_labels, 'data': trend_data},
+        'avg_resolution_time_by_member': {'labels': res_labels, 'data': res_data},
+        'roster': roster
+    }
@@ -0,0 +1,103 @@
+"""
+Cache Helpers (Namespaced, Versioned Cache-Aside)
+
+Thin layer over django.core.cache (configured by CACHES in config/settings.py).
+
+Keys look like  prime:<namespace>:g<generation>:<part>:<part>...
+invalidate(namespace) moves the namespace to a new generation (a nanosecond
+timestamp, so it never revisits an old one), orphaning every key in it at
+once; stale entries simply age out. Nothing ever enumerates keys, so this
+works the same on locmem, file and Redis backends.
+
+Usage:
+    from services import cache as portal_cache
+
+    types = portal_cache.get_or_set('taxonomy', ('types', board_id), load_types, timeout=3600)
+    portal_cache.invalidate('taxonomy')    # from a post_save/post_delete hook
+
+Hit/miss counters are kept per namespace and per process (see stats()).
+
+generation(namespace) doubles as a cheap version stamp: it changes exactly
+when the namespace is invalidated (services/stamp_service.py builds ETags
+from it).
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+
+KEY_PREFIX = 'prime'
+DEFAULT_TIMEOUT = 300
+
+_MISSING = object()
+_counters = defaultdict(lambda: {'hits': 0, 'misses': 0})
+_counter_lock = threading.Lock()
+
+
+# --- HELPER FUNCTIONS ---
+def _generation_key(namespace):
+    return f"{KEY_PREFIX}:{namespace}:generation"
+
+
+def _record(namespace, outcome):
+    with _counter_lock:
+        _counters[namespace][outcome] += 1
+
+
+# --- PUBLIC API ---
+def generation(namespace):
+    """Current generation token of `namespace`; changes on every invalidate()."""
+    key = _generation_key(namespace)
+    value = cache.get(key)
+    if value is None:
+        # add() so concurrent first readers agree on a single generation
+        cache.add(key, time.time_ns(), None)
+        value = cache.get(key)
+    return value
+
+
+def make_key(namespace, parts=()):
+    """Fully-qualified key for `parts` in the current generation of `namespace`."""
+    if not isinstance(parts, (list, tuple)):
+        parts = (parts,)
+    suffix = ':'.join(str(p) for p in parts)
+    return f"{KEY_PREFIX}:{namespace}:g{generation(namespace)}:{suffix}"
+
+
+def get_or_set(namespace, parts, producer, timeout=DEFAULT_TIMEOUT):
+    """
+    Cache-aside read: return the cached value for `parts`, or call
+    `producer()`, store its result and return it. None is a valid value.
+    """
+    key = make_key(namespace, parts)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        _record(namespace, 'hits')
+        return value
+
+    _record(namespace, 'misses')
+    value = producer()
+    cache.set(key, value, timeout)
+    return value
+
+
+def invalidate(namespace):
+    """Drop every entry in `namespace` (by moving it to a new generation)."""
+    cache.set(_generation_key(namespace), time.time_ns(), None)
+
+
+def stats():
+    """{namespace: {'hits', 'misses', 'hit_rate'}} for this process."""
+    with _counter_lock:
+        snapshot = {ns: dict(c) for ns, c in _counters.items()}
+    for counts in snapshot.values():
+        total = counts['hits'] + counts['misses']
+        counts['hit_rate'] = round(counts['hits'] / total, 3) if total else None
+    return snapshot
+
+
+def reset_stats():
+    with _counter_lock:
+        _counters.clear()
@@ -0,0 +1,168 @@
+"""
+Counter Service for UserTicketCounters
+
+Answers "how many tickets does this user have open / resolved / in total,
+and is a survey waiting?" from one row instead of three COUNT queries per
+dashboard render and poll.
+
+Maintenance:
+    - record_ticket_save() / record_ticket_delete() apply per-ticket deltas
+      (called from service_desk.signals, inside the ticket's transaction)
+    - record_tickets_created() applies a bulk_create batch, one UPDATE per submitter
+    - record_survey_change() keeps awaiting_survey_count in step with CSAT
+    - reconcile() recomputes counters in bulk from the Ticket table
+      (called by the `reconcile_ticket_counters` management command, and
+      for a user's first read)
+
+Reading:
+    - get_counters(user) returns the user's row
+
+Deltas are F() updates in the ticket's transaction, so concurrent saves
+never lose an increment; reconcile() repairs anything written around the
+signals (raw SQL, queryset.update(), fixture loads).
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from service_desk.models import CSATSurvey, Ticket, UserTicketCounters
+
+OPEN_STATUSES = (
+    'New', 'User Commented', 'Work In Progress', 'Reopened',
+    'Assigned', 'In Progress', 'Awaiting User Reply', 'On Hold',
+)
+CLOSED_STATUSES = ('Resolved', 'Cancelled')
+MEASURES = ('total_count', 'open_count', 'resolved_count', 'awaiting_survey_count')
+
+
+# --- HELPER FUNCTIONS ---
+def _contribution(status, has_survey):
+    """Measure vector a single ticket in `status` adds to its submitter's row."""
+    return {
+        'total_count': 1,
+        'open_count': 1 if status in OPEN_STATUSES else 0,
+        'resolved_count': 1 if status in CLOSED_STATUSES else 0,
+        'awaiting_survey_count': 1 if status == 'Resolved' and not has_survey else 0,
+    }
+
+
+def _apply(user_id, measures, sign=1):
+    """
+    Add (or subtract) a measure vector to `user_id`'s row. A user without a
+    row is skipped: get_counters() builds it from the Ticket table on first read.
+    """
+    deltas = {m: F(m) + sign * v for m, v in measures.items() if v}
+    if deltas and user_id is not None:
+        UserTicketCounters.objects.filter(user_id=user_id).update(**deltas)
+
+
+def _has_survey(ticket_id):
+    return CSATSurvey.objects.filter(ticket_id=ticket_id).exists()
+
+
+def _computed(user_ids=None):
+    """{user_id: {measure: value}} straight from the Ticket table."""
+    tickets = Ticket.objects.all()
+    if user_ids is not None:
+        tickets = tickets.filter(submitter_id__in=user_ids)
+    rows = tickets.values('submitter_id').annotate(
+        total_count=Count('id'),
+        open_count=Count('id', filter=Q(status__in=OPEN_STATUSES)),
+        resolved_count=Count('id', filter=Q(status__in=CLOSED_STATUSES)),
+        awaiting_survey_count=Count('id', filter=Q(status='Resolved', survey__isnull=True)),
+    ).order_by()
+    return {row.pop('submitter_id'): row for row in rows}
+
+
+# --- INCREMENTAL MAINTENANCE ---
+def record_ticket_save(ticket, created):
+    """
+    Move `ticket` between counters. Uses the snapshot taken when the ticket
+    was loaded (Ticket.from_db); a save that changes neither submitter nor
+    status costs nothing.
+    """
+    previous = None if created else getattr(ticket, '_counter_snapshot', None)
+    current = ticket.counter_state()
+
+    if not created and previous is None:
+        # Unknown prior state (e.g. instance built by hand): recount the submitter
+        reconcile([ticket.submitter_id])
+    elif previous != current:
+        # Survey presence only matters when 'Resolved' is involved
+        involves_resolved = 'Resolved' in (current['status'], previous and previous['status'])
+        has_survey = involves_resolved and not created and _has_survey(ticket.pk)
+        with transaction.atomic():
+            if previous is not None:
+                _apply(previous['submitter_id'], _contribution(previous['status'], has_survey), sign=-1)
+            _apply(current['submitter_id'], _contribution(current['status'], has_survey))
+
+    ticket._counter_snapshot = current
+
+
+def record_tickets_created(tickets):
+    """Add a batch of newly inserted tickets (bulk_create sends no post_save)."""
+    totals = {}
+    for ticket in tickets:
+        total = totals.setdefault(ticket.submitter_id, dict.fromkeys(MEASURES, 0))
+        for m, v in _contribution(ticket.status, has_survey=False).items():
+            total[m] += v
+        ticket._counter_snapshot = ticket.counter_state()
+    with transaction.atomic():
+        for user_id, measures in totals.items():
+            _apply(user_id, measures)
+
+
+def record_ticket_delete(ticket):
+    """Remove a deleted ticket from its submitter's counters."""
+    state = getattr(ticket, '_counter_snapshot', None) or ticket.counter_state()
+    # A cascaded survey is deleted first (and re-counted as awaiting), so check again
+    has_survey = state['status'] == 'Resolved' and _has_survey(ticket.pk)
+    _apply(state['submitter_id'], _contribution(state['status'], has_survey), sign=-1)
+
+
+def record_survey_change(survey, created):
+    """A survey was submitted (created=True) or removed for a ticket."""
+    ticket = Ticket.objects.filter(pk=survey.ticket_id).values('submitter_id', 'status').first()
+    if ticket is None or ticket['status'] != 'Resolved':
+        return
+    _apply(ticket['submitter_id'], {'awaiting_survey_count': 1}, sign=-1 if created else 1)
+
+
+def reconcile(user_ids=None):
+    """
+    Recompute counters from the Ticket table (all users, or just `user_ids`)
+    and upsert them in bulk. Returns (rows_checked, rows_corrected).
+    """
+    computed = _computed(user_ids)
+    stored = UserTicketCounters.objects.all()
+    if user_ids is not None:
+        stored = stored.filter(user_id__in=user_ids)
+    stored = {row['user_id']: row for row in stored.values('user_id', *MEASURES)}
+
+    zero = dict.fromkeys(MEASURES, 0)
+    targets = set(computed) | set(stored) | set(user_ids or ())
+    drifted = []
+    for user_id in targets:
+        expected = computed.get(user_id, zero)
+        current = stored.get(user_id)
+        if current is None or any(current[m] != expected[m] for m in MEASURES):
+            drifted.append(UserTicketCounters(user_id=user_id, **expected))
+
+    UserTicketCounters.objects.bulk_create(
+        drifted,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=list(MEASURES),
+    )
+    return len(targets), len(drifted)
+
+
+# --- READING ---
+def get_counters(user):
+    """The user's UserTicketCounters row (created on first read)."""
+    counters = UserTicketCounters.objects.filter(user=user).first()
+    if counters is None:
+        reconcile([user.pk])
+        counters = UserTicketCounters.objects.get(user=user)
+    return counters
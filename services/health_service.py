@@ -0,0 +1,102 @@
+"""
+Health Service for the Production Engine
+
+Answers "is the portal able to serve, and how busy are its database
+connections?" for the run_production.py startup banner and the /health/
+endpoint.
+
+    - database_status(): round-trip check (SELECT 1) with latency
+    - connection_stats(): connection mode from settings.PRIME_DB_POOL, live
+      pool counters (pool mode), and our server-side sessions from
+      pg_stat_activity (PostgreSQL)
+    - health_report(detailed): the /health/ payload. Anonymous probes get
+      status and latency only; driver errors (hosts, database and role names)
+      and connection stats are for staff and the server log.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Subset of psycopg_pool.ConnectionPool.get_stats() worth surfacing
+POOL_STAT_KEYS = (
+    'pool_min', 'pool_max', 'pool_size', 'pool_available',
+    'requests_waiting', 'requests_num', 'requests_queued', 'connections_num', 'connections_errors',
+)
+
+
+# --- HELPER FUNCTIONS ---
+def _pool():
+    return getattr(connection, 'pool', None)
+
+
+def _server_sessions():
+    """{state: count} for this app's sessions in pg_stat_activity, or None off PostgreSQL."""
+    if connection.vendor != 'postgresql':
+        return None
+    app_name = connection.settings_dict.get('OPTIONS', {}).get('application_name')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT coalesce(state, 'unknown'), count(*) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND application_name = %s GROUP BY 1",
+            [app_name],
+        )
+        return dict(cursor.fetchall())
+
+
+# --- PUBLIC API ---
+def database_status():
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except Exception as exc:
+        logger.exception("Database health check failed")
+        return {'ok': False, 'error': str(exc)}
+    return {'ok': True, 'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+
+
+def connection_stats():
+    db = connection.settings_dict
+    stats = {
+        'mode': getattr(settings, 'PRIME_DB_POOL', 'off'),
+        'threads': getattr(settings, 'WAITRESS_THREADS', None),
+        'conn_max_age': db.get('CONN_MAX_AGE', 0),
+        'health_checks': db.get('CONN_HEALTH_CHECKS', False),
+        'pool': None,
+        'server_sessions': None,
+    }
+
+    pool = _pool()
+    if pool is not None:
+        raw = pool.get_stats()
+        stats['pool'] = {key: raw.get(key, 0) for key in POOL_STAT_KEYS}
+        size = stats['pool']['pool_size']
+        stats['pool']['utilization'] = round((size - stats['pool']['pool_available']) / size, 3) if size else 0.0
+
+    try:
+        stats['server_sessions'] = _server_sessions()
+    except Exception:
+        pass  # Stats are best-effort; database_status() reports real failures
+    return stats
+
+
+def health_report(detailed=False):
+    database = database_status()
+    report = {'status': 'ok' if database['ok'] else 'error'}
+    if not detailed:
+        report['database'] = (
+            {'ok': True, 'latency_ms': database['latency_ms']} if database['ok'] else {'ok': False, 'error': 'unavailable'}
+        )
+        return report
+    report.update(
+        database=database,
+        connections=connection_stats() if database['ok'] else None,
+        cache=settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+    )
+    return report
@@ -0,0 +1,281 @@
+"""
+Intake Service (Bulk Ticket Creation)
+
+Creates tickets in batches for machine integrations (email, phone system)
+instead of one form POST and one Ticket.save() each:
+
+    - lookups happen once per batch: service types, people (with profiles)
+      and boards; board-less tickets are routed, and unassigned ones on
+      auto-assign boards load-balanced, through services/routing_service.py
+      as Ticket.save() does (one shared load map for the whole batch)
+    - each item is validated by its ServiceType.form_class_name form, the
+      same form the agent Power Form renders
+    - valid items are inserted with a single bulk_create
+    - bulk_create sends no post_save, so the bookkeeping the signals would do
+      runs once for the whole batch: rollup, counters, version stamps and
+      assignment notifications
+
+Item shape (see create_tickets):
+    {"type": 3 | "Hardware Issue", "submitter": 12 | "jdoe" | "jdoe@example.com",
+     "technician": optional (staff), "board": optional id, "subtype": optional id, "item": optional id,
+     "priority": optional Ticket.Priority value, "fields": {<form field>: <value>, ...}}
+Integer refs are primary keys; string refs are always names (a username of
+"1234" is a username, not user #1234).
+
+Results come back in input order. Each is {"index", "status": "created", "ticket_id"}
+or {"index", "status": "invalid", "errors": {field: [messages]}}.
+"""
+
+from django import forms
+from django.contrib.auth.models import User
+from django.db import models, transaction
+from django.db.models import Q
+
+from service_desk import forms as ticket_forms
+from service_desk.models import Notification, ServiceBoard, ServiceItem, ServiceSubtype, ServiceType, Ticket
+from services import counter_service, notification_dispatcher, rollup_service, routing_service, stamp_service
+
+MAX_BATCH = 500
+INSERT_BATCH_SIZE = 250
+
+# Ticket columns a type-specific form may fill in (title, description, sparse fields)
+FORM_FIELDS = frozenset(
+    f.name for f in Ticket._meta.concrete_fields
+    if isinstance(f, (models.CharField, models.TextField))
+    and f.name not in ('status', 'priority', 'source') and not f.name.startswith(('legacy_', 'contact_'))
+)
+
+
+# Column limits, checked per item: the type forms don't all declare max_length,
+# and one oversized value would fail the whole bulk_create on PostgreSQL
+CHAR_LIMITS = {
+    f.attname: f.max_length for f in Ticket._meta.concrete_fields
+    if isinstance(f, models.CharField) and f.max_length
+}
+
+
+class IntakeError(ValueError):
+    """The payload as a whole is unusable (not a per-item validation error)."""
+
+
+# --- HELPER FUNCTIONS ---
+def _form_class(service_type):
+    form_class = getattr(ticket_forms, service_type.form_class_name or '', None)
+    if isinstance(form_class, type) and issubclass(form_class, forms.Form):
+        return form_class
+    return ticket_forms.GeneralQuestionForm
+
+
+def _is_ref(value):
+    """Ids are ints and names are strings; anything else (lists, objects, booleans) is malformed."""
+    return value is None or (isinstance(value, (int, str)) and not isinstance(value, bool))
+
+
+def _split_refs(values):
+    """Separate integer ids from names for a batch lookup. Strings are always names."""
+    ids, names = set(), set()
+    for value in values:
+        if not _is_ref(value) or value in (None, ''):
+            continue
+        if isinstance(value, int):
+            ids.add(value)
+        else:
+            names.add(value)
+    return ids, names
+
+
+def _resolve_users(refs, **filters):
+    """{ref: User} for ids, usernames and email addresses, in one query."""
+    ids, names = _split_refs(refs)
+    if not ids and not names:
+        return {}
+    users = User.objects.filter(
+        Q(pk__in=ids) | Q(username__in=names) | Q(email__in=names), is_active=True, **filters
+    ).select_related('profile')
+    found = {}
+    for user in users:
+        found[user.pk] = user
+        found[user.username] = user
+        if user.email:
+            found.setdefault(user.email, user)
+    return found
+
+
+def _resolve_types(refs):
+    ids, names = _split_refs(refs)
+    found = {}
+    for service_type in ServiceType.objects.filter(Q(pk__in=ids) | Q(name__in=names), is_active=True):
+        found[service_type.pk] = service_type
+        found[service_type.name] = service_type
+    return found
+
+
+def _as_id(value):
+    """Board/subtype/item refs are ids only, so a digit string is an explicit id there."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def _lookup(found, ref):
+    return found.get(ref) if _is_ref(ref) else None
+
+
+def _too_long(ticket):
+    return {
+        name: [f"Ensure this value has at most {limit} characters (it has {len(value)})."]
+        for name, limit in CHAR_LIMITS.items()
+        if isinstance(value := getattr(ticket, name), str) and len(value) > limit
+    }
+
+
+def _malformed(item):
+    """Shape errors for one item, checked before anything is looked up."""
+    errors = {}
+    for key in ('type', 'submitter', 'technician'):
+        if not _is_ref(item.get(key)):
+            errors[key] = ["Must be an id or a name."]
+    for key in ('board', 'subtype', 'item'):
+        if item.get(key) not in (None, '') and _as_id(item.get(key)) is None:
+            errors[key] = ["Must be an id."]
+    if not isinstance(item.get('fields') or {}, dict):
+        errors['fields'] = ["Must be an object."]
+    if not isinstance(item.get('priority') or '', str):
+        errors['priority'] = ["Must be a string."]
+    return errors
+
+
+def _json_safe(data):
+    return {k: v for k, v in data.items() if isinstance(v, (str, int, float, bool, type(None)))}
+
+
+# --- PUBLIC API ---
+def create_tickets(items, source=Ticket.Source.EMAIL):
+    """
+    Validate and insert a batch of ticket payloads. Returns per-item results in
+    input order; invalid items are reported and skipped, never fatal to the batch.
+    """
+    if not isinstance(items, list) or not items:
+        raise IntakeError("'tickets' must be a non-empty list.")
+    if len(items) > MAX_BATCH:
+        raise IntakeError(f"At most {MAX_BATCH} tickets per request.")
+    if source not in Ticket.Source.values:
+        raise IntakeError(f"Unknown source '{source}'.")
+    if not all(isinstance(item, dict) for item in items):
+        raise IntakeError("Every ticket must be a JSON object.")
+
+    # --- 1. Resolve everything the batch refers to, once ---
+    types = _resolve_types(item.get('type') for item in items)
+    people = _resolve_users(item.get('submitter') for item in items)
+    technicians = _resolve_users((item.get('technician') for item in items), is_staff=True)
+    related = {
+        key: model.objects.in_bulk({_as_id(item.get(key)) for item in items} - {None})
+        for key, model in (('board', ServiceBoard), ('subtype', ServiceSubtype), ('item', ServiceItem))
+    }
+
+    # --- 2. Validate each item against its type's form ---
+    results, tickets = [], []
+    load = None  # Technician open-load map, fetched once if any ticket is auto-assigned
+    for index, item in enumerate(items):
+        errors = _malformed(item)
+        if errors:
+            results.append({'index': index, 'status': 'invalid', 'errors': errors})
+            continue
+
+        service_type = _lookup(types, item.get('type'))
+        submitter = _lookup(people, item.get('submitter'))
+        technician = _lookup(technicians, item.get('technician')) if item.get('technician') else None
+        chosen = {key: found.get(_as_id(item.get(key))) for key, found in related.items()}
+        priority = item.get('priority') or Ticket.Priority.P3
+
+        if service_type is None:
+            errors['type'] = ["Unknown or inactive service type."]
+        if submitter is None:
+            errors['submitter'] = ["Unknown or inactive user."]
+        if item.get('technician') and technician is None:
+            errors['technician'] = ["Unknown or inactive staff user."]
+        for key, value in chosen.items():
+            if item.get(key) and value is None:
+                errors[key] = [f"Unknown {key}."]
+        if priority not in Ticket.Priority.values:
+            errors['priority'] = [f"Must be one of: {', '.join(Ticket.Priority.values)}."]
+
+        form = None
+        if service_type is not None:
+            form = _form_class(service_type)(data=item.get('fields') or {})
+            if not form.is_valid():
+                errors.update({field: list(messages) for field, messages in form.errors.items()})
+
+        if errors:
+            results.append({'index': index, 'status': 'invalid', 'errors': errors})
+            continue
+
+        data = form.cleaned_data
+        ticket = Ticket(
+            submitter=submitter,
+            technician=technician,
+            board_id=chosen['board'].pk if chosen['board'] else routing_service.resolve_board_id(
+                service_type.pk, _as_id(item.get('subtype')), _as_id(item.get('item'))
+            ),
+            type=service_type,
+            subtype=chosen['subtype'],
+            item=chosen['item'],
+            source=source,
+            priority=priority,
+            status=Ticket.Status.NEW,
+            contact_email=submitter.email,
+            form_data=_json_safe(data),
+        )
+        profile = getattr(submitter, 'profile', None)
+        if profile:
+            ticket.contact_phone = profile.phone_office
+            ticket.contact_department = profile.department
+            ticket.contact_location = profile.location
+        for field, value in data.items():
+            if field in FORM_FIELDS and value not in (None, ''):
+                setattr(ticket, field, value)
+        if 'title' not in data:
+            ticket.title = f"{service_type.name} - {data.get('summary', 'No Summary')}"[:200]
+        if not ticket.description:
+            ticket.description = data.get('summary', '')
+        errors = _too_long(ticket)
+        if errors:
+            results.append({'index': index, 'status': 'invalid', 'errors': errors})
+            continue
+
+        if ticket.technician_id is None and ticket.board_id:
+            load = routing_service.technician_load() if load is None else load
+            ticket.technician_id = routing_service.pick_technician(ticket.board_id, load)
+
+        results.append({'index': index, 'status': 'created', 'ticket': ticket})
+        tickets.append(ticket)
+
+    # --- 3. Insert, then do the signals' bookkeeping for the whole batch ---
+    if tickets:
+        with transaction.atomic():
+            Ticket.objects.bulk_create(tickets, batch_size=INSERT_BATCH_SIZE)
+            if load is not None:
+                routing_service.save_load(load)
+            rollup_service.record_tickets_created(tickets)
+            counter_service.record_tickets_created(tickets)
+            for submitter_id in {t.submitter_id for t in tickets}:
+                stamp_service.bump(stamp_service.TICKETS, submitter_id)
+            notification_dispatcher.dispatch_many([
+                {
+                    'user_id': t.technician_id,
+                    'ticket_id': t.pk,
+                    'event': Notification.Event.ASSIGNED,
+                    'title': "New Ticket Assigned",
+                    'message': f"Ticket #{t.pk}: {t.title} has been assigned to you.",
+                    'link': f"/ticket/{t.pk}/",
+                }
+                for t in tickets if t.technician_id
+            ])
+
+    for result in results:
+        ticket = result.pop('ticket', None)
+        if ticket is not None:
+            result['ticket_id'] = ticket.pk
+    return results
@@ -0,0 +1,180 @@
+"""
+Notification Broker (Server-Push Fan-Out)
+
+Carries "this user's notifications changed" from the code that writes
+Notification rows (sync views and signals) to the open SSE connections of
+the notification_stream view, which is served by config/asgi.py.
+
+Events are snapshots, not deltas:
+    {'unread_count': 3, 'notification': {...new row...} or None}
+A subscriber that misses an event loses nothing, because the next one
+carries the current count.
+
+Backends (settings.PRIME_NOTIFY_BROKER):
+    local  - asyncio queues in this process (default; a single ASGI worker)
+    cache  - latest event per user kept in the shared Django cache and
+             checked every CACHE_POLL_INTERVAL seconds by each stream. A
+             stand-in for Redis pub/sub when several worker processes share
+             a host; only the newest event between two checks is delivered.
+
+Usage:
+    notification_broker.notify_user(user_id)           # after a write (sync)
+
+    subscription = notification_broker.subscribe(user_id)   # in the stream
+    event = await subscription.next_event()            # None = heartbeat
+    subscription.close()
+"""
+
+import asyncio
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from service_desk.models import Notification
+
+HEARTBEAT = 15              # Seconds of silence before next_event() returns None (keep-alive)
+QUEUE_SIZE = 16             # Per-connection backlog; the oldest snapshot is dropped when full
+CACHE_POLL_INTERVAL = 0.5   # 'cache' backend: how often a stream checks for a new event
+CACHE_EVENT_TTL = 60 * 60
+
+
+# --- HELPER FUNCTIONS ---
+def _offer(queue, event):
+    """Runs on the subscriber's loop: enqueue, dropping the oldest snapshot if full."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+def _event_key(user_id):
+    return f"notifications:event:{user_id}"
+
+
+def _serialize(notification):
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'link': notification.link,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at,
+    }
+
+
+class LocalSubscription:
+    def __init__(self, broker, user_id):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    async def next_event(self):
+        try:
+            return await asyncio.wait_for(self.queue.get(), HEARTBEAT)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker._remove(self)
+
+
+class LocalBroker:
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, user_id):
+        return bool(self._subscribers.get(user_id))
+
+    def subscribe(self, user_id):
+        subscription = LocalSubscription(self, user_id)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def publish(self, user_id, event):
+        # Called from any thread; each subscriber's queue is touched only on its own loop
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, ()))
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(_offer, subscription.queue, event)
+            except RuntimeError:
+                subscription.close()  # Loop already shut down
+
+    def _remove(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+
+class CacheSubscription:
+    def __init__(self, user_id):
+        self.key = _event_key(user_id)
+        current = cache.get(self.key)
+        self.seen = current[0] if current else None
+
+    async def next_event(self):
+        waited = 0.0
+        while waited < HEARTBEAT:
+            await asyncio.sleep(CACHE_POLL_INTERVAL)
+            waited += CACHE_POLL_INTERVAL
+            current = await cache.aget(self.key)
+            if current and current[0] != self.seen:
+                self.seen = current[0]
+                return current[1]
+        return None
+
+    def close(self):
+        pass
+
+
+class CacheBroker:
+    def has_subscribers(self, user_id):
+        return True  # Subscribers may live in other processes
+
+    def subscribe(self, user_id):
+        return CacheSubscription(user_id)
+
+    def publish(self, user_id, event):
+        cache.set(_event_key(user_id), (time.time_ns(), event), CACHE_EVENT_TTL)
+
+
+BACKENDS = {'local': LocalBroker, 'cache': CacheBroker}
+_brokers = {}
+_brokers_lock = threading.Lock()
+
+
+# --- PUBLIC API ---
+def get_broker():
+    name = getattr(settings, 'PRIME_NOTIFY_BROKER', 'local')
+    with _brokers_lock:
+        if name not in _brokers:
+            _brokers[name] = BACKENDS[name]()
+        return _brokers[name]
+
+
+def build_event(user_id, notification=None):
+    """Current snapshot for `user_id`; `notification` is a newly created row to push."""
+    return {
+        'unread_count': Notification.objects.filter(user_id=user_id, is_read=False).count(),
+        'notification': _serialize(notification) if notification is not None else None,
+    }
+
+
+def notify_user(user_id, notification=None):
+    """Push a fresh snapshot to every open stream of `user_id` (no query when nobody listens)."""
+    broker = get_broker()
+    if broker.has_subscribers(user_id):
+        broker.publish(user_id, build_event(user_id, notification))
+
+
+def subscribe(user_id):
+    """Open a subscription; call from async code and close() it when the stream ends."""
+    return get_broker().subscribe(user_id)
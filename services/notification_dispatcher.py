@@ -0,0 +1,186 @@
+"""
+Notification Dispatcher (Write-Behind, Batched, Deduplicated)
+
+Ticket saves used to INSERT their notifications inline. They now hand them
+to dispatch(), which queues them once the ticket's transaction commits.
+A background worker drains the queue and writes in batches:
+
+    - deduplicated by (user, ticket, event): at most one unread row each,
+      within a batch, against the table, and by the partial unique
+      constraint notif_unread_ticket_event_uniq as the final word
+    - inserted with one bulk_create per batch
+    - followed by the side effects post_save would have triggered
+      (version stamp bump, SSE push), since bulk_create sends no signals
+
+The queue is bounded (QUEUE_SIZE). When it is full the caller writes its
+own item inline rather than dropping it. The worker flushes what is left
+at interpreter exit (atexit), and flush() drains it on demand.
+
+settings.PRIME_NOTIFY_DISPATCH:
+    background  - worker thread (default)
+    inline      - write in the calling thread on commit (management commands, tests)
+"""
+
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+
+from service_desk.models import Notification
+from services import notification_broker, stamp_service
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 1000
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.25   # Seconds the worker waits to fill a batch
+SHUTDOWN_TIMEOUT = 10
+
+_STOP = object()
+
+
+# --- HELPER FUNCTIONS ---
+def _key(item):
+    return (item['user_id'], item['ticket_id'], item['event'])
+
+
+def write_batch(items):
+    """
+    Insert `items` (Notification field dicts), skipping any (user, ticket,
+    event) that already has an unread row. Returns the number written.
+    """
+    unique = {}
+    for item in items:
+        unique.setdefault(_key(item), item)  # First one wins within a batch
+
+    existing = set(
+        Notification.objects.filter(
+            is_read=False,
+            user_id__in={k[0] for k in unique},
+            ticket_id__in={k[1] for k in unique},
+        ).values_list('user_id', 'ticket_id', 'event')
+    )
+    rows = [Notification(**item) for key, item in unique.items() if key not in existing]
+    if not rows:
+        return 0
+
+    try:
+        with transaction.atomic():
+            created = Notification.objects.bulk_create(rows)
+    except IntegrityError:
+        # Lost a race with another writer; let the constraint pick the survivors
+        Notification.objects.bulk_create(rows, ignore_conflicts=True)
+        created = []  # Row ids unknown: push counts only
+
+    newest = {row.user_id: row for row in created}
+    for user_id in {row.user_id for row in rows}:
+        stamp_service.bump(stamp_service.NOTIFICATIONS, user_id)
+        notification_broker.notify_user(user_id, newest.get(user_id))
+    return len(rows)
+
+
+class NotificationDispatcher:
+    def __init__(self, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, item):
+        self._ensure_worker()
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            logger.warning("Notification queue full; writing inline.")
+            write_batch([item])
+
+    def flush(self):
+        """Block until everything queued so far has been written."""
+        if self._thread is not None:
+            self.queue.join()
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """Write what is queued, then stop the worker."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self.queue.put(_STOP)
+        thread.join(timeout)
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='notification-dispatcher', daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        """Wait for one item, then gather more for up to flush_interval."""
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            try:
+                batch.append(self.queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is _STOP
+            items = [item for item in batch if item is not _STOP]
+            try:
+                close_old_connections()
+                if items:
+                    write_batch(items)
+            except Exception:
+                logger.exception("Failed to write %d notification(s).", len(items))
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self.queue.task_done()
+            if stop:
+                return
+
+
+_dispatcher = NotificationDispatcher()
+atexit.register(_dispatcher.shutdown)
+
+
+# --- PUBLIC API ---
+def get_dispatcher():
+    return _dispatcher
+
+
+def dispatch(user_id, ticket_id, event, title, message, link=''):
+    """Queue a ticket notification to be written once the current transaction commits."""
+    if user_id is None:
+        return
+    dispatch_many([{
+        'user_id': user_id,
+        'ticket_id': ticket_id,
+        'event': event,
+        'title': title,
+        'message': message,
+        'link': link,
+    }])
+
+
+def dispatch_many(items):
+    """dispatch() for a list of item dicts, registering a single on_commit hook."""
+    items = [item for item in items if item['user_id'] is not None]
+    if not items:
+        return
+    if getattr(settings, 'PRIME_NOTIFY_DISPATCH', 'background') == 'inline':
+        transaction.on_commit(lambda: write_batch(items))
+    else:
+        def submit():
+            for item in items:
+                _dispatcher.submit(item)
+        transaction.on_commit(submit)
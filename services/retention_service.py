@@ -0,0 +1,166 @@
+"""
+Retention Service for Notifications
+
+Keeps the Notification table to a working set. Read notifications older than
+settings.NOTIFICATION_RETENTION_DAYS are copied to gzip-compressed JSONL files
+under settings.NOTIFICATION_ARCHIVE_DIR, then deleted in primary-key chunks.
+Each chunk is its own short transaction, so no lock is held for long.
+Unread notifications are never touched.
+
+Entry points:
+    - archive_notifications(): one retention pass (called by the
+      `prune_notifications` management command)
+    - start_scheduler(): optional daemon thread that runs a pass every N hours
+      (run_production.py starts it when PRIME_RETENTION_HOURS is set)
+
+Each pass returns a report: rows archived and deleted, payload bytes,
+archive file size and, on PostgreSQL, the table size before and after.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from service_desk.models import Notification
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+ARCHIVE_FIELDS = ('id', 'user_id', 'ticket_id', 'event', 'title', 'message', 'link', 'is_read', 'created_at')
+LOCK_KEY = 'retention:notifications:lock'
+LOCK_TTL = 60 * 60  # Longest a pass may hold the cross-process lock
+
+_scheduler = {'thread': None}
+
+
+# --- HELPER FUNCTIONS ---
+def _table_bytes():
+    """Total on-disk size of the notification table and its indexes (PostgreSQL only)."""
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_total_relation_size(%s)", [Notification._meta.db_table])
+        return cursor.fetchone()[0]
+
+
+def _archive_path(archive_dir, now):
+    os.makedirs(archive_dir, exist_ok=True)
+    return os.path.join(archive_dir, f"notifications-{now:%Y%m%d-%H%M%S}.jsonl.gz")
+
+
+def _delete_ids(ids):
+    """
+    DELETE by primary key without the ORM collector: it would load every row
+    to send post_delete, whose hooks (badge push, version stamp) only care
+    about unread notifications anyway.
+    """
+    table = connection.ops.quote_name(Notification._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", ids)
+        return cursor.rowcount
+
+
+# --- PUBLIC API ---
+def archive_notifications(days=None, batch_size=DEFAULT_BATCH_SIZE, archive=True, dry_run=False, archive_dir=None):
+    """
+    Archive and delete read notifications older than `days`.
+    With dry_run=True nothing is written or deleted; the report shows what would be.
+    """
+    days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+    archive_dir = archive_dir or settings.NOTIFICATION_ARCHIVE_DIR
+    now = timezone.now()
+    cutoff = now - timedelta(days=days)
+    expired = Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+
+    report = {
+        'cutoff': cutoff,
+        'rows': 0,
+        'payload_bytes': 0,
+        'archive_path': None,
+        'archive_bytes': 0,
+        'table_bytes_before': _table_bytes(),
+        'table_bytes_after': None,
+    }
+    if dry_run:
+        report['rows'] = expired.count()
+        return report
+
+    archive_file = None
+    if archive:
+        report['archive_path'] = _archive_path(archive_dir, now)
+        archive_file = gzip.open(report['archive_path'], 'wt', encoding='utf-8')
+
+    last_id = 0
+    try:
+        while True:
+            # Walk the primary key so every chunk is a bounded index range
+            chunk = list(
+                expired.filter(id__gt=last_id).order_by('id').values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1]['id']
+
+            lines = [json.dumps(row, cls=DjangoJSONEncoder, separators=(',', ':')) + '\n' for row in chunk]
+            if archive_file:
+                archive_file.writelines(lines)
+                archive_file.flush()
+            with transaction.atomic():
+                report['rows'] += _delete_ids([row['id'] for row in chunk])
+
+            report['payload_bytes'] += sum(len(line.encode('utf-8')) for line in lines)
+    finally:
+        if archive_file:
+            archive_file.close()
+
+    if report['archive_path']:
+        if report['rows']:
+            report['archive_bytes'] = os.path.getsize(report['archive_path'])
+        else:
+            os.remove(report['archive_path'])
+            report['archive_path'] = None
+    report['table_bytes_after'] = _table_bytes()
+    return report
+
+
+def run_locked(**options):
+    """archive_notifications() unless another process is already running a pass."""
+    if not cache.add(LOCK_KEY, os.getpid(), LOCK_TTL):
+        return None
+    try:
+        return archive_notifications(**options)
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def start_scheduler(interval_hours):
+    """Run a retention pass every `interval_hours` on a daemon thread (idempotent)."""
+    if _scheduler['thread'] is not None:
+        return _scheduler['thread']
+    def loop():
+        while True:
+            time.sleep(interval_hours * 3600)
+            try:
+                report = run_locked()
+                if report:
+                    logger.info("Notification retention: %s rows archived.", report['rows'])
+            except Exception:
+                logger.exception("Notification retention pass failed.")
+            finally:
+                close_old_connections()
+
+    thread = threading.Thread(target=loop, name='notification-retention', daemon=True)
+    thread.start()
+    _scheduler['thread'] = thread
+    return thread
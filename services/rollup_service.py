@@ -0,0 +1,247 @@
+"""
+Rollup Service for TicketDailyStat
+
+Keeps the materialized daily ticket rollup in step with the Ticket table and
+answers "historical window" questions from it, so dashboard cost stays flat as
+ticket history grows.
+
+Maintenance:
+    - record_ticket_save() / record_ticket_delete() apply per-ticket deltas
+      (called from service_desk.signals)
+    - record_tickets_created() applies a bulk_create batch, one UPDATE per bucket
+      (called by services.intake_service, which bypasses the signals)
+    - rebuild_daily_stats() recomputes a day range from scratch
+      (called by the `rebuild_ticket_stats` management command)
+
+Reading:
+    - split_window() divides a datetime range into whole historical days
+      (served by the rollup) and partial/current days (scanned live)
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from service_desk.models import Ticket, TicketDailyStat
+
+MEASURES = ('ticket_count', 'resolved_count', 'resolution_seconds', 'responded_count', 'first_response_seconds')
+
+
+# --- HELPER FUNCTIONS ---
+def _tz():
+    # Rollup days are always cut on the site timezone, never the per-request one
+    return timezone.get_default_timezone()
+
+
+def day_start(day):
+    """Aware datetime for local midnight at the start of `day`."""
+    return timezone.make_aware(datetime.combine(day, time.min), _tz())
+
+
+def _seconds(delta):
+    return int(delta.total_seconds()) if delta else 0
+
+
+def _contribution(state):
+    """
+    Translate a ticket state dict (see Ticket.rollup_state) into a
+    (key, measures) pair for TicketDailyStat.
+    """
+    created_at = state['created_at']
+    key = {
+        'day': timezone.localtime(created_at, _tz()).date(),
+        'board_id': state['board_id'],
+        'type_id': state['type_id'],
+        'technician_id': state['technician_id'],
+        'status': state['status'],
+        'priority': state['priority'],
+    }
+    closed_at = state['closed_at']
+    first_response_at = state['first_response_at']
+    measures = {
+        'ticket_count': 1,
+        'resolved_count': 1 if closed_at else 0,
+        'resolution_seconds': _seconds(closed_at - created_at) if closed_at else 0,
+        'responded_count': 1 if first_response_at else 0,
+        'first_response_seconds': _seconds(first_response_at - created_at) if first_response_at else 0,
+    }
+    return key, measures
+
+
+def _apply(key, measures, sign=1):
+    """Add (or subtract) a measure vector to the row identified by `key`."""
+    deltas = {m: F(m) + sign * v for m, v in measures.items() if v}
+    if not deltas:
+        return
+    row, _ = TicketDailyStat.objects.get_or_create(**key)
+    TicketDailyStat.objects.filter(pk=row.pk).update(**deltas)
+
+
+# --- INCREMENTAL MAINTENANCE ---
+def record_ticket_save(ticket, created):
+    """
+    Apply the change represented by saving `ticket` to the rollup.
+    Uses the snapshot taken when the ticket was loaded (Ticket.from_db) to
+    move the ticket out of its previous bucket.
+    """
+    if ticket.created_at is None:
+        return
+
+    previous = getattr(ticket, '_rollup_snapshot', None)
+    current = ticket.rollup_state()
+
+    if not created and previous is None:
+        # Unknown prior state (e.g. instance built by hand): re-derive its day
+        day = timezone.localtime(ticket.created_at, _tz()).date()
+        rebuild_daily_stats(day, day)
+    elif previous != current:
+        with transaction.atomic():
+            if previous is not None:
+                _apply(*_contribution(previous), sign=-1)
+            _apply(*_contribution(current))
+
+    ticket._rollup_snapshot = current
+
+
+def record_tickets_created(tickets):
+    """Add a batch of newly inserted tickets (bulk_create sends no post_save)."""
+    buckets = {}
+    for ticket in tickets:
+        key, measures = _contribution(ticket.rollup_state())
+        total = buckets.setdefault(tuple(key.items()), dict.fromkeys(MEASURES, 0))
+        for m, v in measures.items():
+            total[m] += v
+        ticket._rollup_snapshot = ticket.rollup_state()
+    with transaction.atomic():
+        for key, measures in buckets.items():
+            _apply(dict(key), measures)
+
+
+def record_ticket_delete(ticket):
+    """Remove a deleted ticket's contribution from the rollup."""
+    state = getattr(ticket, '_rollup_snapshot', None) or ticket.rollup_state()
+    if state['created_at'] is None:
+        return
+    with transaction.atomic():
+        _apply(*_contribution(state), sign=-1)
+
+
+# --- REBUILD / BACKFILL ---
+def rebuild_daily_stats(start_day=None, end_day=None):
+    """
+    Recompute TicketDailyStat rows for [start_day, end_day] (inclusive, local
+    dates). Either bound may be None for an open-ended range.
+    Returns the number of rollup rows written.
+    """
+    tickets = Ticket.objects.all()
+    stats = TicketDailyStat.objects.all()
+    if start_day:
+        tickets = tickets.filter(created_at__gte=day_start(start_day))
+        stats = stats.filter(day__gte=start_day)
+    if end_day:
+        tickets = tickets.filter(created_at__lt=day_start(end_day + timedelta(days=1)))
+        stats = stats.filter(day__lte=end_day)
+
+    closed_q = Q(closed_at__isnull=False)
+    responded_q = Q(first_response_at__isnull=False)
+    rows = tickets.annotate(
+        bucket=TruncDate('created_at', tzinfo=_tz())
+    ).values(
+        'bucket', 'board', 'type', 'technician', 'status', 'priority'
+    ).annotate(
+        n=Count('id'),
+        resolved=Count('id', filter=closed_q),
+        resolution=Sum(F('closed_at') - F('created_at'), filter=closed_q),
+        responded=Count('id', filter=responded_q),
+        first_response=Sum(F('first_response_at') - F('created_at'), filter=responded_q),
+    ).order_by()
+
+    objs = [
+        TicketDailyStat(
+            day=r['bucket'],
+            board_id=r['board'],
+            type_id=r['type'],
+            technician_id=r['technician'],
+            status=r['status'],
+            priority=r['priority'],
+            ticket_count=r['n'],
+            resolved_count=r['resolved'],
+            resolution_seconds=_seconds(r['resolution']),
+            responded_count=r['responded'],
+            first_response_seconds=_seconds(r['first_response']),
+        )
+        for r in rows
+    ]
+
+    with transaction.atomic():
+        stats.delete()
+        TicketDailyStat.objects.bulk_create(objs, batch_size=1000)
+    return len(objs)
+
+
+# --- READING ---
+def split_window(start_date, end_date, now=None):
+    """
+    Split [start_date, end_date] into a rollup part and a live part.
+
+    Returns (first_day, last_day, live_q):
+        first_day/last_day: inclusive range of whole past days to read from
+            TicketDailyStat (None, None when no whole day is covered)
+        live_q: Q() over Ticket.created_at for the remaining partial days,
+            including today (None when nothing needs a live scan)
+    """
+    now = now or timezone.now()
+    tz = _tz()
+    local_start = timezone.localtime(start_date, tz)
+    local_end = timezone.localtime(end_date, tz)
+    today = timezone.localtime(now, tz).date()
+
+    first_day = local_start.date()
+    if local_start > day_start(first_day):
+        first_day += timedelta(days=1)
+
+    last_day = local_end.date()
+    if local_end < day_start(last_day + timedelta(days=1)) - timedelta(seconds=1):
+        last_day -= timedelta(days=1)
+    last_day = min(last_day, today - timedelta(days=1))
+
+    if first_day > last_day:
+        return None, None, Q(created_at__gte=start_date, created_at__lte=end_date)
+
+    live_q = None
+    head_end = day_start(first_day)
+    if start_date < head_end:
+        live_q = Q(created_at__gte=start_date, created_at__lt=head_end)
+    tail_start = day_start(last_day + timedelta(days=1))
+    if tail_start <= end_date:
+        tail_q = Q(created_at__gte=tail_start, created_at__lte=end_date)
+        live_q = tail_q if live_q is None else live_q | tail_q
+    return first_day, last_day, live_q
+
+
+def technician_resolution_summary(user, now=None):
+    """
+    All-time resolved count and average resolution (timedelta or None) for a
+    technician: past days from the rollup, today from live rows.
+    """
+    now = now or timezone.now()
+    today_start = day_start(timezone.localtime(now, _tz()).date())
+    done = ['Resolved', 'Closed']
+
+    rolled = TicketDailyStat.objects.filter(
+        technician=user, status__in=done, day__lt=today_start.date()
+    ).aggregate(n=Sum('ticket_count'), resolved=Sum('resolved_count'), seconds=Sum('resolution_seconds'))
+
+    closed_q = Q(closed_at__isnull=False)
+    live = Ticket.objects.filter(
+        technician=user, status__in=done, created_at__gte=today_start
+    ).aggregate(n=Count('id'), resolved=Count('id', filter=closed_q), duration=Sum(F('closed_at') - F('created_at'), filter=closed_q))
+
+    resolved_total = (rolled['n'] or 0) + live['n']
+    with_close = (rolled['resolved'] or 0) + live['resolved']
+    seconds = (rolled['seconds'] or 0) + _seconds(live['duration'])
+    avg = timedelta(seconds=seconds / with_close) if with_close else None
+    return resolved_total, avg
@@ -0,0 +1,242 @@
+"""
+Routing Service (Compiled Board Routing + Load-Balanced Assignment)
+
+Decides where a ticket filed without a board lands, and who picks it up:
+
+    1. board: the most specific auto-route wins (item, then subtype, then
+       type, then the legacy ticket type string). Routes come from
+       ServiceBoard.auto_route_types on active boards; earlier boards
+       (sort_order, name) win ties. Entries are type names or ids, or
+       "subtype:<name or id>" / "item:<name or id>".
+       Nothing matched -> Tier 1: the first board with "Tier 1" in its
+       name, as Ticket.save() has always done.
+    2. technician: boards with auto_assign hand new, unassigned tickets to
+       the active member with the fewest open tickets. Equal loads rotate,
+       because each pick counts against the picked technician.
+
+The routing table is compiled once from the taxonomy models and shared
+through the 'taxonomy' cache namespace (services/cache.py), which
+service_desk.signals invalidates on every taxonomy or board-membership
+change. Each process also keeps the compiled table in memory until the
+namespace generation moves. Routing is then dict lookups.
+
+Open load per technician is one grouped COUNT for all pools, cached in a
+fixed LOAD_CACHE_TTL window: writes inside the window keep its original
+expiry, so the COUNT reruns at least once per window however busy the desk
+is. Within the window the map follows ticket saves (service_desk.signals):
+a ticket that opens, closes or changes technician moves one unit of load.
+
+Usage:
+    ticket.board_id = routing_service.resolve_board_id(type_id, subtype_id, item_id)
+    ticket.technician_id = routing_service.assign_technician(ticket.board_id)
+"""
+
+import threading
+import time
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from services import cache as portal_cache
+
+ROUTING_CACHE_TTL = 60 * 60
+LOAD_CACHE_TTL = 60
+DEFAULT_BOARD_MARKER = 'tier 1'
+ROUTE_KINDS = ('type', 'subtype', 'item')
+
+_local = {'generation': None, 'table': None, 'expires': 0}
+_lock = threading.Lock()
+
+
+# --- HELPER FUNCTIONS ---
+def _parse_route(value):
+    """auto_route_types entry -> (kind, id or lowercased name)."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return 'type', value
+    kind, _, ref = str(value).strip().partition(':')
+    if not ref or kind.lower() not in ROUTE_KINDS:
+        kind, ref = 'type', str(value)
+    ref = ref.strip()
+    return kind.lower(), int(ref) if ref.isdigit() else ref.lower()
+
+
+def _build_table():
+    from service_desk.models import ServiceBoard, ServiceItem, ServiceSubtype, ServiceType
+
+    boards = list(ServiceBoard.objects.values_list('id', 'name', 'is_active', 'auto_route_types', 'auto_assign'))
+    default = next((pk for pk, name, *_ in boards if DEFAULT_BOARD_MARKER in name.lower()), None)
+
+    routes = {kind: {} for kind in ROUTE_KINDS}
+    for pk, _, is_active, route_types, _ in boards:
+        if not is_active or not isinstance(route_types, list):
+            continue
+        for value in route_types:
+            kind, ref = _parse_route(value)
+            routes[kind].setdefault(ref, pk)  # Earlier boards win
+
+    # Fold names onto ids so the hot path only ever looks up ids
+    table = {'default': default, 'legacy': {k: v for k, v in routes['type'].items() if isinstance(k, str)}}
+    for kind, model in (('type', ServiceType), ('subtype', ServiceSubtype), ('item', ServiceItem)):
+        table[kind] = {}
+        for obj_id, name in model.objects.values_list('id', 'name'):
+            board_id = routes[kind].get(obj_id) or routes[kind].get(name.lower())
+            if board_id:
+                table[kind][obj_id] = board_id
+
+    pool_boards = [pk for pk, _, is_active, _, auto_assign in boards if is_active and auto_assign]
+    pools = {pk: [] for pk in pool_boards}
+    members = ServiceBoard.members.through.objects.filter(
+        serviceboard_id__in=pool_boards, user__is_active=True, user__is_staff=True
+    ).order_by('user_id').values_list('serviceboard_id', 'user_id')
+    for board_id, user_id in members:
+        pools[board_id].append(user_id)
+    table['pools'] = pools
+    return table
+
+
+def _load_key():
+    return portal_cache.make_key('routing', ('load',))
+
+
+def _store_load(load, expires):
+    """Write the map back without extending its window."""
+    remaining = expires - time.time()
+    if remaining > 0:
+        cache.set(_load_key(), {'load': load, 'expires': expires}, remaining)
+
+
+def _is_open(status):
+    from services.counter_service import OPEN_STATUSES
+    return status in OPEN_STATUSES
+
+
+def _adjust_load(deltas):
+    """Apply {technician_id: +/-n} to the cached map (pool members only)."""
+    entry = cache.get(_load_key())
+    if entry is None:
+        return
+    load = entry['load']
+    changed = False
+    for technician_id, delta in deltas.items():
+        if technician_id in load and delta:
+            load[technician_id] = max(load[technician_id] + delta, 0)
+            changed = True
+    if changed:
+        _store_load(load, entry['expires'])
+
+
+def _count_load(technician_ids):
+    from service_desk.models import Ticket
+    from services.counter_service import OPEN_STATUSES
+
+    load = dict.fromkeys(technician_ids, 0)
+    rows = (
+        Ticket.objects.filter(technician_id__in=technician_ids, status__in=OPEN_STATUSES)
+        .values('technician_id').annotate(open=Count('id')).order_by()
+    )
+    for row in rows:
+        load[row['technician_id']] = row['open']
+    return load
+
+
+# --- PUBLIC API ---
+def routing_table():
+    """The compiled table: this process's copy, refreshed when the taxonomy generation moves or it ages out."""
+    generation = portal_cache.generation('taxonomy')
+    if _local['generation'] != generation or time.time() >= _local['expires']:
+        table = portal_cache.get_or_set('taxonomy', ('routing',), _build_table, timeout=ROUTING_CACHE_TTL)
+        with _lock:
+            _local.update(generation=generation, table=table, expires=time.time() + ROUTING_CACHE_TTL)
+    return _local['table']
+
+
+def resolve_board_id(type_id=None, subtype_id=None, item_id=None, legacy_type=None):
+    """Board id for a ticket filed without one (None if nothing matches and there is no Tier 1)."""
+    table = routing_table()
+    for kind, ref in (('item', item_id), ('subtype', subtype_id), ('type', type_id)):
+        if ref is not None and ref in table[kind]:
+            return table[kind][ref]
+    if legacy_type and legacy_type.strip().lower() in table['legacy']:
+        return table['legacy'][legacy_type.strip().lower()]
+    return table['default']
+
+
+def technician_load():
+    """{technician_id: open tickets} for every auto-assign pool member (recounted every LOAD_CACHE_TTL)."""
+    entry = cache.get(_load_key())
+    technician_ids = {user_id for pool in routing_table()['pools'].values() for user_id in pool}
+    if entry is None or time.time() >= entry['expires'] or not technician_ids.issubset(entry['load']):
+        load = _count_load(technician_ids) if technician_ids else {}
+        cache.set(_load_key(), {'load': load, 'expires': time.time() + LOAD_CACHE_TTL}, LOAD_CACHE_TTL)
+        return load
+    return entry['load']
+
+
+def pick_technician(board_id, load):
+    """
+    Least-loaded member of the board's pool (lowest id on a tie), or None when
+    the board doesn't auto-assign. Counts the pick in `load` so repeated
+    calls against the same map rotate through equally loaded members.
+    """
+    pool = routing_table()['pools'].get(board_id)
+    if not pool:
+        return None
+    technician_id = min(pool, key=lambda user_id: (load.get(user_id, 0), user_id))
+    load[technician_id] = load.get(technician_id, 0) + 1
+    return technician_id
+
+
+def save_load(load):
+    """
+    Write back a load map after pick_technician() calls, for inserts that send
+    no post_save (bulk_create). Keeps the current window; if it has ended the
+    next technician_load() recounts instead.
+    """
+    entry = cache.get(_load_key())
+    if entry is not None:
+        _store_load(load, entry['expires'])
+
+
+def assign_technician(board_id):
+    """
+    pick_technician() against the shared load map, for a single ticket. The
+    pick is not written back: the ticket's post_save counts it (record_ticket_save).
+    """
+    if not routing_table()['pools'].get(board_id):
+        return None
+    return pick_technician(board_id, dict(technician_load()))
+
+
+def record_ticket_save(ticket, created):
+    """Move load between technicians when a ticket opens, closes or is reassigned."""
+    previous = None if created else ticket.saved_state
+    if not created and previous is None:
+        cache.delete(_load_key())  # Unknown prior state: recount on next use
+        return
+    deltas = {}
+    if previous and previous['technician_id'] and _is_open(previous['status']):
+        deltas[previous['technician_id']] = -1
+    if ticket.technician_id and _is_open(ticket.status):
+        deltas[ticket.technician_id] = deltas.get(ticket.technician_id, 0) + 1
+    _adjust_load(deltas)
+
+
+def record_ticket_delete(ticket):
+    state = ticket.saved_state or ticket.transition_state()
+    if state['technician_id'] and _is_open(state['status']):
+        _adjust_load({state['technician_id']: -1})
+
+
+def user_changed(user):
+    """
+    Whether a saved User changes the auto-assign pools (pools hold active staff
+    members only). Checked against the compiled table; queries only when an
+    eligible user is missing from every pool.
+    """
+    pools = routing_table()['pools']
+    pooled = any(user.pk in pool for pool in pools.values())
+    eligible = user.is_active and user.is_staff
+    if pooled or not eligible or not pools:
+        return pooled != eligible
+    from service_desk.models import ServiceBoard
+    return ServiceBoard.members.through.objects.filter(user_id=user.pk, serviceboard_id__in=pools).exists()
@@ -0,0 +1,195 @@
+"""
+Search Service for Tickets, Articles, Users and Assets
+
+Backs the omni-search bar and the Ticket Registry.
+
+omni_search() runs the four per-type lookups once each. With the psycopg
+connection pool (PRIME_DB_POOL=pool) they run concurrently on a small shared
+thread pool, so a keystroke costs the slowest lookup rather than the sum of
+all four. Otherwise each worker would open (and close) its own connection per
+keystroke, so they run one after another on the request's connection.
+
+On PostgreSQL:
+    - Tickets/Articles match against a stored `search_vector` column that a
+      database trigger keeps current (service_desk 0010, knowledge_base 0004),
+      served by a GIN index and ordered by ts_rank.
+    - Users/Assets use substring matching on columns carrying pg_trgm GIN
+      indexes (so ILIKE '%q%' is an index scan), ordered by trigram similarity.
+
+On any other backend the functions fall back to plain icontains filters so
+local development on SQLite keeps working (unranked).
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+from inventory.models import HardwareAsset
+from knowledge_base.models import Article
+from service_desk.models import Ticket
+
+SEARCH_CONFIG = 'english'
+TERM_RE = re.compile(r'\w+')
+
+OMNI_LIMIT = 5          # Rows shown per result type in the search dropdown
+OMNI_WORKERS = 4        # One per result type
+
+_omni_pool = ThreadPoolExecutor(max_workers=OMNI_WORKERS, thread_name_prefix='omni-search')
+
+
+# --- HELPER FUNCTIONS ---
+def full_text_enabled():
+    return connection.vendor == 'postgresql'
+
+
+def _ticket_id(query):
+    """'#1042' or '1042' -> 1042, otherwise None."""
+    value = query.strip().lstrip('#')
+    return int(value) if value.isdigit() else None
+
+
+def _prefix_query(query):
+    """
+    Build a tsquery that treats every word as a prefix ("outl vpn" ->
+    'outl:* & vpn:*') so type-ahead matches before the word is finished.
+    Returns None when the input has no searchable terms.
+    """
+    terms = TERM_RE.findall(query.lower())
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f"{t}:*" for t in terms), search_type='raw', config=SEARCH_CONFIG)
+
+
+def _user_q(query, prefix=''):
+    return (
+        Q(**{f'{prefix}username__icontains': query}) |
+        Q(**{f'{prefix}first_name__icontains': query}) |
+        Q(**{f'{prefix}last_name__icontains': query}) |
+        Q(**{f'{prefix}email__icontains': query})
+    )
+
+
+def _fetch(queryset):
+    """Evaluate `queryset` on a pool thread with its own, properly recycled, connection."""
+    close_old_connections()
+    try:
+        return list(queryset)
+    finally:
+        close_old_connections()
+
+
+# --- PUBLIC API ---
+def search_tickets(query, queryset=None, include_people=False):
+    """
+    Tickets matching `query`, best match first.
+    include_people also matches on technician/submitter names (Registry).
+    """
+    tickets = Ticket.objects.all() if queryset is None else queryset
+    ticket_id = _ticket_id(query)
+
+    if not full_text_enabled():
+        match = Q(title__icontains=query) | Q(description__icontains=query)
+        if ticket_id is not None:
+            match |= Q(id=ticket_id)
+        if include_people:
+            match |= _user_q(query, 'technician__') | _user_q(query, 'submitter__')
+        return tickets.filter(match)
+
+    ts_query = _prefix_query(query)
+    if ts_query is None:
+        return tickets.none()
+
+    match = Q(search_vector=ts_query)
+    if ticket_id is not None:
+        match |= Q(id=ticket_id)
+    if include_people:
+        # Resolve people once against the trigram-indexed auth_user columns
+        people = User.objects.filter(_user_q(query)).values('id')
+        match |= Q(technician__in=people) | Q(submitter__in=people)
+
+    return tickets.filter(match).annotate(
+        rank=SearchRank(F('search_vector'), ts_query)
+    ).order_by('-rank', '-created_at')
+
+
+def search_articles(query, queryset=None):
+    """Knowledge Base articles matching `query`, best match first."""
+    articles = Article.objects.all() if queryset is None else queryset
+
+    if not full_text_enabled():
+        return articles.filter(
+            Q(title__icontains=query) |
+            Q(problem__icontains=query) |
+            Q(solution__icontains=query)
+        )
+
+    ts_query = _prefix_query(query)
+    if ts_query is None:
+        return articles.none()
+    return articles.filter(search_vector=ts_query).annotate(
+        rank=SearchRank(F('search_vector'), ts_query)
+    ).order_by('-rank', '-updated_at')
+
+
+def search_users(query, queryset=None):
+    """Users whose name, username or email contains `query`, closest first."""
+    users = User.objects.all() if queryset is None else queryset
+    users = users.filter(_user_q(query))
+
+    if not full_text_enabled():
+        return users
+    return users.annotate(
+        similarity=Greatest(
+            TrigramSimilarity('username', query),
+            TrigramSimilarity('first_name', query),
+            TrigramSimilarity('last_name', query),
+        )
+    ).order_by('-similarity', 'username')
+
+
+def search_assets(query, queryset=None):
+    """Hardware assets by tag, serial or assignee, closest tag first."""
+    assets = HardwareAsset.objects.all() if queryset is None else queryset
+    people = User.objects.filter(
+        Q(username__icontains=query) | Q(first_name__icontains=query) | Q(last_name__icontains=query)
+    ).values('id')
+    assets = assets.filter(
+        Q(asset_tag__icontains=query) |
+        Q(serial_number__icontains=query) |
+        Q(assigned_to__in=people)
+    )
+
+    if not full_text_enabled():
+        return assets
+    return assets.annotate(similarity=TrigramSimilarity('asset_tag', query)).order_by('-similarity', 'asset_tag')
+
+
+def omni_search(query, limit=OMNI_LIMIT):
+    """
+    Result lists for the global search dropdown.
+    Each type is fetched exactly once (no follow-up COUNT queries);
+    total_count is the combined number of rows shown, capped at 4 * limit.
+    """
+    lookups = {
+        'tickets': search_tickets(query).select_related('submitter')[:limit],
+        'assets': search_assets(query)[:limit],
+        'users': search_users(query)[:limit],
+        'kb_articles': search_articles(query)[:limit],
+    }
+
+    # Threads only pay off when their connections come from the pool; they also
+    # use separate connections and can't see this request's uncommitted rows
+    if settings.PRIME_DB_POOL == 'pool' and not connection.in_atomic_block:
+        futures = {key: _omni_pool.submit(_fetch, qs) for key, qs in lookups.items()}
+        results = {key: future.result() for key, future in futures.items()}
+    else:
+        results = {key: list(qs) for key, qs in lookups.items()}
+
+    results['total_count'] = sum(len(rows) for rows in results.values())
+    return results
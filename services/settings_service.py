@@ -0,0 +1,148 @@
+"""
+Settings Service for the GlobalSettings Singleton
+
+Every template render needs the site configuration and the system-health
+banner (see service_desk.context_processors). This service serves both from a
+two-level cache so a warm render costs zero database queries:
+
+    1. Process-local snapshot, trusted for LOCAL_TTL seconds.
+    2. Shared Django cache (settings.CACHES), holding the snapshot plus a
+       version token. After LOCAL_TTL a process re-checks only the small
+       version key and keeps its local copy if it still matches.
+
+A snapshot is rebuilt, including the derived vendor_summary, whenever
+GlobalSettings is saved (service_desk.signals calls publish()), so other
+processes pick up changes within LOCAL_TTL seconds.
+"""
+
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+from service_desk.models import GlobalSettings
+
+SNAPSHOT_KEY = 'global_settings:snapshot'
+VERSION_KEY = 'global_settings:version'
+SHARED_TTL = 60 * 60    # Safety net for changes made outside save() (raw SQL, .update())
+LOCAL_TTL = 5           # Seconds a process trusts its copy before re-checking the version
+
+STATUS_PRIORITY = {
+    'major outage': 3,
+    'partial outage': 2,
+    'degraded performance': 1,
+    'operational': 0,
+}
+STATUS_COLORS = {
+    'operational': 'text-green-500',
+    'degraded performance': 'text-orange-500',
+    'partial outage': 'text-orange-600',
+    'major outage': 'text-red-600',
+}
+
+_local = {'snapshot': None, 'checked_at': 0.0}
+_lock = threading.Lock()
+
+
+# --- HELPER FUNCTIONS ---
+def build_system_health(config):
+    """
+    Template-ready system health dict: announcement, vendor list with UI
+    colors, and the worst-status vendor_summary for the navbar pill.
+    """
+    non_operational_count = 0
+    worst_status = 'operational'
+    vendor_list = []
+
+    for entry in config.vendor_status or []:
+        vendor = dict(entry)
+        status_key = vendor.get('status', 'operational').lower()
+
+        # Inject UI data (Color and Title Case Text)
+        vendor['ui_color'] = STATUS_COLORS.get(status_key, 'text-red-600')  # Default to red if unknown
+        vendor['display_status'] = status_key.title()
+        vendor_list.append(vendor)
+
+        priority = STATUS_PRIORITY.get(status_key, 0)
+        if priority > 0:
+            non_operational_count += 1
+            if priority > STATUS_PRIORITY[worst_status]:
+                worst_status = status_key
+
+    plural = 's' if non_operational_count > 1 else ''
+    if worst_status == 'major outage':
+        label = f"{non_operational_count} Service{plural} Down"
+    elif worst_status in ['partial outage', 'degraded performance']:
+        label = f"{non_operational_count} Service{plural} Degraded"
+    else:
+        label = "All Systems Operational"
+
+    return {
+        'announcement': {
+            'title': config.announcement_title,
+            'message': config.announcement_message,
+            'type': config.announcement_type,
+            'start_datetime': config.announcement_start,
+            'end_datetime': config.announcement_end,
+        },
+        'vendor_status': vendor_list,
+        'vendor_summary': {
+            'count': non_operational_count,
+            'color': STATUS_COLORS.get(worst_status, 'text-green-500'),
+            'label': label,
+        },
+    }
+
+
+def _remember(snapshot):
+    with _lock:
+        _local['snapshot'] = snapshot
+        _local['checked_at'] = time.monotonic()
+
+
+# --- PUBLIC API ---
+def publish(config):
+    """Build a fresh snapshot from `config` and push it to both cache levels."""
+    snapshot = {
+        'version': uuid.uuid4().hex,
+        'settings': config,
+        'system_health': build_system_health(config),
+    }
+    cache.set_many({SNAPSHOT_KEY: snapshot, VERSION_KEY: snapshot['version']}, SHARED_TTL)
+    _remember(snapshot)
+    return snapshot
+
+
+def invalidate():
+    """Drop both cache levels; the next read reloads from the database."""
+    cache.delete_many([SNAPSHOT_KEY, VERSION_KEY])
+    _remember(None)
+
+
+def get_snapshot():
+    """
+    Current {'version', 'settings', 'system_health'} snapshot.
+    Treat it as read-only: it is shared by every request in the process.
+    """
+    snapshot = _local['snapshot']
+    if snapshot is not None and time.monotonic() - _local['checked_at'] < LOCAL_TTL:
+        return snapshot
+
+    version = cache.get(VERSION_KEY)
+    if snapshot is None or version != snapshot['version']:
+        snapshot = cache.get(SNAPSHOT_KEY)
+        if snapshot is None or version is None or snapshot['version'] != version:
+            return publish(GlobalSettings.load())
+
+    _remember(snapshot)
+    return snapshot
+
+
+def get_site_settings():
+    """The cached GlobalSettings instance (read-only; use GlobalSettings.load() to edit)."""
+    return get_snapshot()['settings']
+
+
+def get_system_health():
+    return get_snapshot()['system_health']
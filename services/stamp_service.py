@@ -0,0 +1,51 @@
+"""
+Stamp Service (Per-User Version Stamps for Conditional GET)
+
+Polled HTMX partials (dashboard_stats, get_notifications) usually re-render
+identical HTML. Each user gets a version stamp per scope, and writes bump it.
+service_desk.decorators.versioned_partial turns the stamps into an ETag, so
+an unchanged partial is answered with 304 Not Modified before the view runs
+any query or template.
+
+Stamps are services/cache.py namespace generations, so they live in the
+shared cache (CACHES) and need no table.
+
+    TICKETS        - tickets the user submitted (bumped by Ticket save/delete)
+    NOTIFICATIONS  - the user's notifications (bumped by Notification
+                     save/delete and the bulk read/unread views)
+
+Usage:
+    stamp_service.bump(stamp_service.NOTIFICATIONS, user.id)
+"""
+
+from django.db import transaction
+
+from services import cache as portal_cache
+
+TICKETS = 'tickets'
+NOTIFICATIONS = 'notifications'
+
+
+# --- HELPER FUNCTIONS ---
+def _namespace(scope, user_id):
+    return f"stamp:{scope}:user{user_id}"
+
+
+# --- PUBLIC API ---
+def stamp(scope, user_id):
+    return portal_cache.generation(_namespace(scope, user_id))
+
+
+def bump(scope, user_id):
+    """
+    Mark `scope` changed for `user_id` once the current transaction commits.
+    Bumping earlier would let a poll cache the old data under the new stamp.
+    """
+    if user_id is None:
+        return
+    transaction.on_commit(lambda: portal_cache.invalidate(_namespace(scope, user_id)))
+
+
+def etag(user_id, scopes):
+    """ETag value covering `scopes` for `user_id`; changes whenever any of them is bumped."""
+    return f"u{user_id}-" + '-'.join(str(stamp(scope, user_id)) for scope in scopes)
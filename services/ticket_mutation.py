@@ -0,0 +1,110 @@
+"""
+Ticket Mutation (Change-Set Updates)
+
+Collects everything one ticket update does and applies it in a single
+transaction:
+
+    - field changes, diffed against the loaded ticket (unchanged values are
+      not recorded and not written)
+    - a new collaborator set (written only if it differs)
+    - comments, inserted with one bulk_create
+
+apply() saves the ticket once with update_fields set to the changed
+columns plus updated_at, so the row write is only what changed and the
+Ticket post_save work (rollup, counters, notifications, stamps) runs once.
+After commit it sends one consolidated `ticket_changed` signal carrying
+the whole change set.
+
+Usage:
+    mutation = TicketMutation(ticket, actor=request.user)
+    mutation.set('priority', 'P1', summary="priority updated to P1")
+    mutation.add_comment("Escalating.")
+    mutation.apply()
+"""
+
+from django.db import transaction
+from django.dispatch import Signal
+
+from service_desk.models import Comment, Ticket
+
+# Sent once per applied mutation, after commit:
+#   sender=Ticket, ticket, actor, changes={field: (old, new)},
+#   collaborators=(old_ids, new_ids) or None, comments=[Comment, ...]
+ticket_changed = Signal()
+
+
+class TicketMutation:
+    def __init__(self, ticket, actor=None):
+        self.ticket = ticket
+        self.actor = actor
+        self.changes = {}
+        self.summary = []
+        self.collaborators = None
+        self.comments = []
+
+    # --- Recording ---
+    def value(self, field):
+        """Current (possibly pending) value of `field`."""
+        return getattr(self.ticket, field)
+
+    def set(self, field, value, summary=None):
+        """Stage `field = value`; returns False (and records nothing) when it is unchanged."""
+        name = Ticket._meta.get_field(field).name
+        old = getattr(self.ticket, field)
+        if old == value:
+            return False
+        original = self.changes.get(name, (old, None))[0]
+        setattr(self.ticket, field, value)
+        if getattr(self.ticket, field) == original:
+            self.changes.pop(name, None)  # Changed back within the same update
+        else:
+            self.changes[name] = (original, getattr(self.ticket, field))
+        if summary:
+            self.summary.append(summary)
+        return True
+
+    def set_collaborators(self, user_ids, summary="collaborators updated"):
+        """Stage the collaborator set; reads the prefetched set when there is one."""
+        current = sorted(user.id for user in self.ticket.collaborators.all())
+        wanted = sorted(set(user_ids))
+        if current == wanted:
+            return False
+        self.collaborators = (current, wanted)
+        if summary:
+            self.summary.append(summary)
+        return True
+
+    def add_comment(self, text, is_internal=False, author=None, summary=None):
+        self.comments.append(Comment(
+            ticket=self.ticket, author=author or self.actor, text=text, is_internal=is_internal,
+        ))
+        if summary:
+            self.summary.append(summary)
+
+    @property
+    def has_changes(self):
+        return bool(self.changes or self.collaborators or self.comments)
+
+    # --- Applying ---
+    def apply(self):
+        """Write the change set in one transaction. Returns False if there was nothing to write."""
+        if not self.has_changes:
+            return False
+
+        with transaction.atomic():
+            if self.collaborators:
+                self.ticket.collaborators.set(self.collaborators[1])
+            if self.comments:
+                Comment.objects.bulk_create(self.comments)
+            # A comment alone still touches updated_at (sync watermarks, "last activity")
+            self.ticket.save(update_fields=[*self.changes, 'updated_at'])
+
+            event = {
+                'ticket': self.ticket,
+                'actor': self.actor,
+                'changes': dict(self.changes),
+                'collaborators': self.collaborators,
+                'comments': list(self.comments),
+            }
+            transaction.on_commit(lambda: ticket_changed.send(sender=Ticket, **event))
+        return True
@@ -2,14 +2,15 @@ import json
 import os
 from datetime import datetime
 from django.conf import settings
-from service_desk.models import Ticket
+from service_desk.models import Ticket, SystemLogEntry
+from services import cache as portal_cache
 
 # --- TOGGLE: Demo Mode vs Live Data ---
 USE_MOCK_DATA = True
 
 # --- SYSTEM LOGGING CONFIG ---
+# Legacy JSON store, read once by `python manage.py import_system_logs`
 SYSTEM_LOG_FILE = 'system_logs.json'
-SYSTEM_LOG_LIMIT = 500  # Keep last 500 entries
 
 
 # --- FULL STAFF ROSTER DATABASE ---
@@ -196,6 +197,8 @@ def _save_mock_data(filename, data):
     filepath = os.path.join(settings.BASE_DIR, 'data', filename)
     with open(filepath, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=4, ensure_ascii=False)
+    if filename == 'mock_articles.json':
+        portal_cache.invalidate('catalog')  # Service Catalog article pool
 
 def _get_icon_for_article(article):
     sub = article.get('subcategory')
@@ -209,35 +212,22 @@ def _get_icon_for_article(article):
 # --- SYSTEM LOGGING ---
 def log_system_event(user, action, target, details):
     """
-    Append an audit log entry to system_logs.json (max 500 entries).
+    Append an audit log entry (single INSERT; safe under concurrent threads).
+    `user` may be a User instance or a username string.
     """
-    logs = _load_mock_data(SYSTEM_LOG_FILE)
-    if not isinstance(logs, list):
-        logs = []
-    next_id = (max([l.get('id', 0) for l in logs]) + 1) if logs else 1
-    entry = {
-        'id': next_id,
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
-        'user': user or 'unknown',
-        'action': action,
-        'target': target,
-        'details': details
-    }
-    logs.append(entry)
-    # Keep only newest 500
-    if len(logs) > SYSTEM_LOG_LIMIT:
-        logs = logs[-SYSTEM_LOG_LIMIT:]
-    _save_mock_data(SYSTEM_LOG_FILE, logs)
-    return entry
+    username = getattr(user, 'username', user) or 'unknown'
+    return SystemLogEntry.objects.create(
+        user=str(username)[:150],
+        action=str(action or '')[:100],
+        target=str(target or '')[:255],
+        details=details or '',
+    )
 
 def get_system_logs():
     """
-    Return all system log entries sorted newest first.
+    Return all system log entries newest first (a queryset; filter/sort further in the DB).
     """
-    logs = _load_mock_data(SYSTEM_LOG_FILE)
-    if not isinstance(logs, list):
-        return []
-    return sorted(logs, key=lambda x: x.get('timestamp', ''), reverse=True)
+    return SystemLogEntry.objects.order_by('-timestamp', '-id')
 
 # --- DATA RETRIEVAL FUNCTIONS ---
 def get_all_tickets(user=None):